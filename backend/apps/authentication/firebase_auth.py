@@ -1,12 +1,78 @@
 # ====================================================
 # ARCHIVO CORREGIDO: authentication/firebase_auth.py
 # ====================================================
-# SOLUCIÓN: Agregar logs detallados para debugging
+# Los logs van por el logger del módulo (apps/core/logs.py): nunca el token
+# y los emails enmascarados.
 
+import hashlib
+import logging
+import threading
+import time
+from cachetools import TLRUCache
+from django.conf import settings
 from firebase_admin import auth
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from usuarioapp.models import Usuario
+from apps.core.logs import enmascarar_email
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================================
+# CACHE DE TOKENS VERIFICADOS
+# ===============================================
+# verify_id_token hace una verificación de firma RSA en cada request.
+# Guardamos el token decodificado (por hash SHA-256 del token) hasta su
+# claim 'exp', compartido por todos los requests del worker.
+
+def _expiracion_token(_clave, decoded_token, _ahora):
+    return decoded_token.get('exp', 0)
+
+
+_tokens_verificados = TLRUCache(
+    maxsize=getattr(settings, 'FIREBASE_TOKEN_CACHE_MAXSIZE', 1024),
+    ttu=_expiracion_token,
+    timer=time.time
+)
+_tokens_lock = threading.Lock()
+_tokens_metricas = {'hits': 0, 'misses': 0}
+
+
+def verificar_token(id_token):
+    """
+    Verifica un ID Token de Firebase usando la cache de tokens ya verificados.
+    Lanza las mismas excepciones que auth.verify_id_token.
+    """
+    clave = hashlib.sha256(id_token.encode()).hexdigest()
+    with _tokens_lock:
+        decoded_token = _tokens_verificados.get(clave)
+        if decoded_token is not None:
+            _tokens_metricas['hits'] += 1
+            return decoded_token
+        _tokens_metricas['misses'] += 1
+
+    decoded_token = auth.verify_id_token(
+        id_token,
+        check_revoked=False,
+        clock_skew_seconds=60  # 👈 Tolerancia de 1 minuto
+    )
+
+    with _tokens_lock:
+        _tokens_verificados[clave] = decoded_token
+    return decoded_token
+
+
+def estadisticas_cache_tokens():
+    """Hits, misses y tamaño actual de la cache de tokens de este worker."""
+    with _tokens_lock:
+        return {**_tokens_metricas, 'tamano': len(_tokens_verificados)}
+
+
+def limpiar_cache_tokens():
+    with _tokens_lock:
+        _tokens_verificados.clear()
+        _tokens_metricas.update(hits=0, misses=0)
 
 
 class FirebaseAuthentication(BaseAuthentication):
@@ -16,7 +82,7 @@ class FirebaseAuthentication(BaseAuthentication):
     
     def authenticate(self, request):
         """
-        Método principal de autenticación con LOGS DETALLADOS
+        Método principal de autenticación
         """
         
         # ===============================================
@@ -41,54 +107,40 @@ class FirebaseAuthentication(BaseAuthentication):
         # ===============================================
         # PASO 2: Verificar token con Firebase Admin SDK
         # ===============================================
-        print("=" * 80)
-        print("🔍 FirebaseAuthentication.authenticate() INICIADO")
-        print("=" * 80)
-        print(f"🔑 Token recibido (primeros 50 chars): {id_token[:50]}...")
-        
         try:
-            # ⚠️ CRÍTICO: Agregar check_revoked=False para debugging
-            decoded_token = auth.verify_id_token(
-                id_token, 
-                check_revoked=False,
-                clock_skew_seconds=60 # 👈 Tolerancia de 2 minutos
-            )
+            # ⚠️ CRÍTICO: check_revoked=False; tokens ya verificados salen de la cache
+            decoded_token = verificar_token(id_token)
             
             # Extraer información del token decodificado
             firebase_uid = decoded_token['uid']
             firebase_email = decoded_token.get('email')
             
-            print(f"✅ Token verificado exitosamente en FirebaseAuthentication")
-            print(f"   ├─ UID: {firebase_uid}")
-            print(f"   ├─ Email: {firebase_email}")
-            print(f"   ├─ Issuer: {decoded_token.get('iss', 'N/A')}")
-            print(f"   └─ Audience (Project ID): {decoded_token.get('aud', 'N/A')}")
+            logger.debug("token verificado uid=%s aud=%s", firebase_uid, decoded_token.get('aud'))
             
             if not firebase_email:
                 raise AuthenticationFailed('Token no contiene email de usuario')
             
-        except auth.ExpiredIdTokenError as e:
-            print(f"❌ Token expirado: {str(e)}")
+        except auth.ExpiredIdTokenError:
+            logger.info("token expirado")
             raise AuthenticationFailed('Token expirado. Por favor inicia sesión nuevamente.')
         
-        except auth.RevokedIdTokenError as e:
-            print(f"❌ Token revocado: {str(e)}")
+        except auth.RevokedIdTokenError:
+            logger.info("token revocado")
             raise AuthenticationFailed('Token revocado. Por favor inicia sesión nuevamente.')
         
         except auth.InvalidIdTokenError as e:
-            print(f"❌ Token inválido: {str(e)}")
-            print(f"   Detalles del error: {type(e).__name__}")
+            logger.info("token inválido tipo=%s", type(e).__name__)
             raise AuthenticationFailed(f'Token inválido: {str(e)}')
         
         except ValueError as e:
-            print(f"❌ ValueError al verificar token: {str(e)}")
+            logger.info("token con formato inválido: %s", e)
             raise AuthenticationFailed(f'Error de validación: {str(e)}')
         
+        except AuthenticationFailed:
+            raise
+
         except Exception as e:
-            print(f"❌ Error inesperado al verificar token: {str(e)}")
-            print(f"   Tipo de error: {type(e).__name__}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("error inesperado al verificar token")
             raise AuthenticationFailed(f'Error al verificar token: {str(e)}')
         
         # ===============================================
@@ -96,18 +148,15 @@ class FirebaseAuthentication(BaseAuthentication):
         # ===============================================
         try:
             usuario = Usuario.objects.get(email=firebase_email)
-            print(f"✅ Usuario encontrado en MongoDB: {usuario.nombre}")
-            print("=" * 80)
+            logger.debug("usuario autenticado id=%s", usuario.id)
             
         except Usuario.DoesNotExist:
-            print(f"❌ Usuario NO encontrado en MongoDB: {firebase_email}")
-            print("=" * 80)
+            logger.info("usuario de Firebase sin cuenta email=%s", enmascarar_email(firebase_email))
             return None
             
         
-        except Exception as e:
-            print(f"❌ Error al buscar usuario: {str(e)}")
-            print("=" * 80)
+        except Exception:
+            logger.exception("error al buscar usuario email=%s", enmascarar_email(firebase_email))
             return None
         
         # Retornar usuario autenticado
@@ -0,0 +1,42 @@
+# apps/authentication/tests/test_authentication_firebase_auth.py
+"""
+Pruebas de la cache de tokens verificados de FirebaseAuthentication:
+un mismo token solo se verifica con Firebase una vez hasta su 'exp'.
+"""
+import time
+import pytest
+from unittest.mock import patch
+from apps.authentication import firebase_auth
+from apps.authentication.firebase_auth import verificar_token, estadisticas_cache_tokens, limpiar_cache_tokens
+
+
+class TestCacheTokensVerificados:
+
+    def setup_method(self):
+        limpiar_cache_tokens()
+
+    def test_token_repetido_se_verifica_una_sola_vez(self):
+        decoded = {"uid": "abc", "email": "a@b.com", "exp": time.time() + 3600}
+        with patch.object(firebase_auth.auth, "verify_id_token", return_value=decoded) as mock_verify:
+            assert verificar_token("token-1") == decoded
+            assert verificar_token("token-1") == decoded
+
+        mock_verify.assert_called_once()
+        metricas = estadisticas_cache_tokens()
+        assert metricas["hits"] == 1
+        assert metricas["misses"] == 1
+
+    def test_token_expirado_no_queda_en_cache(self):
+        decoded = {"uid": "abc", "email": "a@b.com", "exp": time.time() - 1}
+        with patch.object(firebase_auth.auth, "verify_id_token", return_value=decoded) as mock_verify:
+            verificar_token("token-2")
+            verificar_token("token-2")
+
+        assert mock_verify.call_count == 2
+
+    def test_token_invalido_no_se_guarda(self):
+        with patch.object(firebase_auth.auth, "verify_id_token", side_effect=ValueError("malo")):
+            with pytest.raises(ValueError):
+                verificar_token("token-3")
+
+        assert estadisticas_cache_tokens()["tamano"] == 0
@@ -0,0 +1,28 @@
+# apps/core/cursores.py
+"""
+Tokens opacos de la paginación por cursor (fecha, _id) descendente que usan
+los listados de formularios (fecha_creacion) y de respuestas (fecha_envio).
+"""
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def codificar_cursor(doc, campo_fecha):
+    """Token con (doc[campo_fecha], _id) del último elemento de la página."""
+    fecha = doc.get(campo_fecha)
+    valor = json.dumps({"f": fecha.isoformat() if fecha else None, "id": str(doc["_id"])})
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def decodificar_cursor(token):
+    """(fecha, _id) del token; ValueError si no es un token emitido por codificar_cursor."""
+    try:
+        valor = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        fecha = datetime.fromisoformat(valor["f"]) if valor["f"] else None
+        return fecha, ObjectId(valor["id"])
+    except (KeyError, TypeError, InvalidId) as e:
+        # base64, utf-8, JSON y fromisoformat ya lanzan ValueError
+        raise ValueError("Cursor inválido") from e
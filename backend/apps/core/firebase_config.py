@@ -4,10 +4,15 @@
 
 import os
 import json
+import logging
 import firebase_admin
 from firebase_admin import credentials
 from django.conf import settings
 
+# Se llama desde settings.py, antes de que Django aplique LOGGING: hasta
+# entonces solo se ven los WARNING/ERROR (por stderr), no los INFO.
+logger = logging.getLogger(__name__)
+
 
 def initialize_firebase():
     """
@@ -21,7 +26,7 @@ def initialize_firebase():
     
     # Verificar si Firebase ya está inicializado
     if firebase_admin._apps:
-        print("⚠️  Firebase ya estaba inicializado, saltando...")
+        logger.debug("Firebase ya estaba inicializado")
         return
     
     # INTENTO 1: Cargar desde variable de entorno (Producción / Railway)
@@ -33,13 +38,13 @@ def initialize_firebase():
             cred_dict = json.loads(firebase_creds_json)
             cred = credentials.Certificate(cred_dict)
             firebase_admin.initialize_app(cred)
-            print("✅ Firebase Admin SDK inicializado desde VARIABLE DE ENTORNO")
+            logger.info("Firebase Admin SDK inicializado desde FIREBASE_CREDENTIALS_JSON")
             return
         except json.JSONDecodeError as e:
-            print(f"❌ Error al parsear FIREBASE_CREDENTIALS_JSON: {e}")
+            logger.error("FIREBASE_CREDENTIALS_JSON no es un JSON válido: %s", e)
             # No retornamos, dejamos que intente el fallback o falle
         except Exception as e:
-            print(f"❌ Error al inicializar Firebase desde env var: {e}")
+            logger.error("no se pudo inicializar Firebase desde FIREBASE_CREDENTIALS_JSON: %s", e)
             # No retornamos, dejamos que intente el fallback o falle
 
     # INTENTO 2: Cargar desde archivo (Desarrollo Local)
@@ -63,7 +68,7 @@ def initialize_firebase():
         # Inicializar Firebase Admin SDK con archivo
         cred = credentials.Certificate(cred_path)
         firebase_admin.initialize_app(cred)
-        print("✅ Firebase Admin SDK inicializado desde ARCHIVO LOCAL")
+        logger.info("Firebase Admin SDK inicializado desde el archivo local")
     except Exception as e:
         raise Exception(f"❌ Error al inicializar Firebase: {str(e)}")
 
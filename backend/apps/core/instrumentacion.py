@@ -0,0 +1,178 @@
+# apps/core/instrumentacion.py
+"""
+Cuántos comandos de MongoDB hace cada request.
+
+EscuchaComandosMongo es un CommandListener de pymongo que se pasa al conectar
+(event_listeners en settings.py). Cada comando que termina suma su duración y
+los documentos devueltos a las métricas del request en curso, que
+MetricasMongoMiddleware guarda en una ContextVar. Al terminar el request el
+middleware agrega el header Server-Timing y escribe una línea de log; si
+MONGO_CONSULTAS_ALERTA > 0 y la vista la supera, además un warning.
+
+Las respuestas en streaming (exportación CSV) hacen sus consultas mientras se
+transmiten, cuando la vista ya volvió y el header ya se armó: el middleware
+envuelve el contenido para contarlas aparte y las registra en una segunda
+línea de log ("streaming ...") al terminar o cortarse la transmisión.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from pymongo import monitoring
+
+logger = logging.getLogger("formcreator.mongo")
+
+_metricas_actuales = ContextVar("metricas_mongo", default=None)
+
+
+class MetricasMongo:
+    __slots__ = ("comandos", "tiempo_ms", "documentos", "por_comando")
+
+    def __init__(self):
+        self.comandos = 0
+        self.tiempo_ms = 0.0
+        self.documentos = 0
+        self.por_comando = {}  # {"find": 3, "aggregate": 1, ...}
+
+    def registrar(self, nombre, duracion_micros, documentos=0):
+        self.comandos += 1
+        self.tiempo_ms += duracion_micros / 1000
+        self.documentos += documentos
+        self.por_comando[nombre] = self.por_comando.get(nombre, 0) + 1
+
+
+def metricas_actuales():
+    """Métricas del request en curso (None fuera de un request)."""
+    return _metricas_actuales.get()
+
+
+def _documentos_devueltos(reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if isinstance(reply.get("value"), dict):  # findAndModify
+        return 1
+    return 0
+
+
+class EscuchaComandosMongo(monitoring.CommandListener):
+    """Atribuye cada comando de pymongo al request en curso (si hay uno)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metricas = _metricas_actuales.get()
+        if metricas is not None:
+            metricas.registrar(event.command_name, event.duration_micros, _documentos_devueltos(event.reply))
+
+    def failed(self, event):
+        metricas = _metricas_actuales.get()
+        if metricas is not None:
+            metricas.registrar(event.command_name, event.duration_micros)
+
+
+class MetricasMongoMiddleware:
+    """Server-Timing y log por request con los comandos de MongoDB que hizo la vista. Sync y async (ASGI)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metricas = MetricasMongo()
+        token = _metricas_actuales.set(metricas)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _metricas_actuales.reset(token)
+        return self._registrar(request, response, metricas, inicio)
+
+    async def __acall__(self, request):
+        metricas = MetricasMongo()
+        token = _metricas_actuales.set(metricas)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metricas_actuales.reset(token)
+        return self._registrar(request, response, metricas, inicio)
+
+    def _registrar(self, request, response, metricas, inicio):
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        response["Server-Timing"] = (
+            f'mongo;dur={metricas.tiempo_ms:.1f};desc="{metricas.comandos} comandos", '
+            f'app;dur={total_ms:.1f}'
+        )
+
+        match = getattr(request, "resolver_match", None)
+        vista = match.view_name if match else request.path
+        logger.info(
+            "request metodo=%s vista=%s estado=%s comandos=%d mongo_ms=%.1f documentos=%d total_ms=%.1f",
+            request.method, vista, response.status_code, metricas.comandos,
+            metricas.tiempo_ms, metricas.documentos, total_ms,
+        )
+
+        umbral = getattr(settings, 'MONGO_CONSULTAS_ALERTA', 0)
+        if umbral and metricas.comandos > umbral:
+            logger.warning(
+                "⚠️ %s %s hizo %d comandos de MongoDB (umbral %d): %s",
+                request.method, vista, metricas.comandos, umbral, metricas.por_comando,
+            )
+
+        if getattr(response, "streaming", False):
+            contar = self._contar_streaming_async if response.is_async else self._contar_streaming
+            response.streaming_content = contar(response.streaming_content, request.method, vista)
+        return response
+
+    def _contar_streaming(self, contenido, metodo, vista):
+        """Itera el contenido con métricas propias activas solo mientras se genera cada parte."""
+        metricas = MetricasMongo()
+        inicio = time.perf_counter()
+        iterador = iter(contenido)
+        try:
+            while True:
+                token = _metricas_actuales.set(metricas)
+                try:
+                    parte = next(iterador)
+                except StopIteration:
+                    return
+                finally:
+                    _metricas_actuales.reset(token)
+                yield parte
+        finally:
+            self._registrar_streaming(metodo, vista, metricas, inicio)
+
+    async def _contar_streaming_async(self, contenido, metodo, vista):
+        metricas = MetricasMongo()
+        inicio = time.perf_counter()
+        iterador = aiter(contenido)
+        try:
+            while True:
+                token = _metricas_actuales.set(metricas)
+                try:
+                    parte = await anext(iterador)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _metricas_actuales.reset(token)
+                yield parte
+        finally:
+            self._registrar_streaming(metodo, vista, metricas, inicio)
+
+    def _registrar_streaming(self, metodo, vista, metricas, inicio):
+        # Sin warning de MONGO_CONSULTAS_ALERTA: una exportación hace un getMore
+        # y un find por lote, así que sus comandos crecen con el volumen
+        logger.info(
+            "streaming metodo=%s vista=%s comandos=%d mongo_ms=%.1f documentos=%d total_ms=%.1f",
+            metodo, vista, metricas.comandos, metricas.tiempo_ms, metricas.documentos,
+            (time.perf_counter() - inicio) * 1000,
+        )
@@ -0,0 +1,139 @@
+# apps/core/logs.py
+"""
+Logging sin bloqueo para los caminos calientes (autenticación, respuestas).
+
+- ColaHandler: QueueHandler que deja cada registro en una cola en memoria; un
+  QueueListener (hilo propio) hace la escritura real a stdout. Los hilos de
+  los requests nunca esperan por I/O.
+- RequestIdMiddleware: asigna un id a cada request (o toma X-Request-ID del
+  proxy), lo devuelve en el header y lo deja en una ContextVar que
+  ContextoRequestFilter agrega a cada registro como %(request_id)s.
+- Muestreo de DEBUG: con LOG_MUESTREO_DEBUG=0.05 solo el 5 % de los requests
+  emiten sus líneas DEBUG (todas las del request, para poder seguirlo).
+"""
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+_request_id = ContextVar("request_id", default="-")
+_debug_muestreado = ContextVar("debug_muestreado", default=None)
+
+
+def request_id_actual():
+    return _request_id.get()
+
+
+def enmascarar_email(email):
+    """'juan.perez@empresa.com' -> 'j***@empresa.com' (los logs no guardan emails completos)."""
+    if not email or "@" not in email:
+        return email
+    usuario, dominio = email.split("@", 1)
+    return f"{usuario[:1]}***@{dominio}"
+
+
+def _tasa_muestreo():
+    return getattr(settings, 'LOG_MUESTREO_DEBUG', 1.0)
+
+
+class ContextoRequestFilter(logging.Filter):
+    """Agrega request_id al registro y descarta el DEBUG de los requests no muestreados."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        if record.levelno > logging.DEBUG:
+            return True
+        muestreado = _debug_muestreado.get()
+        if muestreado is None:  # fuera de un request: muestreo por línea
+            return random.random() < _tasa_muestreo()
+        return muestreado
+
+
+class _Escritor(QueueListener):
+    def enqueue_sentinel(self):
+        # Al cerrar se espera lugar en la cola: las líneas pendientes se escriben igual
+        self.queue.put(self._sentinel)
+
+
+class ColaHandler(QueueHandler):
+    """
+    QueueHandler con su propio QueueListener que escribe en `stream`
+    (stdout por defecto). Se crea desde LOGGING en settings.py.
+    """
+
+    def __init__(self, stream=None, maximo=10000):
+        super().__init__(queue.Queue(maxsize=maximo))
+        self.destino = logging.StreamHandler(stream or sys.stdout)
+        self.listener = _Escritor(self.queue, self.destino, respect_handler_level=False)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # El formato (asctime, etc.) se aplica en el hilo del listener, no en el del request
+        self.destino.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Solo se resuelven el mensaje y la traza; QueueHandler.prepare formatea todo acá
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # Si la cola se llena (stdout bloqueado), se pierde la línea en vez de frenar el request
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def close(self):
+        # logging.shutdown() (al salir del proceso) lo llama: vacía la cola antes de terminar
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+
+class RequestIdMiddleware:
+    """Asigna el request id y decide si el request emite DEBUG (muestreo). Sync y async (ASGI)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _iniciar(self, request):
+        request_id = request.META.get("HTTP_X_REQUEST_ID") or uuid.uuid4().hex
+        tokens = (_request_id.set(request_id), _debug_muestreado.set(random.random() < _tasa_muestreo()))
+        return request_id, tokens
+
+    def _terminar(self, tokens):
+        _request_id.reset(tokens[0])
+        _debug_muestreado.reset(tokens[1])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_id, tokens = self._iniciar(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self._terminar(tokens)
+        response["X-Request-ID"] = request_id
+        return response
+
+    async def __acall__(self, request):
+        request_id, tokens = self._iniciar(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._terminar(tokens)
+        response["X-Request-ID"] = request_id
+        return response
@@ -0,0 +1,103 @@
+# apps/core/management/commands/auditar_indices.py
+from datetime import datetime
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+from formapp.models import Formulario, UsuarioAutorizado
+from responseapp.models import RespuestaFormulario, Respondedor, EstadisticasFormulario
+from usuarioapp.models import Usuario, ResetPasswordToken, EmailVerificationToken
+from utils.email_outbox import CorreoSaliente
+
+# Documentos cuyos índices declarados en meta se aseguran
+DOCUMENTOS = [
+    Formulario,
+    UsuarioAutorizado,
+    RespuestaFormulario,
+    Respondedor,
+    EstadisticasFormulario,
+    Usuario,
+    ResetPasswordToken,
+    EmailVerificationToken,
+    CorreoSaliente,
+]
+
+_ID = ObjectId("000000000000000000000000")
+
+# Consultas que emiten las vistas: (descripción, documento, filtro, orden)
+CONSULTAS = [
+    ("Respuestas de un formulario", RespuestaFormulario, {"formulario": _ID}, None),
+    ("Listado paginado de respuestas", RespuestaFormulario, {"formulario": _ID},
+     [("fecha_envio", -1), ("_id", -1)]),
+    ("Respuesta propia (mi-respuesta)", RespuestaFormulario,
+     {"formulario": _ID, "respondedor": {"$in": [_ID]}}, [("fecha_envio", -1)]),
+    ("Estadísticas de un formulario", EstadisticasFormulario, {"formulario": _ID}, None),
+    ("Formularios de un administrador", Formulario, {"administrador": _ID, "eliminado": {"$ne": True}}, None),
+    ("Resumen paginado de formularios", Formulario, {"administrador": _ID, "eliminado": {"$ne": True}},
+     [("fecha_creacion", -1), ("_id", -1)]),
+    ("Papelera de un administrador", Formulario, {"administrador": _ID, "eliminado": True},
+     [("fecha_creacion", -1), ("_id", -1)]),
+    ("Purga de papelera vencida", Formulario,
+     {"eliminado": True, "fecha_eliminacion": {"$lte": datetime(2000, 1, 1)}}, [("fecha_eliminacion", 1)]),
+    ("Acceso a formulario privado", UsuarioAutorizado, {"formulario": _ID, "email": "auditoria@example.com"}, None),
+    ("Usuarios autorizados paginados", UsuarioAutorizado,
+     {"formulario": _ID, "email": {"$gt": "a@example.com"}}, [("email", 1)]),
+    ("Respondedor por email", Respondedor, {"email": "auditoria@example.com"}, None),
+    ("Respondedor por google_id", Respondedor, {"google_id": 1}, None),
+    ("Respondedor por IP", Respondedor, {"ip_address": "0.0.0.0"}, None),
+    ("Usuario por email", Usuario, {"email": "auditoria@example.com"}, None),
+    ("Login por email y clave", Usuario, {"email": "auditoria@example.com", "clave_hash": "x"}, None),
+    ("Token de recuperación", ResetPasswordToken, {"email": "auditoria@example.com", "token": "000000"}, None),
+    ("Token de verificación", EmailVerificationToken, {"email": "auditoria@example.com", "token": "000000"}, None),
+    ("Siguiente correo de la bandeja de salida", CorreoSaliente,
+     {"estado": {"$in": ["pendiente", "enviando"]}, "proximo_intento": {"$lte": datetime(2000, 1, 1)}},
+     [("proximo_intento", 1)]),
+]
+
+
+def etapas_del_plan(plan):
+    """Recorre el plan ganador de explain() y devuelve los nombres de todas sus etapas."""
+    etapas = [plan.get("stage")] if plan.get("stage") else []
+    if "inputStage" in plan:
+        etapas += etapas_del_plan(plan["inputStage"])
+    for hijo in plan.get("inputStages", []):
+        etapas += etapas_del_plan(hijo)
+    # Motor de ejecución SBE (MongoDB 7+): el plan viene dentro de queryPlan
+    if "queryPlan" in plan:
+        etapas += etapas_del_plan(plan["queryPlan"])
+    return etapas
+
+
+class Command(BaseCommand):
+    """
+    Asegura los índices declarados en los modelos y ejecuta explain() sobre las
+    consultas de las vistas, fallando si alguna hace COLLSCAN.
+    Uso:
+        python manage.py auditar_indices
+        python manage.py auditar_indices --sin-crear   # solo auditar
+    """
+    help = "Crea los índices declarados y reporta las consultas que hacen COLLSCAN"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sin-crear", action="store_true", help="No crear índices, solo auditar")
+
+    def handle(self, *args, **options):
+        if not options["sin_crear"]:
+            for documento in DOCUMENTOS:
+                documento.ensure_indexes()
+                self.stdout.write(f"  índices asegurados: {documento._get_collection_name()}")
+
+        con_collscan = []
+        for descripcion, documento, filtro, orden in CONSULTAS:
+            cursor = documento._get_collection().find(filtro)
+            if orden:
+                cursor = cursor.sort(orden)
+            plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+            etapas = etapas_del_plan(plan)
+            if "COLLSCAN" in etapas:
+                con_collscan.append(descripcion)
+                self.stdout.write(self.style.ERROR(f"❌ COLLSCAN  {descripcion}: {' > '.join(etapas)}"))
+            else:
+                self.stdout.write(f"✅ {descripcion}: {' > '.join(etapas)}")
+
+        if con_collscan:
+            raise CommandError(f"{len(con_collscan)} consulta(s) sin índice: {', '.join(con_collscan)}")
+        self.stdout.write(self.style.SUCCESS("✅ Todas las consultas usan índices"))
@@ -0,0 +1,108 @@
+# apps/core/management/commands/benchmark_logs.py
+import logging
+import os
+import time
+from django.core.management.base import BaseCommand
+from apps.core.logs import ColaHandler, ContextoRequestFilter, _debug_muestreado
+
+LINEAS_POR_REQUEST = 15  # lo que imprimían authenticate + POST /api/respuestas/ antes de usar logging
+
+
+class _DestinoLento:
+    """Archivo cuya escritura tarda `latencia_us` (pipe de stdout lleno, colector de logs lento)."""
+
+    def __init__(self, archivo, latencia_us):
+        self.archivo = archivo
+        self.latencia = latencia_us / 1e6
+
+    def write(self, texto):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self.archivo.write(texto)
+
+    def flush(self):
+        self.archivo.flush()
+
+
+def _request_con_print(destino):
+    for i in range(LINEAS_POR_REQUEST):
+        print(f"📊 Guardando respuesta - Navegador: Chrome, Dispositivo: Móvil, paso {i}", file=destino, flush=True)
+
+
+def _request_con_logger(logger):
+    # Lo que emite ahora el mismo request: tres DEBUG y la línea INFO de formcreator.mongo
+    logger.debug("token verificado uid=%s aud=%s", "uid-123", "form-creator")
+    logger.debug("usuario autenticado id=%s", "65f0c0ffee")
+    logger.debug("respuesta guardada id=%s formulario=%s navegador=%s dispositivo=%s", "66a1", "65f0", "Chrome", "Móvil")
+    logger.info("request metodo=%s vista=%s estado=%s comandos=%d mongo_ms=%.1f", "POST", "respuestas", 201, 4, 3.2)
+
+
+class Command(BaseCommand):
+    """
+    Compara el costo por request (en el hilo del request) de los print() que
+    tenían las vistas contra las líneas que emiten ahora por logger +
+    ColaHandler: nivel INFO (producción), DEBUG muestreado y DEBUG completo.
+    Se mide con un destino rápido y con uno que tarda --latencia-us por
+    escritura, como stdout cuando el colector de logs se atrasa.
+    Uso:
+        python manage.py benchmark_logs
+        python manage.py benchmark_logs --requests 5000 --latencia-us 200
+    """
+    help = "Mide el costo de escribir logs por request (print vs cola)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--destino", default=os.devnull, help="Archivo donde escribir (por defecto /dev/null)")
+        parser.add_argument("--latencia-us", type=int, default=100, help="Demora por escritura del destino lento")
+        parser.add_argument("--muestreo", type=float, default=0.05, help="Fracción de requests con DEBUG")
+
+    def _medir(self, funcion, requests):
+        inicio = time.perf_counter()
+        for _ in range(requests):
+            funcion()
+        return (time.perf_counter() - inicio) * 1e6 / requests
+
+    def _medir_modos(self, destino, requests, muestreo):
+        handler = ColaHandler(stream=destino, maximo=requests * 4)
+        handler.setFormatter(logging.Formatter("%(asctime)s nivel=%(levelname)s request_id=%(request_id)s %(message)s"))
+        handler.addFilter(ContextoRequestFilter())
+        logger = logging.getLogger("formcreator.benchmark")
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        contador = {"n": 0}
+
+        def con_debug(valor):
+            token = _debug_muestreado.set(valor)
+            _request_con_logger(logger)
+            _debug_muestreado.reset(token)
+
+        def muestreado():
+            contador["n"] += 1
+            con_debug((contador["n"] * muestreo) % 1 < muestreo)
+
+        try:
+            tiempos = [self._medir(lambda: _request_con_print(destino), requests)]
+            logger.setLevel(logging.INFO)
+            tiempos.append(self._medir(lambda: _request_con_logger(logger), requests))
+            logger.setLevel(logging.DEBUG)
+            tiempos.append(self._medir(muestreado, requests))
+            tiempos.append(self._medir(lambda: con_debug(True), requests))
+            return tiempos
+        finally:
+            logger.removeHandler(handler)
+            handler.close()  # espera a que el listener vacíe la cola
+
+    def handle(self, *args, **options):
+        requests = max(1, options["requests"])
+        latencia = options["latencia_us"]
+        muestreo = options["muestreo"]
+
+        with open(options["destino"], "w", buffering=1) as archivo:
+            rapido = self._medir_modos(archivo, requests, muestreo)
+            lento = self._medir_modos(_DestinoLento(archivo, latencia), requests, muestreo)
+
+        self.stdout.write(f"{'modo':<26}{'µs/request':>12}{f'lento {latencia}µs':>16}")
+        modos = [f"print ({LINEAS_POR_REQUEST} líneas)", "cola, nivel INFO", f"cola, DEBUG {muestreo:.0%}", "cola, DEBUG 100%"]
+        for nombre, r, l in zip(modos, rapido, lento):
+            self.stdout.write(f"{nombre:<26}{r:>12.1f}{l:>16.1f}")
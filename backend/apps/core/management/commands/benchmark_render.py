@@ -0,0 +1,105 @@
+# apps/core/management/commands/benchmark_render.py
+import gzip
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from apps.core.renderers import ORJSONRenderer, MessagePackRenderer
+from apps.core.middleware import brotli
+
+
+def _pagina_respuestas(n, preguntas=15):
+    """Como una página de GET /api/respuestas/ (el payload más grande de la API)."""
+    inicio = datetime(2024, 1, 1)
+    return {
+        "resultados": [{
+            "id": str(ObjectId()),
+            "formulario": str(ObjectId()),
+            "respondedor": {"id": str(ObjectId()), "ip_address": "190.12.34.56",
+                            "email": f"usuario{i}@empresa.com", "nombre": f"Usuario {i}"},
+            "fecha_envio": inicio + timedelta(minutes=i),
+            "tiempo_completacion": 30 + i % 300,
+            "navegador": "Chrome",
+            "dispositivo": "Móvil" if i % 3 else "Desktop",
+            "respuestas": [
+                {"pregunta_id": p, "tipo": "opcion_multiple", "valor": [f"Opción {(i + p) % 5}"]}
+                for p in range(1, preguntas + 1)
+            ],
+        } for i in range(n)],
+        "siguiente": "eyJmIjogbnVsbH0=",
+        "limite": n,
+    }
+
+
+def _listado_formularios(n, preguntas=15):
+    """Como GET /api/formularios/?admin= (listado completo con preguntas)."""
+    return [{
+        "id": str(ObjectId()),
+        "titulo": f"Encuesta de satisfacción {i}",
+        "descripcion": "Ayúdanos a mejorar respondiendo unas preguntas cortas.",
+        "fecha_creacion": datetime(2024, 1, 1) + timedelta(days=i),
+        "preguntas": [{
+            "id": p, "tipo": "opcion_multiple", "enunciado": f"¿Pregunta número {p}?", "obligatorio": True,
+            "opciones": [{"texto": f"Opción {o}", "valor": str(o)} for o in range(5)],
+        } for p in range(1, preguntas + 1)],
+        "configuracion": {"privado": False, "es_publico": True, "requerir_login": False,
+                          "una_respuesta": True, "usuarios_autorizados": []},
+    } for i in range(n)]
+
+
+def _estadisticas(preguntas=30, dias=365):
+    """Como GET /api/respuestas/estadisticas/<id>/ de un formulario con un año de datos."""
+    return {
+        "total_respuestas": 125000,
+        "tiempo_promedio": 87.4,
+        "dispositivos": {"Desktop": 70000, "Móvil": 50000, "Tablet": 5000},
+        "navegadores": {"Chrome": 90000, "Safari": 20000, "Firefox": 15000},
+        "respuestas_por_fecha": [
+            {"fecha": (datetime(2024, 1, 1) + timedelta(days=d)).strftime("%Y-%m-%d"), "cantidad": 300 + d}
+            for d in range(dias)
+        ],
+        "preguntas": [{
+            "pregunta_id": p, "enunciado": f"¿Pregunta número {p}?", "tipo": "opcion_multiple",
+            "conteos": {f"Opción {o}": 1000 * o for o in range(8)},
+            "textos": [f"Comentario libre {t}" for t in range(20)],
+        } for p in range(1, preguntas + 1)],
+    }
+
+
+class Command(BaseCommand):
+    """
+    Compara JSONRenderer (DRF), ORJSONRenderer y MessagePackRenderer sobre
+    payloads con la forma de los endpoints más pesados: tiempo de serialización
+    y bytes enviados (sin comprimir, gzip y brotli si está instalado).
+    Uso:
+        python manage.py benchmark_render
+        python manage.py benchmark_render --respuestas 500 --repeticiones 50
+    """
+    help = "Mide tiempo de serialización y tamaño de las respuestas de la API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--respuestas", type=int, default=500, help="Respuestas en la página simulada")
+        parser.add_argument("--formularios", type=int, default=200, help="Formularios en el listado simulado")
+        parser.add_argument("--repeticiones", type=int, default=20)
+
+    def handle(self, *args, **options):
+        payloads = [
+            ("Página de respuestas", _pagina_respuestas(options["respuestas"])),
+            ("Listado de formularios", _listado_formularios(options["formularios"])),
+            ("Estadísticas", _estadisticas()),
+        ]
+        renderers = [("DRF json", JSONRenderer()), ("orjson", ORJSONRenderer()), ("msgpack", MessagePackRenderer())]
+        repeticiones = max(1, options["repeticiones"])
+
+        self.stdout.write(f"{'endpoint':<24}{'renderer':<10}{'ms/render':>10}{'bytes':>11}{'gzip':>10}{'br':>10}")
+        for nombre, datos in payloads:
+            for etiqueta, renderer in renderers:
+                inicio = time.perf_counter()
+                for _ in range(repeticiones):
+                    cuerpo = renderer.render(datos)
+                ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+
+                tam_gzip = len(gzip.compress(cuerpo))
+                tam_br = len(brotli.compress(cuerpo, quality=5)) if brotli is not None else "-"
+                self.stdout.write(f"{nombre:<24}{etiqueta:<10}{ms:>10.2f}{len(cuerpo):>11}{tam_gzip:>10}{tam_br:>10}")
@@ -0,0 +1,108 @@
+# apps/core/management/commands/prueba_carga.py
+import asyncio
+import json
+import os
+import time
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga contra un despliegue ya levantado: --concurrencia clientes
+    repiten el mismo request durante --duracion segundos (o hasta --requests).
+    Reporta req/s, latencias y req/s por núcleo del servidor (--nucleos), para
+    comparar el despliegue sync (gunicorn + wsgi) con el ASGI
+    (SERVIDOR_ASGI=1, workers uvicorn) con la misma cantidad de núcleos.
+    Uso:
+        python manage.py prueba_carga --url http://localhost:8000/api/formularios/<id>/ --concurrencia 200 --nucleos 2
+        python manage.py prueba_carga --url http://localhost:8000/api/respuestas/ --metodo POST --cuerpo respuesta.json
+    """
+    help = "Mide la capacidad de requests concurrentes de un despliegue"
+
+    # Las pruebas inyectan un httpx.MockTransport
+    transporte = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True)
+        parser.add_argument("--metodo", default="GET")
+        parser.add_argument("--cuerpo", help="Archivo JSON a enviar como cuerpo")
+        parser.add_argument("--header", action="append", default=[], help="'Nombre: valor', repetible")
+        parser.add_argument("--concurrencia", type=int, default=50)
+        parser.add_argument("--duracion", type=float, default=10.0, help="Segundos de carga")
+        parser.add_argument("--requests", type=int, default=0, help="Cortar tras N requests (0 = solo por duración)")
+        parser.add_argument("--nucleos", type=int, default=os.cpu_count() or 1, help="Núcleos del servidor probado")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def _headers(self, crudos):
+        headers = {}
+        for crudo in crudos:
+            nombre, sep, valor = crudo.partition(":")
+            if not sep:
+                raise CommandError(f"Header inválido: {crudo!r} (se espera 'Nombre: valor')")
+            headers[nombre.strip()] = valor.strip()
+        return headers
+
+    async def _cargar(self, opciones, cuerpo, headers):
+        latencias, estados, errores = [], {}, 0
+        fin = time.perf_counter() + opciones["duracion"]
+        restantes = {"n": opciones["requests"] or None}
+
+        def otro():
+            if time.perf_counter() >= fin:
+                return False
+            if restantes["n"] is not None:
+                if restantes["n"] <= 0:
+                    return False
+                restantes["n"] -= 1
+            return True
+
+        limites = httpx.Limits(max_connections=opciones["concurrencia"], max_keepalive_connections=opciones["concurrencia"])
+        async with httpx.AsyncClient(transport=self.transporte, limits=limites, timeout=opciones["timeout"], headers=headers) as cliente:
+
+            async def usuario():
+                nonlocal errores
+                while otro():
+                    inicio = time.perf_counter()
+                    try:
+                        response = await cliente.request(opciones["metodo"], opciones["url"], json=cuerpo)
+                    except httpx.HTTPError:
+                        errores += 1
+                        continue
+                    latencias.append(time.perf_counter() - inicio)
+                    estados[response.status_code] = estados.get(response.status_code, 0) + 1
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(usuario() for _ in range(opciones["concurrencia"])))
+            total = time.perf_counter() - inicio
+
+        return latencias, estados, errores, total
+
+    def handle(self, *args, **options):
+        if options["concurrencia"] < 1:
+            raise CommandError("--concurrencia debe ser al menos 1")
+        cuerpo = None
+        if options["cuerpo"]:
+            with open(options["cuerpo"], encoding="utf-8") as archivo:
+                cuerpo = json.load(archivo)
+        headers = self._headers(options["header"])
+
+        latencias, estados, errores, total = asyncio.run(self._cargar(options, cuerpo, headers))
+
+        completados = len(latencias)
+        por_segundo = completados / total if total else 0.0
+        nucleos = max(1, options["nucleos"])
+        self.stdout.write(f"{options['metodo']} {options['url']} concurrencia={options['concurrencia']} duración={total:.1f}s")
+        self.stdout.write(f"requests={completados} errores={errores} estados={dict(sorted(estados.items()))}")
+        self.stdout.write(f"req/s={por_segundo:.1f} req/s por núcleo={por_segundo / nucleos:.1f} ({nucleos} núcleos)")
+        self.stdout.write(
+            f"latencia ms p50={_percentil(latencias, 0.50) * 1e3:.1f} "
+            f"p95={_percentil(latencias, 0.95) * 1e3:.1f} p99={_percentil(latencias, 0.99) * 1e3:.1f}"
+        )
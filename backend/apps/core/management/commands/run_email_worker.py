@@ -0,0 +1,69 @@
+# apps/core/management/commands/run_email_worker.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from utils.email_outbox import (
+    obtener_transporte,
+    reclamar_siguiente,
+    procesar_correo,
+    profundidad_cola,
+    metricas,
+)
+
+
+class Command(BaseCommand):
+    """
+    Vacía la bandeja de salida de correos (utils/email_outbox.py).
+    Uso:
+        python manage.py run_email_worker
+        python manage.py run_email_worker --concurrencia 8
+        python manage.py run_email_worker --una-vez      # vaciar lo pendiente y salir
+    """
+    help = "Envía los correos encolados con reintentos y cola de muertos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrencia", type=int,
+                            default=getattr(settings, 'EMAIL_WORKER_CONCURRENCIA', 4),
+                            help="Envíos simultáneos")
+        parser.add_argument("--intervalo", type=float, default=2.0,
+                            help="Segundos de espera cuando la cola está vacía")
+        parser.add_argument("--lease", type=int, default=300,
+                            help="Segundos antes de que otro worker retome un correo en envío")
+        parser.add_argument("--transporte", help="brevo | memoria (por defecto EMAIL_TRANSPORT)")
+        parser.add_argument("--reporte", type=float, default=60.0,
+                            help="Cada cuántos segundos imprimir métricas")
+        parser.add_argument("--una-vez", action="store_true", help="Salir cuando no quede nada listo")
+
+    def handle(self, *args, **options):
+        transporte = obtener_transporte(options["transporte"])
+        concurrencia = max(1, options["concurrencia"])
+        self.stdout.write(f"📮 Worker de correos iniciado (concurrencia={concurrencia})")
+
+        ultimo_reporte = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            try:
+                while True:
+                    lote = []
+                    for _ in range(concurrencia):
+                        doc = reclamar_siguiente(options["lease"])
+                        if doc is None:
+                            break
+                        lote.append(doc)
+
+                    if lote:
+                        list(pool.map(lambda doc: procesar_correo(doc, transporte), lote))
+                    elif options["una_vez"]:
+                        break
+                    else:
+                        time.sleep(options["intervalo"])
+
+                    if time.monotonic() - ultimo_reporte >= options["reporte"]:
+                        self._reportar()
+                        ultimo_reporte = time.monotonic()
+            except KeyboardInterrupt:
+                self.stdout.write("🛑 Worker de correos detenido")
+        self._reportar()
+
+    def _reportar(self):
+        self.stdout.write(f"📊 cola={profundidad_cola()} métricas={metricas.como_dict()}")
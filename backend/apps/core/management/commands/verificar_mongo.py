@@ -0,0 +1,59 @@
+# apps/core/management/commands/verificar_mongo.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from mongoengine.connection import get_connection
+from apps.core.mongo import alias_registrados
+
+
+def _segundos(valor):
+    return "sin límite" if valor is None else f"{valor:g}s"
+
+
+class Command(BaseCommand):
+    """
+    Chequeo de arranque de MongoDB: por cada alias registrado (default y, si
+    está configurado, analiticas) muestra la configuración efectiva del pool
+    y mide la latencia de conexión. El primer ping incluye resolver el SRV,
+    TCP/TLS y el handshake; los siguientes reutilizan la conexión del pool.
+    Sale con error si algún alias no responde.
+    Uso:
+        python manage.py verificar_mongo
+        python manage.py verificar_mongo --alias analiticas --pings 20
+    """
+    help = "Reporta la configuración del pool de MongoDB y la latencia de conexión"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alias", action="append", help="Alias a verificar (por defecto todos)")
+        parser.add_argument("--pings", type=int, default=5, help="Pings tras la conexión inicial")
+
+    def _ping(self, cliente):
+        inicio = time.perf_counter()
+        cliente.admin.command("ping")
+        return (time.perf_counter() - inicio) * 1000
+
+    def handle(self, *args, **options):
+        fallidos = []
+        for alias in options["alias"] or alias_registrados():
+            cliente = get_connection(alias)
+            opciones = cliente.options
+            pool = opciones.pool_options
+            self.stdout.write(
+                f"{alias}: pool={pool.min_pool_size}-{pool.max_pool_size} "
+                f"timeout_conexion={_segundos(pool.connect_timeout)} "
+                f"timeout_socket={_segundos(pool.socket_timeout)} "
+                f"timeout_seleccion={_segundos(opciones.server_selection_timeout)} "
+                f"retry_writes={opciones.retry_writes} lectura={opciones.read_preference.mongos_mode} "
+                f"compresion={','.join(pool._compression_settings.compressors) or 'ninguna'}"
+            )
+            try:
+                conexion_ms = self._ping(cliente)
+                pings = sorted(self._ping(cliente) for _ in range(max(0, options["pings"])))
+            except Exception as e:
+                fallidos.append(alias)
+                self.stderr.write(f"{alias}: sin conexión ({e})")
+                continue
+            mediana = f"{pings[len(pings) // 2]:.1f}ms" if pings else "-"
+            self.stdout.write(f"{alias}: conexión inicial={conexion_ms:.1f}ms ping p50={mediana}")
+
+        if fallidos:
+            raise CommandError(f"MongoDB no respondió: {', '.join(fallidos)}")
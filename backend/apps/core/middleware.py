@@ -0,0 +1,47 @@
+# apps/core/middleware.py
+"""
+Compresión de respuestas: brotli si el cliente lo acepta y el paquete
+`brotli` está instalado, si no gzip (GZipMiddleware de Django).
+Solo se comprimen respuestas de al menos COMPRESION_UMBRAL_BYTES.
+"""
+import re
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli se usa solo gzip
+    brotli = None
+
+re_acepta_brotli = re.compile(r"\bbr\b")
+
+
+class CompresionMiddleware(GZipMiddleware):
+
+    def process_response(self, request, response):
+        umbral = getattr(settings, 'COMPRESION_UMBRAL_BYTES', 1024)
+        if not response.streaming and len(response.content) < umbral:
+            return response
+
+        acepta = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (brotli is not None and not response.streaming
+                and not response.has_header("Content-Encoding")
+                and re_acepta_brotli.search(acepta)):
+            return self._comprimir_brotli(response)
+        return super().process_response(request, response)
+
+    def _comprimir_brotli(self, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        comprimido = brotli.compress(response.content, quality=getattr(settings, 'COMPRESION_BROTLI_CALIDAD', 5))
+        if len(comprimido) >= len(response.content):
+            return response
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+
+        # Igual que GZipMiddleware: un ETag fuerte pasa a débil al cambiar los bytes
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,87 @@
+# apps/core/mongo.py
+"""
+Conexiones de mongoengine configuradas desde el entorno (ver MONGO_* en settings.py).
+
+settings.py solo registra los alias: no se crea ningún MongoClient ni se
+resuelve el registro SRV al importar. mongoengine crea el cliente en la
+primera consulta de cada alias, ya dentro del worker (después del fork de
+gunicorn), y con connect=False no abre sockets hasta necesitarlos.
+
+mongoengine parsea la URI al registrar y, si es mongodb+srv://, hace la
+consulta DNS en ese momento; por eso el cliente se arma con _FabricaCliente,
+que le pasa la URI tal cual a pymongo (que resuelve el SRV recién al
+conectar).
+
+Alias:
+    default     tráfico de la aplicación (todos los Document)
+    analiticas  lecturas pesadas (exportación CSV, reconstrucción de
+                estadísticas), típicamente contra secundarios. Opcional: si no
+                está configurado, coleccion_analiticas() usa el alias default.
+"""
+from mongoengine import register_connection
+from mongoengine.connection import get_db
+from pymongo import MongoClient
+from apps.core.instrumentacion import EscuchaComandosMongo
+
+ALIAS_ANALITICAS = "analiticas"
+
+_registrados = set()
+
+
+class _FabricaCliente:
+    """mongo_client_class de mongoengine: crea el MongoClient con la URI sin parsear."""
+
+    def __init__(self, uri):
+        self.uri = uri
+
+    def __call__(self, host=None, port=None, read_preference=None, **opciones):
+        # host/port/read_preference son los valores por defecto de mongoengine
+        # (no parseó la URI); los reales vienen en la URI y en las opciones
+        return MongoClient(self.uri, **opciones)
+
+
+def opciones_cliente(conexion):
+    """(uri, opciones de pymongo) de una entrada de MONGO_CONEXIONES, sin las vacías."""
+    opciones = {k: v for k, v in conexion.items() if v not in (None, "")}
+    return opciones.pop("host"), opciones
+
+
+def registrar_conexiones(conexiones, db):
+    """Registra cada alias de `conexiones` (alias -> {"host": uri, opciones...}) sin conectar."""
+    for alias, conexion in conexiones.items():
+        uri, opciones = opciones_cliente(conexion)
+        register_connection(
+            alias,
+            db=db,
+            mongo_client_class=_FabricaCliente(uri),
+            connect=False,
+            # Cuenta los comandos de cada request (apps/core/instrumentacion.py)
+            event_listeners=[EscuchaComandosMongo()],
+            **opciones,
+        )
+        _registrados.add(alias)
+
+
+def alias_registrados():
+    return sorted(_registrados, key=lambda alias: (alias != "default", alias))
+
+
+def coleccion_sin_indices(documento):
+    """
+    Colección de un Document sin pasar por _get_collection(), que crea los
+    índices de meta en el primer acceso: los comandos que limpian datos que
+    violarían un índice único tienen que correr antes de crearlo.
+    """
+    return get_db(documento._meta.get("db_alias") or "default")[documento._get_collection_name()]
+
+
+def usando_analiticas(queryset):
+    """El queryset por el alias de analíticas, o el mismo si no hay alias."""
+    return queryset.using(ALIAS_ANALITICAS) if ALIAS_ANALITICAS in _registrados else queryset
+
+
+def coleccion_analiticas(documento):
+    """Colección de un Document por el alias de analíticas, o la normal si no hay alias."""
+    if ALIAS_ANALITICAS not in _registrados:
+        return documento._get_collection()
+    return get_db(ALIAS_ANALITICAS)[documento._get_collection_name()]
@@ -0,0 +1,55 @@
+# apps/core/mongo_async.py
+"""
+Cliente async de MongoDB (pymongo.AsyncMongoClient) para las vistas async
+del modo ASGI.
+
+Los modelos siguen siendo los Document de mongoengine: las vistas async usan
+coleccion_async(Modelo) para leer y escribir documentos crudos y los
+convierten con Modelo._from_son() / instancia.to_mongo(), igual que ya hacen
+los métodos de clase que usan _get_collection().
+
+Un AsyncMongoClient queda atado al event loop donde se usó por primera vez,
+así que se crea uno por loop (en uvicorn, uno por worker).
+
+Las vistas async solo se montan con SERVIDOR_ASGI=1 y tienen que servirse
+con uvicorn (start.sh). Bajo WSGI (gunicorn sync, runserver) Django corre
+cada vista async en un event loop nuevo: eso crearía un cliente, con su pool
+y sus conexiones, por request, sin cerrarlo nunca. Si en un mismo proceso
+aparece un segundo loop se deja un warning con la causa probable.
+"""
+import asyncio
+import logging
+import weakref
+from django.conf import settings
+from pymongo import AsyncMongoClient
+from apps.core.instrumentacion import EscuchaComandosMongo
+from apps.core.mongo import opciones_cliente
+
+logger = logging.getLogger(__name__)
+
+_clientes = weakref.WeakKeyDictionary()
+_metricas = {"clientes": 0}
+
+
+def cliente_async():
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None:
+        _metricas["clientes"] += 1
+        if _metricas["clientes"] == 2:
+            logger.warning(
+                "AsyncMongoClient para un segundo event loop en el proceso: las vistas async "
+                "parecen correr bajo WSGI (un loop y un cliente por request). Con SERVIDOR_ASGI=1 "
+                "sirve la aplicación con uvicorn (formCreatorApp.asgi), como hace start.sh."
+            )
+        # Mismas opciones y listener que el alias default de mongoengine:
+        # los comandos async también cuentan en Server-Timing
+        uri, opciones = opciones_cliente(settings.MONGO_CONEXIONES["default"])
+        cliente = AsyncMongoClient(uri, event_listeners=[EscuchaComandosMongo()], **opciones)
+        _clientes[loop] = cliente
+    return cliente
+
+
+def coleccion_async(documento):
+    """Colección async de un Document de mongoengine."""
+    return cliente_async()[settings.MONGO_DB][documento._get_collection_name()]
@@ -0,0 +1,38 @@
+# apps/core/parsers.py
+import msgpack
+import orjson
+from bson import ObjectId
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from apps.core.renderers import ORJSONRenderer, MessagePackRenderer, EXT_OBJECT_ID
+
+
+class ORJSONParser(JSONParser):
+    """Parser JSON basado en orjson (cuerpos de respuestas, cargas masivas e importaciones)."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def _ext_hook(codigo, datos):
+    # Los serializers esperan ids como texto, igual que llegan en JSON
+    if codigo == EXT_OBJECT_ID:
+        return str(ObjectId(datos))
+    return msgpack.ExtType(codigo, datos)
+
+
+class MessagePackParser(BaseParser):
+    """Cuerpos en MessagePack (Content-Type: application/msgpack), p. ej. cargas masivas desde ETL."""
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3,
+                                   ext_hook=_ext_hook, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
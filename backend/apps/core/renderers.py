@@ -0,0 +1,80 @@
+# apps/core/renderers.py
+"""
+Renderers de la API, elegidos por el header Accept:
+
+- ORJSONRenderer (application/json, por defecto): orjson serializa dicts,
+  listas, datetimes y UUIDs en C; lo que no conoce (ObjectId, Decimal, textos
+  perezosos, QuerySets...) pasa por `default`, que usa las mismas reglas que
+  el JSONEncoder de DRF para que la salida sea igual.
+- MessagePackRenderer (application/msgpack): para clientes de máquina (ETL).
+  Los datetimes van como Timestamp nativo de MessagePack y los ObjectId como
+  ExtType(EXT_OBJECT_ID, 12 bytes).
+"""
+from datetime import datetime, timezone
+import msgpack
+import orjson
+from bson import ObjectId
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Código de extensión MessagePack para ObjectId (ver apps/core/parsers.py)
+EXT_OBJECT_ID = 1
+
+_encoder = JSONEncoder()
+
+OPCIONES = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return _encoder.default(obj)
+
+
+def _default_msgpack(obj):
+    if isinstance(obj, ObjectId):
+        return msgpack.ExtType(EXT_OBJECT_ID, obj.binary)
+    if isinstance(obj, datetime):
+        # Las fechas se guardan en UTC sin tzinfo (datetime.utcnow)
+        return msgpack.Timestamp.from_datetime(obj if obj.tzinfo else obj.replace(tzinfo=timezone.utc))
+    return _encoder.default(obj)
+
+
+def _variar_por_accept(renderer_context):
+    """La misma URL responde JSON o MessagePack: las caches deben distinguir por Accept."""
+    response = (renderer_context or {}).get("response")
+    if response is not None:
+        patch_vary_headers(response, ("Accept",))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Igual que JSONRenderer (misma media type, indent por Accept) pero con orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        _variar_por_accept(renderer_context)
+        opciones = OPCIONES
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            opciones |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_default, option=opciones)
+        # Igual que DRF: escapar \u2028 y \u2029 para que sea JavaScript válido
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack para clientes que envían Accept: application/msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        _variar_por_accept(renderer_context)
+        return msgpack.packb(data, default=_default_msgpack, use_bin_type=True)
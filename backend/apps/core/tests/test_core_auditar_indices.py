@@ -0,0 +1,44 @@
+# apps/core/tests/test_core_auditar_indices.py
+"""
+Pruebas del comando auditar_indices: detección de COLLSCAN en el plan
+ganador de explain() sin conectarse a MongoDB.
+"""
+import pytest
+from contextlib import ExitStack
+from unittest.mock import patch, MagicMock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.core.management.commands.auditar_indices import etapas_del_plan, CONSULTAS
+
+
+def _auditar_con_etapa(stage):
+    """Helper: ejecuta el comando con todas las colecciones mockeadas devolviendo la etapa dada."""
+    col = MagicMock()
+    col.find.return_value.sort.return_value = col.find.return_value
+    col.find.return_value.explain.return_value = {
+        "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": stage}}}
+    }
+    with ExitStack() as stack:
+        for documento in {doc for _, doc, _, _ in CONSULTAS}:
+            stack.enter_context(patch.object(documento, "_get_collection", return_value=col))
+        call_command("auditar_indices", "--sin-crear", stdout=MagicMock())
+
+
+class TestAuditarIndices:
+
+    def test_etapas_del_plan_recorre_etapas_anidadas(self):
+        plan = {"stage": "SORT", "inputStage": {"stage": "OR", "inputStages": [
+            {"stage": "IXSCAN"}, {"stage": "COLLSCAN"}
+        ]}}
+        assert etapas_del_plan(plan) == ["SORT", "OR", "IXSCAN", "COLLSCAN"]
+
+    def test_etapas_del_plan_motor_sbe(self):
+        plan = {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+        assert etapas_del_plan(plan) == ["FETCH", "IXSCAN"]
+
+    def test_comando_falla_si_hay_collscan(self):
+        with pytest.raises(CommandError):
+            _auditar_con_etapa("COLLSCAN")
+
+    def test_comando_ok_con_ixscan(self):
+        _auditar_con_etapa("IXSCAN")
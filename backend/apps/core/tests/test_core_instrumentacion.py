@@ -0,0 +1,82 @@
+# apps/core/tests/test_core_instrumentacion.py
+"""
+Pruebas del conteo de comandos de MongoDB por request (Server-Timing y logs),
+con eventos de pymongo simulados.
+"""
+from unittest.mock import MagicMock
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from apps.core.instrumentacion import EscuchaComandosMongo, MetricasMongoMiddleware, metricas_actuales
+
+escucha = EscuchaComandosMongo()
+
+
+def _evento(nombre="find", micros=2000, reply=None):
+    return MagicMock(command_name=nombre, duration_micros=micros, reply=reply or {})
+
+
+def _vista_con_comandos(n):
+    """Vista falsa que emite n comandos find de 2 documentos cada uno."""
+    def vista(request):
+        for _ in range(n):
+            escucha.succeeded(_evento(reply={"cursor": {"firstBatch": [{}, {}]}}))
+        return HttpResponse("ok")
+    return vista
+
+
+class TestMetricasMongo:
+
+    def test_comandos_fuera_de_un_request_se_ignoran(self):
+        escucha.succeeded(_evento())
+        assert metricas_actuales() is None
+
+    def test_server_timing_con_comandos_y_tiempo(self):
+        response = MetricasMongoMiddleware(_vista_con_comandos(3))(RequestFactory().get("/api/formularios/"))
+
+        assert response["Server-Timing"].startswith('mongo;dur=6.0;desc="3 comandos"')
+        assert "app;dur=" in response["Server-Timing"]
+        assert metricas_actuales() is None
+
+    def test_log_por_request(self, caplog):
+        with caplog.at_level("INFO", logger="formcreator.mongo"):
+            MetricasMongoMiddleware(_vista_con_comandos(2))(RequestFactory().get("/api/respuestas/"))
+
+        assert "comandos=2" in caplog.text
+        assert "documentos=4" in caplog.text
+
+    @override_settings(MONGO_CONSULTAS_ALERTA=5)
+    def test_warning_al_superar_el_umbral(self, caplog):
+        with caplog.at_level("INFO", logger="formcreator.mongo"):
+            MetricasMongoMiddleware(_vista_con_comandos(6))(RequestFactory().get("/api/respuestas/"))
+
+        warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+        assert len(warnings) == 1
+        assert "{'find': 6}" in warnings[0].getMessage()
+
+    @override_settings(MONGO_CONSULTAS_ALERTA=5)
+    def test_sin_warning_bajo_el_umbral(self, caplog):
+        with caplog.at_level("INFO", logger="formcreator.mongo"):
+            MetricasMongoMiddleware(_vista_con_comandos(5))(RequestFactory().get("/api/respuestas/"))
+
+        assert not [r for r in caplog.records if r.levelname == "WARNING"]
+
+    def test_comandos_del_streaming_se_cuentan_al_transmitir(self, caplog):
+        def filas():
+            for _ in range(3):
+                escucha.succeeded(_evento(reply={"cursor": {"nextBatch": [{}]}}))
+                yield "fila\n"
+
+        def vista(request):
+            escucha.succeeded(_evento())  # find de la vista antes de transmitir
+            return StreamingHttpResponse(filas())
+
+        with caplog.at_level("INFO", logger="formcreator.mongo"):
+            response = MetricasMongoMiddleware(vista)(RequestFactory().get("/api/formularios/1/exportar/"))
+            assert 'desc="1 comandos"' in response["Server-Timing"]
+            assert "streaming" not in caplog.text
+
+            assert b"".join(response.streaming_content) == b"fila\n" * 3
+
+        assert "streaming metodo=GET" in caplog.text
+        assert "comandos=3" in caplog.text and "documentos=3" in caplog.text
+        assert metricas_actuales() is None
@@ -0,0 +1,120 @@
+# apps/core/tests/test_core_logs.py
+"""
+Pruebas del logging por cola: request id, muestreo de DEBUG, enmascarado de
+emails y que el handler no bloquee con la cola llena.
+"""
+import io
+import logging
+import time
+from unittest.mock import patch
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from apps.core.logs import (
+    ColaHandler, ContextoRequestFilter, RequestIdMiddleware, enmascarar_email, request_id_actual,
+)
+
+
+def _registro(nivel=logging.INFO, mensaje="hola %s", args=("mundo",)):
+    return logging.LogRecord("formcreator.test", nivel, __file__, 1, mensaje, args, None)
+
+
+class TestRequestId:
+
+    def test_genera_id_y_lo_devuelve_en_el_header(self):
+        vistos = []
+
+        def vista(request):
+            vistos.append(request_id_actual())
+            return HttpResponse("ok")
+
+        response = RequestIdMiddleware(vista)(RequestFactory().get("/"))
+
+        assert len(vistos[0]) == 32
+        assert response["X-Request-ID"] == vistos[0]
+        assert request_id_actual() == "-"
+
+    def test_respeta_el_id_del_proxy(self):
+        response = RequestIdMiddleware(lambda r: HttpResponse())(RequestFactory().get("/", HTTP_X_REQUEST_ID="abc-123"))
+        assert response["X-Request-ID"] == "abc-123"
+
+    def test_el_filtro_agrega_el_id_al_registro(self):
+        registros = []
+
+        def vista(request):
+            registro = _registro()
+            ContextoRequestFilter().filter(registro)
+            registros.append(registro)
+            return HttpResponse()
+
+        RequestIdMiddleware(vista)(RequestFactory().get("/", HTTP_X_REQUEST_ID="req-1"))
+        assert registros[0].request_id == "req-1"
+
+
+class TestMuestreoDebug:
+
+    def _filtra_debug(self, aleatorio):
+        resultado = []
+
+        def vista(request):
+            resultado.append(ContextoRequestFilter().filter(_registro(logging.DEBUG)))
+            return HttpResponse()
+
+        with patch("apps.core.logs.random.random", return_value=aleatorio):
+            RequestIdMiddleware(vista)(RequestFactory().get("/"))
+        return resultado[0]
+
+    @override_settings(LOG_MUESTREO_DEBUG=0.1)
+    def test_request_muestreado_emite_debug(self):
+        assert self._filtra_debug(0.05) is True
+
+    @override_settings(LOG_MUESTREO_DEBUG=0.1)
+    def test_request_no_muestreado_descarta_debug(self):
+        assert self._filtra_debug(0.5) is False
+
+    @override_settings(LOG_MUESTREO_DEBUG=0.0)
+    def test_info_nunca_se_descarta(self):
+        assert ContextoRequestFilter().filter(_registro(logging.INFO)) is True
+
+
+class TestEnmascararEmail:
+
+    def test_deja_la_inicial_y_el_dominio(self):
+        assert enmascarar_email("juan.perez@empresa.com") == "j***@empresa.com"
+
+    def test_valores_sin_email(self):
+        assert enmascarar_email(None) is None
+        assert enmascarar_email("sin-arroba") == "sin-arroba"
+
+
+class _DestinoBloqueado(io.StringIO):
+    def write(self, texto):
+        time.sleep(0.5)
+        return super().write(texto)
+
+
+class TestColaHandler:
+
+    def test_escribe_en_el_destino_con_el_formato(self):
+        destino = io.StringIO()
+        handler = ColaHandler(stream=destino)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        handler.handle(_registro())
+        handler.close()
+        assert destino.getvalue() == "INFO hola mundo\n"
+
+    def test_cola_llena_descarta_sin_bloquear(self):
+        handler = ColaHandler(stream=_DestinoBloqueado(), maximo=2)
+        inicio = time.perf_counter()
+        for _ in range(20):
+            handler.handle(_registro())
+        assert time.perf_counter() - inicio < 0.2
+        handler.listener.stop()
+
+
+class TestBenchmarkLogs:
+
+    def test_imprime_una_fila_por_modo(self):
+        salida = io.StringIO()
+        call_command("benchmark_logs", "--requests", "5", "--latencia-us", "0", stdout=salida)
+        assert len(salida.getvalue().strip().splitlines()) == 1 + 4
@@ -0,0 +1,119 @@
+# apps/core/tests/test_core_mongo.py
+"""
+Pruebas de las conexiones configuradas desde el entorno: registrar no
+conecta ni resuelve el SRV, las opciones llegan al MongoClient, el alias de
+analíticas es opcional y el chequeo de arranque reporta el pool.
+"""
+import io
+import pytest
+from unittest.mock import patch, MagicMock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mongoengine import disconnect
+from mongoengine.connection import get_connection
+from apps.core import mongo
+from apps.core.mongo import ALIAS_ANALITICAS, coleccion_analiticas, opciones_cliente, registrar_conexiones, usando_analiticas
+
+
+@pytest.fixture
+def alias_de_prueba():
+    registrados = set(mongo._registrados)
+    yield "prueba_mongo"
+    disconnect("prueba_mongo")
+    disconnect(ALIAS_ANALITICAS)
+    mongo._registrados.clear()
+    mongo._registrados.update(registrados)
+
+
+class TestRegistrarConexiones:
+
+    def test_registrar_no_crea_el_cliente_ni_resuelve_el_srv(self, alias_de_prueba):
+        with patch("apps.core.mongo.MongoClient") as mock_cliente:
+            # .invalid no resuelve: si se consultara el SRV al registrar, fallaría aquí
+            registrar_conexiones({alias_de_prueba: {"host": "mongodb+srv://cluster.invalid/"}}, "formcreator")
+
+        mock_cliente.assert_not_called()
+
+    def test_el_cliente_se_crea_con_las_opciones_del_entorno(self, alias_de_prueba):
+        registrar_conexiones({alias_de_prueba: {
+            "host": "mongodb+srv://cluster.invalid/", "maxPoolSize": 7, "minPoolSize": 2,
+            "readPreference": "secondaryPreferred", "compressors": "", "retryWrites": False,
+        }}, "formcreator")
+
+        cliente = get_connection(alias_de_prueba)
+        pool = cliente.options.pool_options
+        assert (pool.min_pool_size, pool.max_pool_size) == (2, 7)
+        assert cliente.options.read_preference.mongos_mode == "secondaryPreferred"
+        assert cliente.options.retry_writes is False
+
+    def test_opciones_vacias_se_descartan(self):
+        uri, opciones = opciones_cliente({"host": "mongodb://h", "compressors": "", "maxPoolSize": 10})
+        assert uri == "mongodb://h"
+        assert opciones == {"maxPoolSize": 10}
+
+
+class TestAliasAnaliticas:
+
+    def test_sin_alias_usa_la_coleccion_normal(self, alias_de_prueba):
+        mongo._registrados.discard(ALIAS_ANALITICAS)
+        documento, queryset = MagicMock(), MagicMock()
+
+        assert coleccion_analiticas(documento) is documento._get_collection.return_value
+        assert usando_analiticas(queryset) is queryset
+
+    def test_con_alias_lee_por_analiticas(self, alias_de_prueba):
+        registrar_conexiones({ALIAS_ANALITICAS: {"host": "mongodb://localhost", "readPreference": "secondary"}}, "formcreator")
+        documento, queryset = MagicMock(), MagicMock()
+        documento._get_collection_name.return_value = "respuestas"
+
+        coleccion = coleccion_analiticas(documento)
+
+        assert coleccion.name == "respuestas"
+        assert coleccion.database.client.options.read_preference.mongos_mode == "secondary"
+        documento._get_collection.assert_not_called()
+        usando_analiticas(queryset)
+        queryset.using.assert_called_once_with(ALIAS_ANALITICAS)
+
+
+class TestVerificarMongo:
+
+    def _cliente(self, ping=None):
+        cliente = get_connection("default")
+        falso = MagicMock(options=cliente.options)
+        falso.admin.command.side_effect = ping
+        return falso
+
+    def test_reporta_pool_y_latencia(self):
+        salida = io.StringIO()
+        with patch("apps.core.management.commands.verificar_mongo.get_connection", return_value=self._cliente()):
+            call_command("verificar_mongo", "--alias", "default", "--pings", "3", stdout=salida)
+
+        texto = salida.getvalue()
+        assert "default: pool=" in texto and "retry_writes=" in texto
+        assert "conexión inicial=" in texto and "ping p50=" in texto
+
+    def test_falla_si_mongo_no_responde(self):
+        with patch("apps.core.management.commands.verificar_mongo.get_connection",
+                   return_value=self._cliente(ping=RuntimeError("caído"))):
+            with pytest.raises(CommandError):
+                call_command("verificar_mongo", "--alias", "default", stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class TestClienteAsync:
+
+    def test_un_cliente_por_loop_y_aviso_si_hay_varios(self, caplog):
+        import asyncio
+        from apps.core import mongo_async
+
+        async def pedir_dos_veces():
+            return mongo_async.cliente_async(), mongo_async.cliente_async()
+
+        with patch.dict(mongo_async._metricas, clientes=0), \
+             patch("apps.core.mongo_async.AsyncMongoClient") as mock_cliente:
+            primero = asyncio.run(pedir_dos_veces())
+            assert primero[0] is primero[1] and "WSGI" not in caplog.text
+            # Otro loop en el mismo proceso: lo que pasa con vistas async bajo WSGI
+            asyncio.run(pedir_dos_veces())
+
+        assert mock_cliente.call_count == 2
+        assert "WSGI" in caplog.text
@@ -0,0 +1,144 @@
+# apps/core/tests/test_core_renderers.py
+"""
+Pruebas del renderer/parser orjson y del middleware de compresión.
+"""
+import io
+import json
+import zlib
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from bson import ObjectId
+from unittest.mock import patch, MagicMock
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from apps.core.renderers import ORJSONRenderer, MessagePackRenderer
+from apps.core.parsers import ORJSONParser, MessagePackParser
+from apps.core.middleware import CompresionMiddleware
+
+
+class TestORJSONRenderer:
+
+    def test_misma_salida_que_drf(self):
+        datos = {
+            "titulo": "Encuesta ñandú",
+            "fecha": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+            "monto": Decimal("10.5"),
+            "conteos": {1: 3, 2: 4},
+            "lista": [1, None, True],
+        }
+        assert json.loads(ORJSONRenderer().render(datos)) == json.loads(JSONRenderer().render(datos))
+
+    def test_object_id_y_utc_con_z(self):
+        oid = ObjectId()
+        salida = json.loads(ORJSONRenderer().render({"id": oid, "f": datetime(2024, 1, 1, tzinfo=timezone.utc)}))
+        assert salida == {"id": str(oid), "f": "2024-01-01T00:00:00Z"}
+
+    def test_indent_desde_accept(self):
+        salida = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        assert b"\n" in salida
+
+    def test_none_es_cuerpo_vacio(self):
+        assert ORJSONRenderer().render(None) == b""
+
+
+class TestORJSONParser:
+
+    def test_parsea_json(self):
+        assert ORJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}')) == {"a": [1, 2]}
+
+    def test_json_invalido_lanza_parse_error(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"a": '))
+
+
+class TestMessagePack:
+
+    def test_ida_y_vuelta_con_object_id_y_fechas_nativas(self):
+        oid = ObjectId()
+        datos = {"id": oid, "fecha": datetime(2024, 1, 1, 8, 0), "conteos": {1: 2}, "texto": "ñ"}
+        cuerpo = MessagePackRenderer().render(datos)
+
+        parseado = MessagePackParser().parse(io.BytesIO(cuerpo))
+        assert parseado["id"] == str(oid)
+        assert parseado["fecha"] == datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+        assert parseado["conteos"] == {1: 2}
+        assert parseado["texto"] == "ñ"
+
+    def test_mas_chico_que_json(self):
+        datos = [{"id": ObjectId(), "fecha": datetime(2024, 1, 1), "valor": ["Opción 1"]} for _ in range(50)]
+        assert len(MessagePackRenderer().render(datos)) < len(ORJSONRenderer().render(datos))
+
+    def test_negociacion_por_accept_y_vary(self):
+        from rest_framework.views import APIView
+        from rest_framework.response import Response
+
+        class Vista(APIView):
+            def get(self, request):
+                return Response({"id": ObjectId()})
+
+        request = RequestFactory().get("/", HTTP_ACCEPT="application/msgpack")
+        response = Vista.as_view()(request)
+        response.render()
+
+        assert response["Content-Type"] == "application/msgpack"
+        assert "Accept" in response["Vary"]
+
+    def test_cuerpo_invalido_lanza_parse_error(self):
+        with pytest.raises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b"\xc1"))
+
+
+class TestCompresionMiddleware:
+
+    def _procesar(self, contenido, accept="gzip, deflate, br"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        response = HttpResponse(contenido, content_type="application/json")
+        response["ETag"] = '"3"'
+        return CompresionMiddleware(lambda r: response).process_response(request, response)
+
+    @override_settings(COMPRESION_UMBRAL_BYTES=1024)
+    def test_respuesta_chica_no_se_comprime(self):
+        with patch("apps.core.middleware.brotli", None):
+            response = self._procesar(b'{"a": 1}' * 10)
+        assert not response.has_header("Content-Encoding")
+
+    @override_settings(COMPRESION_UMBRAL_BYTES=1024)
+    def test_gzip_sin_brotli_instalado(self):
+        contenido = b'{"valor": "repetido"}' * 200
+        with patch("apps.core.middleware.brotli", None):
+            response = self._procesar(contenido)
+        assert response["Content-Encoding"] == "gzip"
+        assert response["ETag"] == 'W/"3"'
+        assert zlib.decompress(response.content, 16 + zlib.MAX_WBITS) == contenido
+
+    @override_settings(COMPRESION_UMBRAL_BYTES=1024)
+    def test_brotli_cuando_el_cliente_lo_acepta(self):
+        falso_brotli = MagicMock()
+        falso_brotli.compress.return_value = b"comprimido"
+        with patch("apps.core.middleware.brotli", falso_brotli):
+            response = self._procesar(b'{"valor": "repetido"}' * 200)
+        assert response["Content-Encoding"] == "br"
+        assert response.content == b"comprimido"
+        assert "Accept-Encoding" in response["Vary"]
+
+    @override_settings(COMPRESION_UMBRAL_BYTES=1024)
+    def test_brotli_no_aceptado_usa_gzip(self):
+        falso_brotli = MagicMock()
+        with patch("apps.core.middleware.brotli", falso_brotli):
+            response = self._procesar(b'{"valor": "repetido"}' * 200, accept="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        falso_brotli.compress.assert_not_called()
+
+
+class TestBenchmarkRender:
+
+    def test_imprime_una_fila_por_endpoint_y_renderer(self):
+        salida = io.StringIO()
+        call_command("benchmark_render", "--respuestas", "5", "--formularios", "5",
+                     "--repeticiones", "1", stdout=salida)
+        filas = salida.getvalue().strip().splitlines()
+        assert len(filas) == 1 + 3 * 3
@@ -0,0 +1,120 @@
+# apps/core/tests/test_core_run_email_worker.py
+"""
+Pruebas de la bandeja de salida de correos (utils/email_outbox.py) y del
+comando run_email_worker usando el transporte en memoria, sin MongoDB.
+"""
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from unittest.mock import patch, MagicMock
+from django.core.management import call_command
+from utils.email_outbox import (
+    CorreoSaliente,
+    MemoryTransport,
+    procesar_correo,
+    calcular_backoff,
+    encolar_lote,
+    metricas,
+    ESTADO_ENVIADO,
+    ESTADO_PENDIENTE,
+    ESTADO_MUERTO,
+)
+from utils.email_utils import send_otp_email
+
+
+def _make_doc(intentos=1, max_intentos=5):
+    """Helper: documento crudo tal como lo devuelve reclamar_siguiente."""
+    return {
+        "_id": ObjectId(),
+        "destinatario": "test@example.com",
+        "asunto": "Asunto",
+        "html": "<p>Hola</p>",
+        "etiqueta": "otp",
+        "intentos": intentos,
+        "max_intentos": max_intentos,
+        "fecha_creacion": datetime.utcnow(),
+    }
+
+
+@pytest.fixture(autouse=True)
+def reiniciar_metricas():
+    metricas.reiniciar()
+    yield
+
+
+class TestEmailOutbox:
+
+    def test_send_otp_email_encola_sin_llamar_a_brevo(self):
+        with patch.object(CorreoSaliente, "save") as mock_save:
+            assert send_otp_email("test@example.com", "123456") is True
+        mock_save.assert_called_once()
+
+    def test_envio_exitoso_marca_enviado(self):
+        transporte = MemoryTransport()
+        col = MagicMock()
+        with patch.object(CorreoSaliente, "_get_collection", return_value=col):
+            estado = procesar_correo(_make_doc(), transporte)
+
+        assert estado == ESTADO_ENVIADO
+        assert transporte.enviados[0]["destinatario"] == "test@example.com"
+        assert col.update_one.call_args[0][1]["$set"]["estado"] == ESTADO_ENVIADO
+        assert metricas.como_dict()["enviados"] == 1
+
+    def test_fallo_reprograma_con_backoff(self):
+        col = MagicMock()
+        with patch.object(CorreoSaliente, "_get_collection", return_value=col):
+            estado = procesar_correo(_make_doc(intentos=1), MemoryTransport(fallos=1))
+
+        assert estado == ESTADO_PENDIENTE
+        cambios = col.update_one.call_args[0][1]["$set"]
+        assert cambios["proximo_intento"] > datetime.utcnow()
+        assert metricas.como_dict()["reintentos"] == 1
+
+    def test_fallo_en_ultimo_intento_va_a_muertos(self):
+        col = MagicMock()
+        with patch.object(CorreoSaliente, "_get_collection", return_value=col):
+            estado = procesar_correo(_make_doc(intentos=5, max_intentos=5), MemoryTransport(fallos=1))
+
+        assert estado == ESTADO_MUERTO
+        assert metricas.como_dict()["muertos"] == 1
+
+    def test_encolar_lote_parte_en_lotes_con_un_insert(self):
+        col = MagicMock()
+        destinatarios = [f"user{i}@example.com" for i in range(5)]
+        with patch.object(CorreoSaliente, "_get_collection", return_value=col):
+            assert encolar_lote(destinatarios, "Asunto", "<p>Hola</p>", "invitacion", tamano_lote=2) == 3
+
+        col.insert_many.assert_called_once()
+        documentos = col.insert_many.call_args[0][0]
+        assert [len(doc["destinatarios"]) for doc in documentos] == [2, 2, 1]
+
+    def test_lote_se_envia_con_enviar_lote(self):
+        transporte = MemoryTransport()
+        doc = _make_doc()
+        doc.pop("destinatario")
+        doc["destinatarios"] = ["a@example.com", "b@example.com"]
+        col = MagicMock()
+        with patch.object(CorreoSaliente, "_get_collection", return_value=col):
+            assert procesar_correo(doc, transporte) == ESTADO_ENVIADO
+
+        assert [e["destinatario"] for e in transporte.enviados] == ["a@example.com", "b@example.com"]
+        assert col.update_one.call_args[0][1]["$set"]["message_ids"] == ["memoria-1", "memoria-2"]
+
+    def test_backoff_crece_exponencialmente(self):
+        with patch("utils.email_outbox.random.uniform", return_value=1.0):
+            assert calcular_backoff(2).total_seconds() == 2 * calcular_backoff(1).total_seconds()
+
+
+class TestRunEmailWorker:
+
+    def test_una_vez_vacia_la_cola_y_sale(self):
+        transporte = MemoryTransport()
+        docs = [_make_doc(), _make_doc()]
+        with patch("apps.core.management.commands.run_email_worker.obtener_transporte", return_value=transporte), \
+             patch("apps.core.management.commands.run_email_worker.reclamar_siguiente",
+                   side_effect=docs + [None, None]), \
+             patch("apps.core.management.commands.run_email_worker.profundidad_cola", return_value={}), \
+             patch.object(CorreoSaliente, "_get_collection", return_value=MagicMock()):
+            call_command("run_email_worker", "--una-vez", "--concurrencia", "4", stdout=MagicMock())
+
+        assert len(transporte.enviados) == 2
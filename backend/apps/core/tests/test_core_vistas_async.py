@@ -0,0 +1,115 @@
+# apps/core/tests/test_core_vistas_async.py
+"""
+Pruebas del modo ASGI: AsyncAPIView (handlers async y sync heredados),
+middlewares en su rama async y la prueba de carga contra un transporte falso.
+"""
+import asyncio
+import io
+from unittest.mock import patch
+import httpx
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from apps.core.instrumentacion import MetricasMongoMiddleware
+from apps.core.logs import RequestIdMiddleware, request_id_actual
+from apps.core.management.commands.prueba_carga import Command as PruebaCarga
+from apps.core.vistas_async import AsyncAPIView
+
+
+class _VistaSync(AsyncAPIView):
+    def delete(self, request, id):
+        return Response({"borrado": id})
+
+
+class _VistaAsync(_VistaSync):
+    async def get(self, request, id):
+        await asyncio.sleep(0)
+        return Response({"id": id})
+
+    async def post(self, request, id):
+        raise NotFound("no está")
+
+
+class TestAsyncAPIView:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = _VistaAsync.as_view()
+
+    def test_as_view_devuelve_una_corrutina(self):
+        assert asyncio.iscoroutinefunction(self.view)
+
+    def test_handler_async(self):
+        response = asyncio.run(self.view(self.factory.get("/x/"), id="7"))
+        assert response.status_code == 200
+        assert response.data == {"id": "7"}
+
+    def test_handler_sync_heredado_corre_en_un_hilo(self):
+        response = asyncio.run(self.view(self.factory.delete("/x/"), id="7"))
+        assert response.data == {"borrado": "7"}
+
+    def test_excepciones_de_drf_se_convierten_en_respuesta(self):
+        response = asyncio.run(self.view(self.factory.post("/x/"), id="7"))
+        assert response.status_code == 404
+
+    def test_metodo_no_permitido(self):
+        response = asyncio.run(self.view(self.factory.put("/x/"), id="7"))
+        assert response.status_code == 405
+
+
+class TestMiddlewaresAsync:
+
+    def test_request_id_en_la_rama_async(self):
+        vistos = []
+
+        async def vista(request):
+            vistos.append(request_id_actual())
+            return HttpResponse("ok")
+
+        middleware = RequestIdMiddleware(vista)
+        assert asyncio.iscoroutinefunction(middleware)
+        response = asyncio.run(middleware(RequestFactory().get("/", HTTP_X_REQUEST_ID="abc")))
+
+        assert vistos == ["abc"]
+        assert response["X-Request-ID"] == "abc"
+
+    def test_metricas_en_la_rama_async(self):
+        async def vista(request):
+            return HttpResponse("ok")
+
+        middleware = MetricasMongoMiddleware(vista)
+        response = asyncio.run(middleware(RequestFactory().get("/")))
+
+        assert response["Server-Timing"].startswith("mongo;dur=")
+
+
+class TestPruebaCarga:
+
+    def _correr(self, handler, *args):
+        salida = io.StringIO()
+        with patch.object(PruebaCarga, "transporte", httpx.MockTransport(handler)):
+            call_command("prueba_carga", "--url", "http://servidor/api/formularios/1/", *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_cuenta_requests_y_estados(self):
+        vistos = []
+
+        def handler(request):
+            vistos.append(request.headers.get("authorization"))
+            return httpx.Response(200 if len(vistos) % 2 else 304)
+
+        salida = self._correr(handler, "--concurrencia", "4", "--requests", "10", "--nucleos", "2",
+                              "--header", "Authorization: Bearer t")
+
+        assert len(vistos) == 10 and set(vistos) == {"Bearer t"}
+        assert "requests=10 errores=0 estados={200: 5, 304: 5}" in salida
+        assert "req/s por núcleo" in salida
+
+    def test_errores_de_red_se_cuentan_aparte(self):
+        def handler(request):
+            raise httpx.ConnectError("caído")
+
+        salida = self._correr(handler, "--concurrencia", "2", "--requests", "3")
+        assert "requests=0 errores=3" in salida
@@ -0,0 +1,43 @@
+# apps/core/vistas_async.py
+"""
+APIView con handlers `async def` (DRF 3.16 no los soporta).
+
+Autenticación, permisos y throttling de DRF son sync y pueden consultar
+MongoDB (FirebaseAuthentication busca al Usuario), así que corren en un hilo
+con sync_to_async; después el handler async corre en el event loop. Si una
+subclase hereda handlers sync (PUT/DELETE de la vista sync), también corren
+en un hilo, como cualquier vista sync bajo ASGI.
+"""
+import inspect
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if inspect.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
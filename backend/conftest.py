@@ -0,0 +1,14 @@
+# conftest.py
+"""
+Fixtures compartidas por las pruebas de todas las apps.
+"""
+import pytest
+from formapp.cache import limpiar_cache_formularios
+
+
+@pytest.fixture(autouse=True)
+def cache_formularios_vacia():
+    """Cada prueba arranca con la cache de formularios vacía (muchas mockean formularios con el mismo id)."""
+    limpiar_cache_formularios()
+    yield
+    limpiar_cache_formularios()
@@ -15,9 +15,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from usuarioapp.views import firebase_auth_sync
+
+# Despliegue ASGI: el sync de Firebase usa la vista async (ver usuarioapp/views_async.py)
+if settings.SERVIDOR_ASGI:
+    from usuarioapp.views_async import FirebaseAuthSyncAsyncAPI
+    firebase_auth_sync = FirebaseAuthSyncAsyncAPI.as_view()
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
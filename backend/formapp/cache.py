@@ -0,0 +1,166 @@
+# formapp/cache.py
+"""
+Cache de lectura (read-through) de formularios para el camino de responder.
+
+Cada worker guarda en una LRU los formularios ya cargados, con clave
+(id, version). Para saber la versión vigente se hace una consulta mínima
+(solo el campo version) que se recuerda FORMULARIOS_CACHE_TTL segundos; así
+un formulario muy visitado no vuelve a leerse ni a deserializarse completo.
+Opcionalmente hay un segundo nivel compartido entre workers en un backend de
+cache de Django (FORMULARIOS_CACHE_BACKEND); como la clave lleva la versión,
+ese nivel nunca sirve una versión vieja.
+
+obtener_formulario_async() es la misma lectura para las vistas async (modo
+ASGI): comparte las caches y consulta con el cliente async de MongoDB.
+
+Los formularios devueltos son compartidos: solo usarlos para leer. Las vistas
+que modifican un formulario lo cargan con Formulario.objects.get y llaman a
+invalidar_formulario() después de guardarlo.
+"""
+import threading
+from bson import ObjectId
+from cachetools import LRUCache, TTLCache
+from django.conf import settings
+from django.core.cache import caches
+from formapp.models import Formulario
+from apps.core.mongo_async import coleccion_async
+
+_formularios = LRUCache(maxsize=getattr(settings, 'FORMULARIOS_CACHE_MAXSIZE', 256))
+_versiones = TTLCache(
+    maxsize=getattr(settings, 'FORMULARIOS_CACHE_MAXSIZE', 256),
+    ttl=getattr(settings, 'FORMULARIOS_CACHE_TTL', 5)
+)
+_lock = threading.Lock()
+_metricas = {'hits': 0, 'hits_compartido': 0, 'misses': 0}
+
+
+def _cache_compartido():
+    alias = getattr(settings, 'FORMULARIOS_CACHE_BACKEND', '')
+    return caches[alias] if alias else None
+
+
+def _version_vigente(formulario_id):
+    """Versión actual del formulario (None si no existe), recordada por unos segundos."""
+    with _lock:
+        version = _versiones.get(formulario_id)
+    if version is not None:
+        return version
+
+    meta = Formulario.objects(id=ObjectId(formulario_id)).only("version").as_pymongo().first()
+    if meta is None:
+        return None
+    version = meta.get("version") or 0
+    with _lock:
+        _versiones[formulario_id] = version
+    return version
+
+
+def obtener_formulario(formulario_id):
+    """
+    Devuelve el Formulario con ese id desde la cache, cargándolo si hace falta.
+    Lanza Formulario.DoesNotExist si no existe (igual que Formulario.objects.get).
+    """
+    formulario_id = str(formulario_id)
+    version = _version_vigente(formulario_id)
+    if version is None:
+        raise Formulario.DoesNotExist(f"Formulario {formulario_id} no encontrado")
+
+    clave = (formulario_id, version)
+    with _lock:
+        formulario = _formularios.get(clave)
+        if formulario is not None:
+            _metricas['hits'] += 1
+            return formulario
+
+    compartido = _cache_compartido()
+    clave_compartida = f"formulario:{formulario_id}:{version}"
+    son = compartido.get(clave_compartida) if compartido is not None else None
+    if son is not None:
+        formulario = Formulario._from_son(son)
+        tipo = 'hits_compartido'
+    else:
+        formulario = Formulario.objects.get(id=ObjectId(formulario_id))
+        tipo = 'misses'
+        if compartido is not None:
+            compartido.set(clave_compartida, formulario.to_mongo().to_dict(),
+                           getattr(settings, 'FORMULARIOS_CACHE_COMPARTIDO_TTL', 3600))
+
+    with _lock:
+        _metricas[tipo] += 1
+        # Guardar con la versión real del documento (puede ser más nueva que la consultada)
+        _formularios[(formulario_id, formulario.version or 0)] = formulario
+    return formulario
+
+
+async def obtener_formulario_async(formulario_id):
+    """
+    obtener_formulario() para las vistas async: mismas caches, pero las
+    consultas van por el cliente async de MongoDB.
+    """
+    formulario_id = str(formulario_id)
+    coleccion = coleccion_async(Formulario)
+
+    with _lock:
+        version = _versiones.get(formulario_id)
+    if version is None:
+        meta = await coleccion.find_one({"_id": ObjectId(formulario_id)}, {"version": 1})
+        if meta is None:
+            raise Formulario.DoesNotExist(f"Formulario {formulario_id} no encontrado")
+        version = meta.get("version") or 0
+        with _lock:
+            _versiones[formulario_id] = version
+
+    clave = (formulario_id, version)
+    with _lock:
+        formulario = _formularios.get(clave)
+        if formulario is not None:
+            _metricas['hits'] += 1
+            return formulario
+
+    compartido = _cache_compartido()
+    clave_compartida = f"formulario:{formulario_id}:{version}"
+    son = await compartido.aget(clave_compartida) if compartido is not None else None
+    if son is not None:
+        tipo = 'hits_compartido'
+    else:
+        son = await coleccion.find_one({"_id": ObjectId(formulario_id)})
+        if son is None:
+            raise Formulario.DoesNotExist(f"Formulario {formulario_id} no encontrado")
+        tipo = 'misses'
+        if compartido is not None:
+            await compartido.aset(clave_compartida, son,
+                                  getattr(settings, 'FORMULARIOS_CACHE_COMPARTIDO_TTL', 3600))
+    formulario = Formulario._from_son(son)
+
+    with _lock:
+        _metricas[tipo] += 1
+        _formularios[(formulario_id, formulario.version or 0)] = formulario
+    return formulario
+
+
+def invalidar_formulario(formulario_id):
+    """Olvida la versión recordada y las copias locales de un formulario (llamar tras guardarlo)."""
+    formulario_id = str(formulario_id)
+    with _lock:
+        _versiones.pop(formulario_id, None)
+        for clave in [c for c in _formularios if c[0] == formulario_id]:
+            del _formularios[clave]
+
+
+def estadisticas_cache_formularios():
+    """Hits (local y compartido), misses, tasa de aciertos y tamaño de la cache de este worker."""
+    with _lock:
+        total = sum(_metricas.values())
+        aciertos = _metricas['hits'] + _metricas['hits_compartido']
+        return {
+            **_metricas,
+            'tasa_aciertos': aciertos / total if total else 0.0,
+            'tamano': len(_formularios),
+        }
+
+
+def limpiar_cache_formularios():
+    with _lock:
+        _formularios.clear()
+        _versiones.clear()
+        _metricas.update(hits=0, hits_compartido=0, misses=0)
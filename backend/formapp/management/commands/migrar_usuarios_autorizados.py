@@ -0,0 +1,51 @@
+# formapp/management/commands/migrar_usuarios_autorizados.py
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from formapp.models import Formulario, UsuarioAutorizado
+from formapp.cache import invalidar_formulario
+
+
+class Command(BaseCommand):
+    """
+    Mueve las listas embebidas configuracion.usuarios_autorizados a la colección
+    UsuarioAutorizado (un documento por email, normalizado) y las vacía.
+    Se puede correr varias veces: los emails ya migrados se ignoran.
+    Uso:
+        python manage.py migrar_usuarios_autorizados
+        python manage.py migrar_usuarios_autorizados --conservar   # no vaciar la lista embebida
+    """
+    help = "Migra los usuarios autorizados embebidos a su colección indexada"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conservar", action="store_true",
+                            help="Copiar sin vaciar la lista embebida del formulario")
+
+    def handle(self, *args, **options):
+        coleccion = Formulario._get_collection()
+        pendientes = coleccion.find(
+            {"configuracion.usuarios_autorizados.0": {"$exists": True}},
+            {"configuracion.usuarios_autorizados": 1}
+        )
+
+        formularios = agregados = 0
+        for doc in pendientes:
+            emails = sorted({
+                email.strip().lower()
+                for email in doc["configuracion"]["usuarios_autorizados"]
+                if email and email.strip()
+            })
+            agregados += UsuarioAutorizado.agregar(doc["_id"], emails)
+            formularios += 1
+
+            if not options["conservar"]:
+                coleccion.update_one(
+                    {"_id": doc["_id"]},
+                    {"$set": {"configuracion.usuarios_autorizados": [], "fecha_modificacion": datetime.utcnow()},
+                     "$inc": {"version": 1}}
+                )
+                invalidar_formulario(doc["_id"])
+            self.stdout.write(f"  {doc['_id']}: {len(emails)} email(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {formularios} formulario(s) migrados, {agregados} email(s) nuevos en usuarios_autorizados"
+        ))
@@ -0,0 +1,37 @@
+# formapp/management/commands/purge_papelera.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from formapp.papelera import purgar_vencidos
+
+
+class Command(BaseCommand):
+    """
+    Elimina definitivamente los formularios que llevan más de PAPELERA_DIAS días
+    en la papelera, junto con sus respuestas, estadísticas y usuarios autorizados.
+    Pensado para correr en una tarea programada (cron), por ejemplo una vez por hora.
+    Uso:
+        python manage.py purge_papelera
+        python manage.py purge_papelera --dias 30 --lote 100 --pausa 0.5
+    """
+    help = "Purga por lotes los formularios vencidos de la papelera"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=settings.PAPELERA_DIAS,
+                            help="Días en la papelera antes de borrar definitivamente")
+        parser.add_argument("--lote", type=int, default=settings.PAPELERA_LOTE,
+                            help="Formularios borrados por lote")
+        parser.add_argument("--pausa", type=float, default=settings.PAPELERA_PAUSA,
+                            help="Segundos de espera entre lotes")
+
+    def handle(self, *args, **options):
+        totales = {"formularios": 0, "respuestas": 0, "usuarios_autorizados": 0}
+        for resumen in purgar_vencidos(options["dias"], options["lote"], options["pausa"]):
+            for clave, valor in resumen.items():
+                totales[clave] += valor
+            self.stdout.write(f"  lote: {resumen}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Papelera purgada: {totales['formularios']} formulario(s), "
+            f"{totales['respuestas']} respuesta(s), "
+            f"{totales['usuarios_autorizados']} usuario(s) autorizado(s)"
+        ))
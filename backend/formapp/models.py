@@ -1,6 +1,9 @@
 # formapp/models.py
 from datetime import datetime
+from bson import ObjectId
 from mongoengine import Document, StringField, ReferenceField, DateTimeField, EmbeddedDocument, EmbeddedDocumentField, BooleanField, ListField, IntField
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from apps.core.mongo_async import coleccion_async
 
 class Opcion(EmbeddedDocument):
     valor = StringField()
@@ -36,6 +39,8 @@ class ConfiguracionFormulario(EmbeddedDocument):
     es_publico = BooleanField(default=True)  # True = público, False = privado
     
     # Lista de correos electrónicos autorizados (solo aplica si es_publico=False y requerir_login=True)
+    # ⚠️ Ya no se guarda aquí: los emails viven en la colección UsuarioAutorizado.
+    # Solo la tienen formularios viejos hasta correr `manage.py migrar_usuarios_autorizados`.
     usuarios_autorizados = ListField(StringField())  # Lista de emails con acceso
     
     # Campos existentes
@@ -50,17 +55,43 @@ class ConfiguracionFormulario(EmbeddedDocument):
         'collection': 'configuracionFormularios'
     }
     
-    def tiene_acceso(self, email):
+    def tiene_acceso(self, email, formulario_id=None):
         """
         Verifica si un usuario tiene acceso al formulario.
         Esta validación solo aplica cuando requerir_login=True.
         
         Args:
             email (str): Correo electrónico del usuario
+            formulario_id: ID del formulario, para buscar el email en UsuarioAutorizado
             
         Returns:
             bool: True si tiene acceso, False en caso contrario
         """
+        email = email.strip().lower() if email else email
+        acceso = self._acceso_sin_consulta(email)
+        if acceso is not None:
+            return acceso
+
+        # Si es privado y requiere login, buscar el email en el índice (formulario, email)
+        if formulario_id is not None:
+            return UsuarioAutorizado.esta_autorizado(formulario_id, email)
+        
+        # Si no hay email o no está autorizado, denegar acceso
+        return False
+
+    async def tiene_acceso_async(self, email, formulario_id=None):
+        """tiene_acceso() con la búsqueda en UsuarioAutorizado por el cliente async."""
+        email = email.strip().lower() if email else email
+        acceso = self._acceso_sin_consulta(email)
+        if acceso is not None:
+            return acceso
+        if formulario_id is not None:
+            return await UsuarioAutorizado.esta_autorizado_async(formulario_id, email)
+        return False
+
+    def _acceso_sin_consulta(self, email):
+        """True/False si se decide sin ir a la base; None si hay que buscar en UsuarioAutorizado.
+        `email` ya normalizado."""
         # Si no requiere login, no aplica la restricción de visibilidad
         if not self.requerir_login:
             return True
@@ -69,12 +100,13 @@ class ConfiguracionFormulario(EmbeddedDocument):
         if self.es_publico:
             return True
         
-        # Si es privado y requiere login, verificar si el email está en la lista
-        if email and self.usuarios_autorizados:
-            return email.lower() in [u.lower() for u in self.usuarios_autorizados]
-        
-        # Si no hay email o la lista está vacía, denegar acceso
-        return False
+        if not email:
+            return False
+
+        # Lista embebida (formularios aún no migrados)
+        if self.usuarios_autorizados and email in (u.lower() for u in self.usuarios_autorizados):
+            return True
+        return None
 
 class Formulario(Document):
     titulo = StringField(required=True)
@@ -87,10 +119,32 @@ class Formulario(Document):
     eliminado = BooleanField(default=False)
     fecha_eliminacion = DateTimeField()
 
+    # Se incrementa cada vez que cambian las preguntas (invalida validadores compilados)
+    version_esquema = IntField(default=0)
+
+    # Se incrementan con cualquier cambio del formulario (ETag / Last-Modified del GET)
+    version = IntField(default=0)
+    fecha_modificacion = DateTimeField(default=datetime.utcnow)
+
     meta = {
-        'collection': 'formularios'
+        'collection': 'formularios',
+        'indexes': [
+            # Listado del home (?admin=) y papelera por administrador; el orden
+            # por fecha_creacion sirve a la paginación del modo resumen
+            ('administrador', 'eliminado', '-fecha_creacion', '-id'),
+            # Formularios en papelera ordenados por fecha de eliminación (solo eliminados)
+            {
+                'fields': ['fecha_eliminacion'],
+                'partialFilterExpression': {'eliminado': True}
+            },
+        ]
     }
     
+    def marcar_modificado(self):
+        """Sube la versión y la fecha de modificación; llamar antes de save()."""
+        self.version = (self.version or 0) + 1
+        self.fecha_modificacion = datetime.utcnow()
+
     def usuario_puede_responder(self, email=None):
         """
         Verifica si un usuario puede responder el formulario.
@@ -106,4 +160,100 @@ class Formulario(Document):
             # Si no hay configuración, por defecto es público
             return True
         
-        return self.configuracion.tiene_acceso(email)
\ No newline at end of file
+        return self.configuracion.tiene_acceso(email, formulario_id=self.id)
+
+    async def usuario_puede_responder_async(self, email=None):
+        if not self.configuracion:
+            return True
+        return await self.configuracion.tiene_acceso_async(email, formulario_id=self.id)
+
+
+class UsuarioAutorizado(Document):
+    """
+    Email autorizado para responder un formulario privado. Uno por documento,
+    normalizado en minúsculas, con índice único (formulario, email): verificar
+    acceso es una búsqueda por índice y el formulario no carga la lista.
+    """
+    formulario = ReferenceField('Formulario', required=True)
+    email = StringField(required=True)
+    fecha_agregado = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'usuarios_autorizados',
+        'indexes': [
+            {'fields': ['formulario', 'email'], 'unique': True},
+        ]
+    }
+
+    @classmethod
+    def esta_autorizado(cls, formulario_id, email):
+        return cls._get_collection().find_one(
+            {"formulario": ObjectId(formulario_id), "email": email.strip().lower()}, {"_id": 1}
+        ) is not None
+
+    @classmethod
+    async def esta_autorizado_async(cls, formulario_id, email):
+        return await coleccion_async(cls).find_one(
+            {"formulario": ObjectId(formulario_id), "email": email.strip().lower()}, {"_id": 1}
+        ) is not None
+
+    @classmethod
+    def contar(cls, formulario_id):
+        return cls._get_collection().count_documents({"formulario": ObjectId(formulario_id)})
+
+    @classmethod
+    def emails(cls, formulario_id, desde=None, limite=0):
+        """Emails autorizados en orden alfabético, desde el email `desde` (exclusivo)."""
+        filtro = {"formulario": ObjectId(formulario_id)}
+        if desde:
+            filtro["email"] = {"$gt": desde}
+        cursor = cls._get_collection().find(filtro, {"email": 1, "_id": 0}).sort("email", 1).limit(limite)
+        return [doc["email"] for doc in cursor]
+
+    @classmethod
+    async def emails_async(cls, formulario_id):
+        """Todos los emails autorizados (para las invitaciones del modo async)."""
+        cursor = coleccion_async(cls).find({"formulario": ObjectId(formulario_id)}, {"email": 1, "_id": 0}).sort("email", 1)
+        return [doc["email"] async for doc in cursor]
+
+    @classmethod
+    def agregar(cls, formulario_id, emails):
+        """
+        Inserta los emails (ya normalizados) ignorando los que ya estaban.
+        Devuelve cuántos se agregaron.
+        """
+        if not emails:
+            return 0
+        ahora = datetime.utcnow()
+        formulario_id = ObjectId(formulario_id)
+        documentos = [{"formulario": formulario_id, "email": email, "fecha_agregado": ahora} for email in emails]
+        try:
+            return len(cls._get_collection().insert_many(documentos, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # Los duplicados (código 11000) se ignoran; cualquier otro error se propaga
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            return e.details.get("nInserted", 0)
+
+    @classmethod
+    def agregar_uno(cls, formulario_id, email):
+        """Inserta un email; devuelve False si ya estaba autorizado."""
+        try:
+            cls._get_collection().insert_one(
+                {"formulario": ObjectId(formulario_id), "email": email, "fecha_agregado": datetime.utcnow()}
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    @classmethod
+    def quitar(cls, formulario_id, email):
+        """Elimina un email; devuelve False si no estaba autorizado."""
+        return cls._get_collection().delete_one({"formulario": ObjectId(formulario_id), "email": email}).deleted_count > 0
+
+    @classmethod
+    def reemplazar(cls, formulario_id, emails):
+        """Deja exactamente esos emails autorizados (se usa al guardar el formulario completo)."""
+        emails = sorted({e.strip().lower() for e in emails if e})
+        cls._get_collection().delete_many({"formulario": ObjectId(formulario_id), "email": {"$nin": emails}})
+        cls.agregar(formulario_id, emails)
@@ -0,0 +1,110 @@
+# formapp/papelera.py
+"""
+Eliminación definitiva de formularios de la papelera.
+
+Borrar un formulario borra también lo que cuelga de él: sus respuestas (por
+lotes de PAPELERA_LOTE_RESPUESTAS, para no bloquear la base con un solo
+delete_many enorme), sus estadísticas y sus usuarios autorizados. Los formularios que llevan más de PAPELERA_DIAS días en la
+papelera los purga `manage.py purge_papelera` (tarea programada), nunca una
+petición de lectura.
+"""
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from formapp.models import Formulario, UsuarioAutorizado
+from formapp.cache import invalidar_formulario
+from responseapp.models import RespuestaFormulario, EstadisticasFormulario
+
+
+def _en_papelera(formulario_ids):
+    """Los ids que siguen en la papelera (no se restauraron mientras tanto)."""
+    return [
+        doc["_id"] for doc in Formulario._get_collection().find(
+            {"_id": {"$in": list(formulario_ids)}, "eliminado": True}, {"_id": 1}
+        )
+    ]
+
+
+def _borrar_respuestas(formulario_ids, lote):
+    """
+    Borra las respuestas de los formularios de a `lote` documentos por
+    delete_many. Antes de cada lote se vuelve a comprobar que el formulario
+    siga en la papelera: uno restaurado a mitad de la purga conserva el resto.
+    """
+    coleccion = RespuestaFormulario._get_collection()
+    borradas = 0
+    while True:
+        formulario_ids = _en_papelera(formulario_ids)
+        if not formulario_ids:
+            return borradas
+        ids = [
+            doc["_id"] for doc in coleccion.find(
+                {"formulario": {"$in": formulario_ids}}, {"_id": 1}
+            ).limit(lote)
+        ]
+        if not ids:
+            return borradas
+        borradas += coleccion.delete_many({"_id": {"$in": ids}}).deleted_count
+        if len(ids) < lote:
+            return borradas
+
+
+def eliminar_definitivamente(formulario_ids, lote_respuestas=None):
+    """
+    Borra los formularios indicados y todo lo asociado. Los documentos
+    dependientes se borran primero: si el proceso se corta a mitad, el
+    formulario sigue en la papelera y la próxima purga termina el trabajo.
+    Solo se tocan los que siguen en la papelera (se vuelve a comprobar antes
+    de cada lote de respuestas y antes del resto): uno restaurado entre la
+    selección del lote y el borrado conserva lo que quede.
+    Devuelve {"formularios": n, "respuestas": n, "usuarios_autorizados": n}.
+    """
+    if not formulario_ids:
+        return {"formularios": 0, "respuestas": 0, "usuarios_autorizados": 0}
+
+    respuestas = _borrar_respuestas(formulario_ids, lote_respuestas or settings.PAPELERA_LOTE_RESPUESTAS)
+    formulario_ids = _en_papelera(formulario_ids)
+    if not formulario_ids:
+        return {"formularios": 0, "respuestas": respuestas, "usuarios_autorizados": 0}
+
+    filtro = {"formulario": {"$in": formulario_ids}}
+    usuarios = UsuarioAutorizado._get_collection().delete_many(filtro).deleted_count
+    EstadisticasFormulario._get_collection().delete_many(filtro)
+    formularios = Formulario._get_collection().delete_many(
+        {"_id": {"$in": formulario_ids}, "eliminado": True}
+    ).deleted_count
+
+    for formulario_id in formulario_ids:
+        invalidar_formulario(formulario_id)
+
+    return {"formularios": formularios, "respuestas": respuestas, "usuarios_autorizados": usuarios}
+
+
+def purgar_vencidos(dias=None, lote=None, pausa=None, limite_fecha=None):
+    """
+    Elimina definitivamente, por lotes, los formularios eliminados hace más de
+    `dias` días, esperando `pausa` segundos entre lotes para no saturar la base.
+    Generador: produce el resumen de cada lote a medida que se borra.
+    """
+    dias = settings.PAPELERA_DIAS if dias is None else dias
+    lote = lote or settings.PAPELERA_LOTE
+    pausa = settings.PAPELERA_PAUSA if pausa is None else pausa
+    limite_fecha = limite_fecha or datetime.utcnow() - timedelta(days=dias)
+
+    coleccion = Formulario._get_collection()
+    while True:
+        # Índice parcial sobre fecha_eliminacion (solo eliminados)
+        ids = [
+            doc["_id"] for doc in coleccion.find(
+                {"eliminado": True, "fecha_eliminacion": {"$lte": limite_fecha}},
+                {"_id": 1}
+            ).sort("fecha_eliminacion", 1).limit(lote)
+        ]
+        if not ids:
+            return
+
+        yield eliminar_definitivamente(ids)
+        if len(ids) < lote:
+            return
+        if pausa:
+            time.sleep(pausa)
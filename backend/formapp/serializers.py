@@ -4,10 +4,13 @@ from formapp.models import (
     Validaciones,
     Pregunta,
     ConfiguracionFormulario,
-    Formulario
+    Formulario,
+    UsuarioAutorizado
 )
 from usuarioapp.models import Usuario  # para la referencia del administrador
 from usuarioapp.serializers import UsuarioSerializer
+from responseapp.validadores import invalidar_validador
+from formapp.cache import invalidar_formulario
 
 # -----------------------------
 # Serializers embebidos
@@ -92,8 +95,10 @@ class ConfiguracionFormularioSerializer(serializers.Serializer):
         es_publico = data.get('es_publico', True)
         usuarios_autorizados = data.get('usuarios_autorizados', [])
         
-        # Si el formulario es privado, requiere login y debe tener usuarios autorizados
-        if requerir_login and not es_publico and not usuarios_autorizados:
+        # Si el formulario es privado, requiere login y debe tener usuarios autorizados.
+        # Solo una edición parcial puede omitir la lista: los autorizados ya guardados se mantienen.
+        lista_omitida = self.root.partial and 'usuarios_autorizados' not in data
+        if requerir_login and not es_publico and not lista_omitida and not usuarios_autorizados:
             raise serializers.ValidationError({
                 "usuarios_autorizados": "Un formulario privado con login requerido debe tener al menos un usuario autorizado."
             })
@@ -150,8 +155,10 @@ class FormularioSerializer(serializers.Serializer):
         formulario = Formulario(**validated_data)
         formulario.administrador = admin_ref
 
-        # asignar configuración
+        # asignar configuración (los autorizados van a su propia colección)
+        usuarios_autorizados = None
         if config_data:
+            usuarios_autorizados = config_data.pop('usuarios_autorizados', None)
             formulario.configuracion = ConfiguracionFormulario(**config_data)
 
         # asignar preguntas embebidas
@@ -171,6 +178,8 @@ class FormularioSerializer(serializers.Serializer):
             ]
 
         formulario.save()
+        if usuarios_autorizados:
+            UsuarioAutorizado.agregar(formulario.id, usuarios_autorizados)
         return formulario
     
     def update(self, instance, validated_data):
@@ -180,7 +189,9 @@ class FormularioSerializer(serializers.Serializer):
 
         # --- Actualizar configuración ---
         config_data = validated_data.get('configuracion')
+        usuarios_autorizados = None
         if config_data:
+            usuarios_autorizados = config_data.pop('usuarios_autorizados', None)
             if instance.configuracion:
                 # Actualizar campos de configuración existentes
                 for key, value in config_data.items():
@@ -211,6 +222,18 @@ class FormularioSerializer(serializers.Serializer):
                     )
                 )
             instance.preguntas = nuevas_preguntas
+            instance.version_esquema = (instance.version_esquema or 0) + 1
+
+        if usuarios_autorizados is not None and instance.configuracion:
+            # La lista embebida de formularios viejos pasa a la colección
+            instance.configuracion.usuarios_autorizados = []
 
+        instance.marcar_modificado()
         instance.save()
+        if usuarios_autorizados is not None:
+            UsuarioAutorizado.reemplazar(instance.id, usuarios_autorizados)
+        invalidar_formulario(instance.id)
+
+        if preguntas_data is not None:
+            invalidar_validador(instance.id)
         return instance
\ No newline at end of file
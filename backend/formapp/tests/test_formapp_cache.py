@@ -0,0 +1,79 @@
+# formapp/tests/test_formapp_cache.py
+"""
+Pruebas de la cache de lectura de formularios (formapp/cache.py):
+aciertos por (id, version), invalidación tras escribir y nivel compartido.
+"""
+import pytest
+from bson import ObjectId
+from unittest.mock import patch, MagicMock
+from django.core.cache import caches
+from django.test import override_settings
+from formapp.models import Formulario
+from formapp.cache import (
+    obtener_formulario,
+    invalidar_formulario,
+    estadisticas_cache_formularios,
+    limpiar_cache_formularios,
+)
+
+FORM_ID = "64b7f1e2a3c4d5e6f7a8b9c0"
+
+
+def _patch_objects(version=1, formulario=None):
+    """Helper: Formulario.objects mockeado para la consulta de versión y el get completo."""
+    formulario = formulario or Formulario(id=ObjectId(FORM_ID), titulo="Encuesta", version=version)
+    mock_qs = MagicMock()
+    mock_qs.return_value.only.return_value.as_pymongo.return_value.first.return_value = {"version": version}
+    mock_qs.get.return_value = formulario
+    return patch.object(Formulario, "objects", mock_qs), mock_qs
+
+
+class TestCacheFormularios:
+
+    def test_segunda_lectura_es_hit(self):
+        parche, mock_qs = _patch_objects()
+        with parche:
+            primero = obtener_formulario(FORM_ID)
+            segundo = obtener_formulario(FORM_ID)
+
+        assert primero is segundo
+        mock_qs.get.assert_called_once()
+        metricas = estadisticas_cache_formularios()
+        assert metricas["hits"] == 1 and metricas["misses"] == 1
+        assert metricas["tasa_aciertos"] == 0.5
+
+    def test_invalidar_vuelve_a_leer_la_version(self):
+        parche, mock_qs = _patch_objects(version=1)
+        with parche:
+            obtener_formulario(FORM_ID)
+            invalidar_formulario(FORM_ID)
+            mock_qs.return_value.only.return_value.as_pymongo.return_value.first.return_value = {"version": 2}
+            mock_qs.get.return_value = Formulario(id=ObjectId(FORM_ID), titulo="Editado", version=2)
+            formulario = obtener_formulario(FORM_ID)
+
+        assert formulario.titulo == "Editado"
+        assert mock_qs.get.call_count == 2
+
+    def test_formulario_inexistente_lanza_does_not_exist(self):
+        parche, mock_qs = _patch_objects()
+        mock_qs.return_value.only.return_value.as_pymongo.return_value.first.return_value = None
+        with parche, pytest.raises(Formulario.DoesNotExist):
+            obtener_formulario(FORM_ID)
+
+    @override_settings(
+        FORMULARIOS_CACHE_BACKEND="formularios",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "formularios": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                "LOCATION": "formularios-test"}},
+    )
+    def test_nivel_compartido_evita_la_lectura_completa(self):
+        parche, mock_qs = _patch_objects()
+        with parche:
+            obtener_formulario(FORM_ID)          # miss: llena el nivel compartido
+            limpiar_cache_formularios()          # otro worker: cache local vacía
+            formulario = obtener_formulario(FORM_ID)
+
+        assert formulario.titulo == "Encuesta"
+        mock_qs.get.assert_called_once()
+        assert estadisticas_cache_formularios()["hits_compartido"] == 1
+        caches["formularios"].clear()
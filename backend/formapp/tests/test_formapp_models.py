@@ -5,6 +5,7 @@ Se prueba la lógica de negocio interna de los modelos SIN
 necesidad de conectarse a MongoDB (sin instanciar Document completo).
 """
 import pytest
+from unittest.mock import patch
 from formapp.models import ConfiguracionFormulario
 
 
@@ -85,3 +86,16 @@ class TestConfiguracionFormulario:
         )
         assert config.tiene_acceso("usuario@empresa.com") is True
         assert config.tiene_acceso("USUARIO@EMPRESA.COM") is True
+
+    def test_email_fuera_de_la_lista_embebida_se_busca_en_la_coleccion(self):
+        """
+        Los emails autorizados viven en la colección usuarios_autorizados:
+        si no están en la lista embebida (legado) se consulta el índice.
+        """
+        config = ConfiguracionFormulario(requerir_login=True, es_publico=False)
+        with patch("formapp.models.UsuarioAutorizado.esta_autorizado", return_value=True) as mock_check:
+            assert config.tiene_acceso("Nuevo@Empresa.com", formulario_id="64b7f1e2a3c4d5e6f7a8b9c0") is True
+        mock_check.assert_called_once_with("64b7f1e2a3c4d5e6f7a8b9c0", "nuevo@empresa.com")
+
+        with patch("formapp.models.UsuarioAutorizado.esta_autorizado", return_value=False):
+            assert config.tiene_acceso("otro@empresa.com", formulario_id="64b7f1e2a3c4d5e6f7a8b9c0") is False
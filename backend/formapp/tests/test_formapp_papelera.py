@@ -0,0 +1,121 @@
+# formapp/tests/test_formapp_papelera.py
+"""
+Pruebas de la papelera: el listado es solo lectura y la purga
+(formapp/papelera.py, manage.py purge_papelera) borra por lotes en cascada.
+"""
+from bson import ObjectId
+from unittest.mock import patch, MagicMock
+from django.core.management import call_command
+from django.test import RequestFactory
+from formapp.views import FormularioPapeleraAPI
+from formapp.papelera import eliminar_definitivamente, purgar_vencidos
+
+
+def _colecciones(restaurados=()):
+    """
+    Mocks de las colecciones de formularios, respuestas, estadísticas y autorizados.
+    Los formularios siguen en la papelera salvo los `restaurados`; la consulta de
+    vencidos de la purga queda en cols["vencidos"].
+    """
+    cols = {nombre: MagicMock() for nombre in ("formularios", "respuestas", "estadisticas", "autorizados", "vencidos")}
+    for col in cols.values():
+        col.delete_many.return_value.deleted_count = 0
+
+    def buscar_formularios(filtro, proyeccion=None):
+        if "fecha_eliminacion" in filtro:
+            return cols["vencidos"]
+        return [{"_id": id_} for id_ in filtro["_id"]["$in"] if id_ not in restaurados]
+
+    cols["formularios"].find.side_effect = buscar_formularios
+    cols["respuestas"].find.return_value.limit.return_value = []
+    return cols
+
+
+def _patch_colecciones(cols):
+    return (
+        patch("formapp.papelera.Formulario._get_collection", return_value=cols["formularios"]),
+        patch("formapp.papelera.RespuestaFormulario._get_collection", return_value=cols["respuestas"]),
+        patch("formapp.papelera.EstadisticasFormulario._get_collection", return_value=cols["estadisticas"]),
+        patch("formapp.papelera.UsuarioAutorizado._get_collection", return_value=cols["autorizados"]),
+    )
+
+
+class TestPapelera:
+
+    def test_listado_no_borra_y_pagina(self):
+        admin_id = str(ObjectId())
+        col = MagicMock()
+        col.aggregate.return_value = []
+        request = RequestFactory().get("/api/formularios/papelera/", {"admin": admin_id, "limite": 10})
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col), \
+             patch("formapp.views.EstadisticasFormulario._get_collection", return_value=MagicMock(find=MagicMock(return_value=[]))), \
+             patch("formapp.views.UsuarioAutorizado._get_collection", return_value=MagicMock(aggregate=MagicMock(return_value=[]))):
+            response = FormularioPapeleraAPI.as_view()(request)
+
+        assert response.status_code == 200
+        assert response.data == {"resultados": [], "siguiente": None, "limite": 10}
+        match = col.aggregate.call_args[0][0][0]["$match"]
+        assert match["eliminado"] is True
+        assert match["administrador"] == ObjectId(admin_id)
+        col.delete_many.assert_not_called()
+
+    def test_eliminar_definitivamente_borra_en_cascada(self):
+        cols = _colecciones()
+        respuestas = [{"_id": ObjectId()} for _ in range(3)]
+        cols["respuestas"].find.return_value.limit.side_effect = [respuestas[:2], respuestas[2:]]
+        cols["respuestas"].delete_many.return_value.deleted_count = 2
+        cols["formularios"].delete_many.return_value.deleted_count = 2
+        ids = [ObjectId(), ObjectId()]
+
+        p1, p2, p3, p4 = _patch_colecciones(cols)
+        with p1, p2, p3, p4:
+            resumen = eliminar_definitivamente(ids, lote_respuestas=2)
+
+        assert resumen == {"formularios": 2, "respuestas": 4, "usuarios_autorizados": 0}
+        # Las respuestas se borran por lotes de _id
+        borrados = [c[0][0] for c in cols["respuestas"].delete_many.call_args_list]
+        assert borrados == [{"_id": {"$in": [r["_id"] for r in respuestas[:2]]}},
+                            {"_id": {"$in": [respuestas[2]["_id"]]}}]
+        assert cols["respuestas"].find.call_args[0][0] == {"formulario": {"$in": ids}}
+        for nombre in ("estadisticas", "autorizados"):
+            cols[nombre].delete_many.assert_called_once_with({"formulario": {"$in": ids}})
+        cols["formularios"].delete_many.assert_called_once_with({"_id": {"$in": ids}, "eliminado": True})
+
+    def test_formulario_restaurado_conserva_sus_respuestas(self):
+        restaurado, en_papelera = ObjectId(), ObjectId()
+        cols = _colecciones(restaurados={restaurado})
+
+        p1, p2, p3, p4 = _patch_colecciones(cols)
+        with p1, p2, p3, p4:
+            eliminar_definitivamente([restaurado, en_papelera])
+
+        assert cols["respuestas"].find.call_args[0][0] == {"formulario": {"$in": [en_papelera]}}
+        cols["autorizados"].delete_many.assert_called_once_with({"formulario": {"$in": [en_papelera]}})
+        cols["formularios"].delete_many.assert_called_once_with({"_id": {"$in": [en_papelera]}, "eliminado": True})
+
+    def test_purga_por_lotes_hasta_vaciar(self):
+        cols = _colecciones()
+        lotes = [[{"_id": ObjectId()}, {"_id": ObjectId()}], [{"_id": ObjectId()}]]
+        cols["vencidos"].sort.return_value.limit.side_effect = lotes
+
+        p1, p2, p3, p4 = _patch_colecciones(cols)
+        with p1, p2, p3, p4, patch("formapp.papelera.time.sleep") as mock_sleep:
+            resumenes = list(purgar_vencidos(dias=30, lote=2, pausa=0.5))
+
+        assert len(resumenes) == 2
+        assert cols["formularios"].delete_many.call_count == 2
+        mock_sleep.assert_called_once_with(0.5)
+        filtro = cols["formularios"].find.call_args_list[0][0][0]
+        assert filtro["eliminado"] is True and "$lte" in filtro["fecha_eliminacion"]
+
+    def test_comando_suma_los_lotes(self):
+        resumenes = [{"formularios": 2, "respuestas": 5, "usuarios_autorizados": 1},
+                     {"formularios": 1, "respuestas": 0, "usuarios_autorizados": 0}]
+        salida = MagicMock()
+        with patch("formapp.management.commands.purge_papelera.purgar_vencidos",
+                   return_value=iter(resumenes)) as mock_purgar:
+            call_command("purge_papelera", "--dias", "7", "--lote", "50", stdout=salida)
+
+        mock_purgar.assert_called_once_with(7, 50, 0.5)
+        assert "3 formulario(s)" in salida.write.call_args[0][0]
@@ -10,6 +10,7 @@ from formapp.serializers import (
     OpcionSerializer,
     ValidacionesSerializer,
     ConfiguracionFormularioSerializer,
+    FormularioSerializer,
 )
 
 
@@ -157,6 +158,21 @@ class TestConfiguracionFormularioSerializer:
         assert not serializer.is_valid()
         assert "usuarios_autorizados" in str(serializer.errors)
 
+    def test_formulario_privado_nuevo_sin_la_lista_es_invalido(self):
+        """Al crear, omitir usuarios_autorizados equivale a enviarla vacía."""
+        serializer = FormularioSerializer(data={
+            "titulo": "Privado", "preguntas": [],
+            "configuracion": {"requerir_login": True, "es_publico": False},
+        })
+        assert not serializer.is_valid()
+        assert "usuarios_autorizados" in str(serializer.errors)
+
+    def test_edicion_parcial_sin_la_lista_conserva_los_autorizados(self):
+        serializer = ConfiguracionFormularioSerializer(
+            data={"requerir_login": True, "es_publico": False}, partial=True
+        )
+        assert serializer.is_valid(), f"Errores: {serializer.errors}"
+
     def test_formulario_privado_sin_login_es_invalido(self):
         """
         No tiene sentido configurar un formulario como privado
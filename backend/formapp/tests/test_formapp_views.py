@@ -10,7 +10,15 @@ con mocks de MongoDB.
 import pytest
 from unittest.mock import patch, MagicMock, PropertyMock
 from django.test import RequestFactory
-from formapp.views import FormularioDetailAPI, FormularioListCreateAPI
+from formapp.views import (
+    FormularioDetailAPI,
+    FormularioListCreateAPI,
+    EnviarInvitacionesAPI,
+    FormularioAgregarUsuarioAPI,
+    FormularioRemoverUsuarioAPI,
+    FormularioImportarUsuariosAPI,
+    FormularioListarUsuariosAPI,
+)
 
 
 def _make_mock_formulario(titulo="Encuesta Test", n_preguntas=2):
@@ -63,6 +71,60 @@ class TestFormularioListCreateAPI:
         assert response.status_code == 400
         assert "administrador" in str(response.data)
 
+    def test_resumen_proyecta_conteos_y_pagina(self):
+        """
+        ?resumen=1 no trae preguntas: devuelve conteos, los totales de respuestas
+        de EstadisticasFormulario y el token de la página siguiente.
+        """
+        from datetime import datetime
+        from bson import ObjectId
+        docs = [
+            {"_id": ObjectId(), "titulo": f"Form {i}", "fecha_creacion": datetime(2025, 1, 3 - i),
+             "configuracion": {"privado": False}, "total_preguntas": 4, "total_autorizados": 0}
+            for i in range(3)
+        ]
+        col_forms = MagicMock()
+        col_forms.aggregate.return_value = iter(docs)
+        col_est = MagicMock()
+        col_est.find.return_value = [{"formulario": docs[0]["_id"], "total_respuestas": 7}]
+        request = self.factory.get("/api/formularios/", {
+            "admin": "64b7f1e2a3c4d5e6f7a8b9d1", "resumen": "1", "limite": "2"
+        })
+
+        col_aut = MagicMock()
+        col_aut.aggregate.return_value = [{"_id": docs[1]["_id"], "total": 5}]
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col_forms), \
+             patch("formapp.views.EstadisticasFormulario._get_collection", return_value=col_est), \
+             patch("formapp.views.UsuarioAutorizado._get_collection", return_value=col_aut):
+            response = self.view(request)
+
+        assert response.status_code == 200
+        assert [f["titulo"] for f in response.data["resultados"]] == ["Form 0", "Form 1"]
+        assert response.data["resultados"][0]["total_respuestas"] == 7
+        assert response.data["resultados"][1]["total_respuestas"] == 0
+        assert response.data["resultados"][1]["total_autorizados"] == 5
+        assert "preguntas" not in response.data["resultados"][0]
+        assert response.data["siguiente"] is not None
+        pipeline = col_forms.aggregate.call_args[0][0]
+        assert pipeline[2] == {"$limit": 3}
+
+    @pytest.mark.parametrize("contenido", ['{"f": null, "id": "zzz"}', '{"id": "64b7f1e2a3c4d5e6f7a8b9c0"}', '[]'])
+    def test_resumen_token_manipulado_retorna_400(self, contenido):
+        import base64
+        token = base64.urlsafe_b64encode(contenido.encode()).decode()
+        request = self.factory.get("/api/formularios/", {"resumen": "1", "siguiente": token})
+        with patch("formapp.views.Formulario._get_collection") as mock_col:
+            response = self.view(request)
+
+        assert response.status_code == 400
+        mock_col.assert_not_called()
+
+    def test_resumen_limite_invalido_retorna_400(self):
+        request = self.factory.get("/api/formularios/", {"resumen": "1", "limite": "muchos"})
+        response = self.view(request)
+        assert response.status_code == 400
+
 
 class TestFormularioDetailAPI:
     """
@@ -147,3 +209,203 @@ class TestFormularioDetailAPI:
         data = response.data
         assert "titulo" in data
         assert data["titulo"] == "Encuesta de Satisfacción"
+
+    # ──────────────────────────────────────────────────
+    # ETag / If-None-Match
+    # ──────────────────────────────────────────────────
+
+    def test_obtener_formulario_incluye_etag_y_last_modified(self):
+        from datetime import datetime
+        mock_form = _make_mock_formulario()
+        mock_form.version = 3
+        mock_form.fecha_modificacion = datetime(2025, 5, 1, 12, 0, 0)
+        request = self.factory.get(f"/api/formularios/{mock_form.id}/")
+
+        with patch("formapp.views.Formulario.objects") as mock_qs:
+            mock_qs.get.return_value = mock_form
+            response = self.view(request, id=str(mock_form.id))
+
+        assert response.status_code == 200
+        assert response["ETag"] == '"3"'
+        assert response["Last-Modified"] == "Thu, 01 May 2025 12:00:00 GMT"
+
+    def test_etag_vigente_retorna_304_sin_serializar(self):
+        form_id = "64b7f1e2a3c4d5e6f7a8b9c0"
+        request = self.factory.get(f"/api/formularios/{form_id}/", HTTP_IF_NONE_MATCH='"3"')
+        col = MagicMock()
+        col.find_one.return_value = {"_id": form_id, "version": 3}
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col), \
+             patch("formapp.views.Formulario.objects") as mock_qs:
+            response = self.view(request, id=form_id)
+
+        assert response.status_code == 304
+        assert response["ETag"] == '"3"'
+        mock_qs.get.assert_not_called()
+
+    def test_if_modified_since_ignora_los_milisegundos(self):
+        from datetime import datetime
+        form_id = "64b7f1e2a3c4d5e6f7a8b9c0"
+        request = self.factory.get(f"/api/formularios/{form_id}/",
+                                   HTTP_IF_MODIFIED_SINCE="Thu, 01 May 2025 12:00:00 GMT")
+        col = MagicMock()
+        col.find_one.return_value = {"_id": form_id, "version": 3,
+                                     "fecha_modificacion": datetime(2025, 5, 1, 12, 0, 0, 750000)}
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col), \
+             patch("formapp.views.Formulario.objects") as mock_qs:
+            response = self.view(request, id=form_id)
+
+        assert response.status_code == 304
+        assert response["Last-Modified"] == "Thu, 01 May 2025 12:00:00 GMT"
+        mock_qs.get.assert_not_called()
+
+    def test_etag_viejo_retorna_formulario_completo(self):
+        mock_form = _make_mock_formulario()
+        mock_form.version = 4
+        form_id = str(mock_form.id)
+        request = self.factory.get(f"/api/formularios/{form_id}/", HTTP_IF_NONE_MATCH='"3"')
+        col = MagicMock()
+        col.find_one.return_value = {"_id": form_id, "version": 4}
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col), \
+             patch("formapp.views.Formulario.objects") as mock_qs:
+            mock_qs.get.return_value = mock_form
+            response = self.view(request, id=form_id)
+
+        assert response.status_code == 200
+        assert response["ETag"] == '"4"'
+
+
+class TestEnviarInvitacionesAPI:
+    """
+    Las invitaciones se encolan todas de una vez en lotes y la respuesta trae
+    el resultado por destinatario.
+    """
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = EnviarInvitacionesAPI.as_view()
+
+    def test_invitaciones_se_encolan_en_un_solo_lote(self):
+        mock_form = _make_mock_formulario()
+        mock_form.configuracion = MagicMock()
+        mock_form.configuracion.usuarios_autorizados = ["a@example.com", "no-es-email"]
+        form_id = "64b7f1e2a3c4d5e6f7a8b9c0"
+        request = self.factory.post(
+            f"/api/formularios/{form_id}/enviar-invitaciones/",
+            {"user_id": mock_form.administrador.id},
+            content_type="application/json",
+        )
+
+        with patch("formapp.views.Formulario.objects") as mock_qs, \
+             patch("formapp.views.UsuarioAutorizado.emails", return_value=["b@example.com", "a@example.com"]), \
+             patch("utils.email_utils.encolar_lote") as mock_lote:
+            mock_qs.get.return_value = mock_form
+            response = self.view(request, form_id=form_id)
+
+        assert response.status_code == 200
+        mock_lote.assert_called_once()
+        assert mock_lote.call_args[0][0] == ["a@example.com", "b@example.com"]
+        assert response.data["enviados"] == 2
+        assert response.data["fallidos"] == ["no-es-email"]
+        assert response.data["resultados"]["no-es-email"] == "email_invalido"
+
+
+class TestUsuariosAutorizadosAPI:
+    """
+    Usuarios autorizados en su propia colección con índice único (formulario, email):
+    agregar / remover / importar son una operación sobre el índice, sin cargar el formulario.
+    """
+    FORM_ID = "64b7f1e2a3c4d5e6f7a8b9c0"
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+
+    def test_agregar_inserta_email_normalizado(self):
+        request = self.factory.post(f"/api/formularios/{self.FORM_ID}/agregar-usuario/",
+                                    {"email": " Nuevo@Example.com "}, content_type="application/json")
+
+        with patch("formapp.views._formulario_existe", return_value=True), \
+             patch("formapp.views.UsuarioAutorizado.agregar_uno", return_value=True) as mock_agregar, \
+             patch("formapp.views.UsuarioAutorizado.contar", return_value=3):
+            response = FormularioAgregarUsuarioAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 200
+        assert response.data["total_usuarios"] == 3
+        mock_agregar.assert_called_once_with(self.FORM_ID, "nuevo@example.com")
+
+    def test_agregar_email_existente_no_modifica(self):
+        request = self.factory.post(f"/api/formularios/{self.FORM_ID}/agregar-usuario/",
+                                    {"email": "ya@example.com"}, content_type="application/json")
+
+        with patch("formapp.views._formulario_existe", return_value=True), \
+             patch("formapp.views.UsuarioAutorizado.agregar_uno", return_value=False):
+            response = FormularioAgregarUsuarioAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 200
+        assert "ya está" in response.data["message"]
+
+    def test_remover_email_ausente_retorna_404(self):
+        col = MagicMock()
+        col.update_one.return_value.modified_count = 0
+        request = self.factory.delete(f"/api/formularios/{self.FORM_ID}/remover-usuario/",
+                                      {"email": "nadie@example.com"}, content_type="application/json")
+
+        with patch("formapp.views.Formulario._get_collection", return_value=col), \
+             patch("formapp.views._formulario_existe", return_value=True), \
+             patch("formapp.views.UsuarioAutorizado.quitar", return_value=False):
+            response = FormularioRemoverUsuarioAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 404
+        assert "no está" in response.data["error"]
+
+    def test_importar_json_cuenta_agregados_duplicados_e_invalidos(self):
+        emails = ["A@example.com", "a@example.com", "ya@example.com", "b@example.com", "malo"]
+        request = self.factory.post(f"/api/formularios/{self.FORM_ID}/importar-usuarios/",
+                                    {"emails": emails}, content_type="application/json")
+
+        # "ya@example.com" ya estaba: el índice único lo descarta
+        with patch("formapp.views._formulario_existe", return_value=True), \
+             patch("formapp.views.UsuarioAutorizado.agregar", return_value=2) as mock_agregar, \
+             patch("formapp.views.UsuarioAutorizado.contar", return_value=3):
+            response = FormularioImportarUsuariosAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 200
+        assert response.data["agregados"] == 2
+        assert response.data["duplicados"] == 2
+        assert response.data["invalidos"] == 1
+        mock_agregar.assert_called_once_with(self.FORM_ID, ["a@example.com", "ya@example.com", "b@example.com"])
+
+    def test_importar_csv_toma_solo_celdas_con_email(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        archivo = SimpleUploadedFile("usuarios.csv", b"email,nombre\nuno@example.com,Uno\ndos@example.com,Dos\n")
+        request = self.factory.post(f"/api/formularios/{self.FORM_ID}/importar-usuarios/", {"archivo": archivo})
+
+        with patch("formapp.views._formulario_existe", return_value=True), \
+             patch("formapp.views.UsuarioAutorizado.agregar", return_value=2) as mock_agregar, \
+             patch("formapp.views.UsuarioAutorizado.contar", return_value=2):
+            response = FormularioImportarUsuariosAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 200
+        assert response.data["agregados"] == 2
+        assert response.data["invalidos"] == 0
+        mock_agregar.assert_called_once_with(self.FORM_ID, ["uno@example.com", "dos@example.com"])
+
+    def test_listar_pagina_por_email_e_incluye_legado_en_primera_pagina(self):
+        mock_form = MagicMock()
+        mock_form.id = self.FORM_ID
+        mock_form.configuracion.usuarios_autorizados = ["legado@example.com"]
+        request = self.factory.get(f"/api/formularios/{self.FORM_ID}/usuarios-autorizados/", {"limite": 2})
+
+        with patch("formapp.views.obtener_formulario", return_value=mock_form), \
+             patch("formapp.views.UsuarioAutorizado.emails",
+                   return_value=["a@example.com", "b@example.com", "c@example.com"]) as mock_emails, \
+             patch("formapp.views.UsuarioAutorizado.contar", return_value=3):
+            response = FormularioListarUsuariosAPI.as_view()(request, id=self.FORM_ID)
+
+        assert response.status_code == 200
+        assert response.data["usuarios_autorizados"] == ["legado@example.com", "a@example.com", "b@example.com"]
+        assert response.data["siguiente"] == "b@example.com"
+        assert response.data["total"] == 4
+        mock_emails.assert_called_once_with(self.FORM_ID, desde=None, limite=3)
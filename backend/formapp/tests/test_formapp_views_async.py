@@ -0,0 +1,140 @@
+# formapp/tests/test_formapp_views_async.py
+"""
+Vistas async del modo ASGI: mismas respuestas que las vistas sync, con las
+consultas a MongoDB por el cliente async (colecciones mockeadas con AsyncMock).
+"""
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+from bson import DBRef, ObjectId
+from django.test import RequestFactory
+from formapp.views_async import FormularioDetailAsyncAPI, FormularioAccesoAsyncAPI, EnviarInvitacionesAsyncAPI
+
+FORM_ID = "64b7f1e2a3c4d5e6f7a8b9c0"
+ADMIN_ID = "64b7f1e2a3c4d5e6f7a8b9d1"
+
+
+def _son_formulario(version=2, **extra):
+    son = {
+        "_id": ObjectId(FORM_ID),
+        "titulo": "Encuesta Async",
+        "descripcion": "",
+        "administrador": ObjectId(ADMIN_ID),
+        "preguntas": [],
+        "version": version,
+    }
+    son.update(extra)
+    return son
+
+
+def _coleccion(*documentos):
+    col = MagicMock()
+    col.find_one = AsyncMock(side_effect=list(documentos))
+    col.insert_many = AsyncMock()
+    return col
+
+
+class TestFormularioDetailAsyncAPI:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = FormularioDetailAsyncAPI.as_view()
+
+    def test_lee_formulario_y_administrador_con_el_cliente_async(self):
+        col_forms = _coleccion({"version": 2}, _son_formulario())
+        col_usuarios = _coleccion({"_id": ObjectId(ADMIN_ID), "nombre": "Ana", "email": "ana@example.com"})
+
+        with patch("formapp.cache.coleccion_async", return_value=col_forms), \
+             patch("formapp.views_async.coleccion_async", return_value=col_usuarios):
+            response = asyncio.run(self.view(self.factory.get(f"/api/formularios/{FORM_ID}/"), id=FORM_ID))
+
+        assert response.status_code == 200
+        assert response.data["titulo"] == "Encuesta Async"
+        assert response["ETag"] == '"2"'
+        assert col_usuarios.find_one.call_args[0][0] == {"_id": ObjectId(ADMIN_ID)}
+
+    def test_etag_vigente_retorna_304_sin_cargar_el_formulario(self):
+        col = _coleccion({"_id": ObjectId(FORM_ID), "version": 3})
+        request = self.factory.get(f"/api/formularios/{FORM_ID}/", HTTP_IF_NONE_MATCH='"3"')
+
+        with patch("formapp.views_async.coleccion_async", return_value=col), \
+             patch("formapp.views_async.obtener_formulario_async") as mock_obtener:
+            response = asyncio.run(self.view(request, id=FORM_ID))
+
+        assert response.status_code == 304
+        mock_obtener.assert_not_called()
+
+    def test_formulario_inexistente_retorna_404(self):
+        with patch("formapp.cache.coleccion_async", return_value=_coleccion(None)):
+            response = asyncio.run(self.view(self.factory.get(f"/api/formularios/{FORM_ID}/"), id=FORM_ID))
+
+        assert response.status_code == 404
+
+
+class TestFormularioAccesoAsyncAPI:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = FormularioAccesoAsyncAPI.as_view()
+
+    def _verificar(self, autorizado):
+        son = _son_formulario(configuracion={"requerir_login": True, "es_publico": False, "usuarios_autorizados": []})
+        col_forms = _coleccion({"version": 2}, son)
+        col_autorizados = _coleccion({"_id": ObjectId()} if autorizado else None)
+        request = self.factory.get(f"/api/formularios/{FORM_ID}/verificar-acceso/?email=Ana@Example.com")
+
+        with patch("formapp.cache.coleccion_async", return_value=col_forms), \
+             patch("formapp.models.coleccion_async", return_value=col_autorizados):
+            response = asyncio.run(self.view(request, id=FORM_ID))
+        return response, col_autorizados
+
+    def test_email_autorizado_en_el_indice(self):
+        response, col = self._verificar(autorizado=True)
+
+        assert response.status_code == 200
+        assert response.data["tiene_acceso"] is True
+        assert col.find_one.call_args[0][0] == {"formulario": ObjectId(FORM_ID), "email": "ana@example.com"}
+
+    def test_email_no_autorizado_retorna_403(self):
+        response, _ = self._verificar(autorizado=False)
+        assert response.status_code == 403
+
+
+class TestEnviarInvitacionesAsyncAPI:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = EnviarInvitacionesAsyncAPI.as_view()
+
+    def _form(self):
+        form = MagicMock()
+        form.id = ObjectId(FORM_ID)
+        form.titulo = "Encuesta"
+        form.descripcion = ""
+        form._data = {"administrador": DBRef("usuarios", ObjectId(ADMIN_ID))}
+        form.configuracion.usuarios_autorizados = ["a@example.com", "no-es-email"]
+        return form
+
+    def _post(self, user_id, col_correos):
+        request = self.factory.post(f"/api/formularios/{FORM_ID}/invitar/", {"user_id": user_id},
+                                    content_type="application/json")
+        with patch("formapp.views_async.obtener_formulario_async", AsyncMock(return_value=self._form())), \
+             patch("formapp.views_async.UsuarioAutorizado.emails_async", AsyncMock(return_value=["b@example.com"])), \
+             patch("utils.email_outbox.coleccion_async", return_value=col_correos):
+            return asyncio.run(self.view(request, form_id=FORM_ID))
+
+    def test_encola_un_lote_con_el_cliente_async(self):
+        col = _coleccion()
+        response = self._post(ADMIN_ID, col)
+
+        assert response.status_code == 200
+        assert response.data["enviados"] == 2
+        assert response.data["fallidos"] == ["no-es-email"]
+        lote = col.insert_many.call_args[0][0]
+        assert len(lote) == 1 and lote[0]["destinatarios"] == ["a@example.com", "b@example.com"]
+
+    def test_otro_usuario_recibe_403(self):
+        col = _coleccion()
+        response = self._post("64b7f1e2a3c4d5e6f7a8b9ff", col)
+
+        assert response.status_code == 403
+        col.insert_many.assert_not_called()
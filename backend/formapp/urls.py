@@ -1,4 +1,5 @@
 # formapp/urls.py
+from django.conf import settings
 from django.urls import path
 from formapp.views import (
     FormularioListCreateAPI, 
@@ -6,6 +7,7 @@ from formapp.views import (
     FormularioAccesoAPI,
     FormularioAgregarUsuarioAPI,
     FormularioRemoverUsuarioAPI,
+    FormularioImportarUsuariosAPI,
     FormularioListarUsuariosAPI,
     EnviarInvitacionesAPI,
     FormularioPapeleraAPI,
@@ -14,6 +16,14 @@ from formapp.views import (
 )
 from responseapp.views import FormularioEstadisticasAPI, FormularioExportarAPI
 
+# Despliegue ASGI: endpoints de I/O con vistas async (ver formapp/views_async.py)
+if settings.SERVIDOR_ASGI:
+    from formapp.views_async import (
+        FormularioDetailAsyncAPI as FormularioDetailAPI,
+        FormularioAccesoAsyncAPI as FormularioAccesoAPI,
+        EnviarInvitacionesAsyncAPI as EnviarInvitacionesAPI,
+    )
+
 urlpatterns = [
     # Rutas existentes
     path('', FormularioListCreateAPI.as_view(), name='form_list_create'),
@@ -27,6 +37,7 @@ urlpatterns = [
     path('<str:id>/usuarios-autorizados/', FormularioListarUsuariosAPI.as_view(), name='form_listar_usuarios'),
     path('<str:id>/agregar-usuario/', FormularioAgregarUsuarioAPI.as_view(), name='form_agregar_usuario'),
     path('<str:id>/remover-usuario/', FormularioRemoverUsuarioAPI.as_view(), name='form_remover_usuario'),
+    path('<str:id>/importar-usuarios/', FormularioImportarUsuariosAPI.as_view(), name='form_importar_usuarios'),
     
     # 🆕 Ruta de invitaciones (SIN duplicar "formularios/")
     path('<str:form_id>/invitar/', EnviarInvitacionesAPI.as_view(), name='enviar_invitaciones'),
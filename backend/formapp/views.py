@@ -1,447 +1,668 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
-from bson import ObjectId
-from formapp.models import Formulario, ConfiguracionFormulario
-from formapp.serializers import FormularioSerializer
-from utils.email_utils import send_form_invitation
-from mongoengine.errors import DoesNotExist
-from datetime import datetime, timedelta
-
-
-class FormularioListCreateAPI(APIView):
-    """GET: listar formularios (con filtro opcional ?admin=ID)
-       POST: crear nuevo formulario"""
-
-    def get(self, request):
-        admin_id = request.GET.get("admin")  # ?admin=<id_usuario>
-        if admin_id:
-            formularios = Formulario.objects(administrador=admin_id, eliminado__ne=True)
-        else:
-            formularios = Formulario.objects(eliminado__ne=True)
-
-        serializer = FormularioSerializer(formularios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-    def post(self, request):
-        serializer = FormularioSerializer(data=request.data)
-        if serializer.is_valid():
-            formulario = serializer.save()
-            return Response({
-                "message": "Formulario creado correctamente",
-                "id": str(formulario.id)
-            }, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-
-class FormularioDetailAPI(APIView):
-    """GET, PUT, DELETE por ID"""
-
-    def get_object(self, id):
-        try:
-            return Formulario.objects.get(id=ObjectId(id))
-        except Formulario.DoesNotExist:
-            return None
-
-    def get(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = FormularioSerializer(formulario)
-        return Response(serializer.data)
-
-    def put(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
-
-        serializer = FormularioSerializer(formulario, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Formulario actualizado correctamente"})
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-    def delete(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
-        formulario.eliminado = True
-        formulario.fecha_eliminacion = datetime.utcnow()
-        if formulario.configuracion:
-            formulario.configuracion.privado = True
-        formulario.save()
-        return Response({"message": "Formulario eliminado lógicamente"}, status=status.HTTP_204_NO_CONTENT)
-
-
-class FormularioAccesoAPI(APIView):
-    """
-    Verifica si un usuario tiene acceso para responder un formulario.
-    GET: /api/formularios/{id}/verificar-acceso/?email=user@example.com
-    """
-
-    def get_object(self, id):
-        try:
-            return Formulario.objects.get(id=ObjectId(id))
-        except Formulario.DoesNotExist:
-            return None
-
-    def get(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({
-                "error": "Formulario no encontrado"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        if formulario.eliminado:
-            return Response({
-                "error": "Este formulario ha sido eliminado y no acepta respuestas"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        # Obtener el email del usuario desde los query params o desde Firebase auth
-        email = request.GET.get('email')
-        
-        # Si no viene el email en los params, intentar obtenerlo del usuario autenticado
-        # Asumiendo que tienes el email en request.user (ajusta según tu implementación de Firebase)
-        if not email and hasattr(request, 'user') and hasattr(request.user, 'email'):
-            email = request.user.email
-
-        # Verificar si el formulario requiere login
-        if formulario.configuracion and formulario.configuracion.requerir_login:
-            if not email:
-                return Response({
-                    "tiene_acceso": False,
-                    "razon": "Se requiere iniciar sesión para acceder a este formulario",
-                    "requerir_login": True
-                }, status=status.HTTP_401_UNAUTHORIZED)
-
-            # Verificar acceso usando el método del modelo
-            tiene_acceso = formulario.usuario_puede_responder(email)
-            
-            if not tiene_acceso:
-                return Response({
-                    "tiene_acceso": False,
-                    "razon": "No tienes autorización para acceder a este formulario privado",
-                    "requerir_login": True,
-                    "es_publico": formulario.configuracion.es_publico
-                }, status=status.HTTP_403_FORBIDDEN)
-
-            return Response({
-                "tiene_acceso": True,
-                "requerir_login": True,
-                "es_publico": formulario.configuracion.es_publico,
-                "formulario": {
-                    "id": str(formulario.id),
-                    "titulo": formulario.titulo,
-                    "descripcion": formulario.descripcion
-                }
-            }, status=status.HTTP_200_OK)
-        
-        # Si no requiere login, todos tienen acceso
-        return Response({
-            "tiene_acceso": True,
-            "requerir_login": False,
-            "formulario": {
-                "id": str(formulario.id),
-                "titulo": formulario.titulo,
-                "descripcion": formulario.descripcion
-            }
-        }, status=status.HTTP_200_OK)
-
-
-class FormularioAgregarUsuarioAPI(APIView):
-    """
-    Agrega un usuario a la lista de usuarios autorizados de un formulario privado.
-    POST: /api/formularios/{id}/agregar-usuario/
-    Body: { "email": "usuario@example.com" }
-    """
-
-    def get_object(self, id):
-        try:
-            return Formulario.objects.get(id=ObjectId(id))
-        except Formulario.DoesNotExist:
-            return None
-
-    def post(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({
-                "error": "Formulario no encontrado"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        email = request.data.get('email')
-        if not email:
-            return Response({
-                "error": "El campo 'email' es requerido"
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        # Validar que el email tenga formato correcto
-        from django.core.validators import validate_email
-        from django.core.exceptions import ValidationError
-        try:
-            validate_email(email)
-        except ValidationError:
-            return Response({
-                "error": "Formato de email inválido"
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        # Normalizar email
-        email = email.lower().strip()
-
-        # Verificar que el formulario tenga configuración
-        if not formulario.configuracion:
-            formulario.configuracion = ConfiguracionFormulario()
-
-        # Agregar el email si no existe
-        if not formulario.configuracion.usuarios_autorizados:
-            formulario.configuracion.usuarios_autorizados = []
-
-        if email in formulario.configuracion.usuarios_autorizados:
-            return Response({
-                "message": "El usuario ya está en la lista de autorizados"
-            }, status=status.HTTP_200_OK)
-
-        formulario.configuracion.usuarios_autorizados.append(email)
-        formulario.save()
-
-        return Response({
-            "message": "Usuario agregado correctamente",
-            "email": email,
-            "total_usuarios": len(formulario.configuracion.usuarios_autorizados)
-        }, status=status.HTTP_200_OK)
-
-
-class FormularioRemoverUsuarioAPI(APIView):
-    """
-    Remueve un usuario de la lista de usuarios autorizados de un formulario privado.
-    DELETE: /api/formularios/{id}/remover-usuario/
-    Body: { "email": "usuario@example.com" }
-    """
-
-    def get_object(self, id):
-        try:
-            return Formulario.objects.get(id=ObjectId(id))
-        except Formulario.DoesNotExist:
-            return None
-
-    def delete(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({
-                "error": "Formulario no encontrado"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        email = request.data.get('email')
-        if not email:
-            return Response({
-                "error": "El campo 'email' es requerido"
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        # Normalizar email
-        email = email.lower().strip()
-
-        # Verificar que el formulario tenga configuración y usuarios
-        if not formulario.configuracion or not formulario.configuracion.usuarios_autorizados:
-            return Response({
-                "error": "Este formulario no tiene usuarios autorizados"
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        if email not in formulario.configuracion.usuarios_autorizados:
-            return Response({
-                "error": "El usuario no está en la lista de autorizados"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        formulario.configuracion.usuarios_autorizados.remove(email)
-        formulario.save()
-
-        return Response({
-            "message": "Usuario removido correctamente",
-            "email": email,
-            "total_usuarios": len(formulario.configuracion.usuarios_autorizados)
-        }, status=status.HTTP_200_OK)
-
-
-class FormularioListarUsuariosAPI(APIView):
-    """
-    Lista todos los usuarios autorizados de un formulario privado.
-    GET: /api/formularios/{id}/usuarios-autorizados/
-    """
-
-    def get_object(self, id):
-        try:
-            return Formulario.objects.get(id=ObjectId(id))
-        except Formulario.DoesNotExist:
-            return None
-
-    def get(self, request, id):
-        formulario = self.get_object(id)
-        if not formulario:
-            return Response({
-                "error": "Formulario no encontrado"
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        usuarios = []
-        if formulario.configuracion and formulario.configuracion.usuarios_autorizados:
-            usuarios = formulario.configuracion.usuarios_autorizados
-
-        return Response({
-            "formulario_id": str(formulario.id),
-            "titulo": formulario.titulo,
-            "es_publico": formulario.configuracion.es_publico if formulario.configuracion else True,
-            "usuarios_autorizados": usuarios,
-            "total": len(usuarios)
-        }, status=status.HTTP_200_OK)
-    
-
-class EnviarInvitacionesAPI(APIView):
-    """
-    POST: Enviar invitaciones por email a usuarios autorizados
-    """
-    
-    def post(self, request, form_id):
-        print(f"🔔 Solicitud de invitaciones para formulario: {form_id}")
-        
-        try:
-            # Importar aquí para evitar errores de importación circular
-            from utils.email_utils import send_form_invitation
-            
-            # Obtener el formulario
-            try:
-                form = Formulario.objects.get(id=ObjectId(form_id))
-            except DoesNotExist:
-                print(f"❌ Formulario {form_id} no encontrado")
-                return Response(
-                    {"error": "Formulario no encontrado"},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            # Validar que el usuario sea el administrador
-            user_id = request.data.get("user_id")
-            admin_id = str(form.administrador.id) if form.administrador else None
-            
-            print(f"👤 Usuario solicitante: {user_id}")
-            print(f"👤 Administrador del form: {admin_id}")
-            
-            if str(user_id) != admin_id:
-                return Response(
-                    {"error": "No tienes permiso para enviar invitaciones"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Obtener usuarios autorizados
-            usuarios = []
-            if hasattr(form, 'configuracion') and form.configuracion:
-                usuarios = getattr(form.configuracion, 'usuarios_autorizados', [])
-            
-            print(f"📧 Usuarios autorizados: {usuarios}")
-            
-            if not usuarios:
-                return Response(
-                    {"error": "No hay usuarios autorizados en este formulario"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Construir el enlace del formulario
-            # 🔗 Para desarrollo local
-            form_link = f"https://form-creator-rosy.vercel.app/form/{form_id}/answer"
-            
-            # 🔗 Para producción (descomentar cuando esté desplegado)
-            # origin = request.META.get('HTTP_ORIGIN', 'https://tudominio.com')
-            # form_link = f"{origin}/form/{form_id}/answer"
-            
-            print(f"🔗 Link del formulario: {form_link}")
-            
-            # Enviar emails
-            enviados = 0
-            fallidos = []
-            
-            for email in usuarios:
-                print(f"📤 Enviando invitación a: {email}")
-                try:
-                    exito = send_form_invitation(
-                        recipient_email=email,
-                        form_title=form.titulo,
-                        form_description=form.descripcion or "",
-                        form_link=form_link
-                    )
-                    
-                    if exito:
-                        enviados += 1
-                        print(f"✅ Invitación enviada a {email}")
-                    else:
-                        fallidos.append(email)
-                        print(f"❌ Falló el envío a {email}")
-                except Exception as e:
-                    print(f"❌ Error enviando a {email}: {e}")
-                    fallidos.append(email)
-            
-            resultado = {
-                "message": f"Invitaciones enviadas: {enviados}/{len(usuarios)}",
-                "enviados": enviados,
-                "total": len(usuarios),
-                "fallidos": fallidos
-            }
-            
-            print(f"📊 Resultado final: {resultado}")
-            
-            return Response(resultado, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            import traceback
-            print("❌ Error general al enviar invitaciones:")
-            traceback.print_exc()
-            return Response(
-                {"error": f"Error interno: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-
-class FormularioPapeleraAPI(APIView):
-    """GET: Listar formularios en papelera para un administrador"""
-    
-    def get(self, request):
-        admin_id = request.GET.get("admin")
-        if not admin_id:
-            return Response({"error": "Se requiere el parámetro admin"}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # Lógica de eliminación automática (30 días)
-        limite_dias = datetime.utcnow() - timedelta(days=30)
-        
-        # Eliminar definitivamente los que pasaron de 30 días
-        viejos = Formulario.objects(administrador=admin_id, eliminado=True, fecha_eliminacion__lte=limite_dias)
-        if viejos:
-            viejos.delete()
-            
-        # Obtener los restantes en papelera
-        formularios = Formulario.objects(administrador=admin_id, eliminado=True)
-        serializer = FormularioSerializer(formularios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-
-class FormularioRestaurarAPI(APIView):
-    """POST: Restaurar un formulario de la papelera"""
-    
-    def post(self, request, id):
-        try:
-            formulario = Formulario.objects.get(id=ObjectId(id), eliminado=True)
-        except Formulario.DoesNotExist:
-            return Response({"error": "Formulario no encontrado en papelera"}, status=status.HTTP_404_NOT_FOUND)
-            
-        formulario.eliminado = False
-        formulario.fecha_eliminacion = None
-        formulario.save()
-        
-        return Response({"message": "Formulario restaurado correctamente"}, status=status.HTTP_200_OK)
-
-
-class FormularioEliminarDefinitivoAPI(APIView):
-    """DELETE: Eliminar un formulario definitivamente"""
-    
-    def delete(self, request, id):
-        try:
-            formulario = Formulario.objects.get(id=ObjectId(id), eliminado=True)
-        except Formulario.DoesNotExist:
-            return Response({"error": "Formulario no encontrado en papelera"}, status=status.HTTP_404_NOT_FOUND)
-            
-        formulario.delete()
-        
-        return Response({"message": "Formulario eliminado definitivamente"}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+import csv
+import logging
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from bson import ObjectId
+from apps.core.cursores import codificar_cursor, decodificar_cursor
+from formapp.models import Formulario, ConfiguracionFormulario, UsuarioAutorizado
+from formapp.serializers import FormularioSerializer
+from formapp.cache import obtener_formulario, invalidar_formulario
+from formapp.papelera import eliminar_definitivamente
+from responseapp.models import EstadisticasFormulario
+from utils.email_utils import send_form_invitations
+from mongoengine.errors import DoesNotExist
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Proyección del modo resumen: sin preguntas ni usuarios_autorizados, con conteos
+PROYECCION_RESUMEN = {
+    "titulo": 1,
+    "descripcion": 1,
+    "fecha_creacion": 1,
+    "fecha_eliminacion": 1,
+    "configuracion.privado": 1,
+    "configuracion.es_publico": 1,
+    "configuracion.fecha_limite": 1,
+    "configuracion.requerir_login": 1,
+    "configuracion.una_respuesta": 1,
+    "configuracion.permitir_edicion": 1,
+    "configuracion.notificaciones_email": 1,
+    "total_preguntas": {"$size": {"$ifNull": ["$preguntas", []]}},
+    # Solo la lista embebida de formularios sin migrar; se suma la colección UsuarioAutorizado
+    "total_autorizados": {"$size": {"$ifNull": ["$configuracion.usuarios_autorizados", []]}},
+}
+
+
+def _listado_resumen(request, admin_id, eliminados=False):
+    """Página del listado resumido (home o papelera), ordenada por (fecha_creacion, _id) descendente."""
+    try:
+        limite = int(request.GET.get("limite", settings.FORMULARIOS_PAGINA_DEFECTO))
+    except ValueError:
+        return Response({"error": "'limite' debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+    limite = max(1, min(limite, settings.FORMULARIOS_PAGINA_MAXIMO))
+
+    query = {"eliminado": True} if eliminados else {"eliminado": {"$ne": True}}
+    if admin_id:
+        try:
+            query["administrador"] = ObjectId(admin_id)
+        except Exception:
+            return Response({"error": "ID de administrador inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Paginación por cursor: (fecha_creacion, _id) descendente, del más reciente al más antiguo
+    siguiente = request.GET.get("siguiente")
+    if siguiente:
+        try:
+            fecha_cursor, id_cursor = decodificar_cursor(siguiente)
+        except ValueError:
+            return Response({"error": "Token 'siguiente' inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        query["$or"] = [
+            {"fecha_creacion": {"$lt": fecha_cursor}},
+            {"fecha_creacion": fecha_cursor, "_id": {"$lt": id_cursor}},
+        ]
+
+    docs = list(Formulario._get_collection().aggregate([
+        {"$match": query},
+        {"$sort": {"fecha_creacion": -1, "_id": -1}},
+        {"$limit": limite + 1},
+        {"$project": PROYECCION_RESUMEN},
+    ]))
+    hay_mas = len(docs) > limite
+    docs = docs[:limite]
+
+    # Cantidad de respuestas desde los contadores precalculados, una consulta por página
+    totales = {
+        est["formulario"]: est.get("total_respuestas", 0)
+        for est in EstadisticasFormulario._get_collection().find(
+            {"formulario": {"$in": [doc["_id"] for doc in docs]}},
+            {"formulario": 1, "total_respuestas": 1}
+        )
+    }
+    # Autorizados por formulario, contados sobre el índice (formulario, email)
+    autorizados = {
+        fila["_id"]: fila["total"]
+        for fila in UsuarioAutorizado._get_collection().aggregate([
+            {"$match": {"formulario": {"$in": [doc["_id"] for doc in docs]}}},
+            {"$group": {"_id": "$formulario", "total": {"$sum": 1}}},
+        ])
+    }
+
+    resultados = []
+    for doc in docs:
+        resultados.append({
+            "id": str(doc["_id"]),
+            "titulo": doc.get("titulo"),
+            "descripcion": doc.get("descripcion"),
+            "fecha_creacion": doc.get("fecha_creacion"),
+            "fecha_eliminacion": doc.get("fecha_eliminacion"),
+            "configuracion": doc.get("configuracion") or {},
+            "total_preguntas": doc.get("total_preguntas", 0),
+            "total_autorizados": doc.get("total_autorizados", 0) + autorizados.get(doc["_id"], 0),
+            "total_respuestas": totales.get(doc["_id"], 0),
+        })
+
+    return Response({
+        "resultados": resultados,
+        "siguiente": codificar_cursor(docs[-1], "fecha_creacion") if hay_mas else None,
+        "limite": limite
+    }, status=status.HTTP_200_OK)
+
+
+class FormularioListCreateAPI(APIView):
+    """GET: listar formularios (con filtro opcional ?admin=ID)
+           ?resumen=1 devuelve solo los datos del home, paginados (&limite=&siguiente=)
+       POST: crear nuevo formulario"""
+
+    def get(self, request):
+        admin_id = request.GET.get("admin")  # ?admin=<id_usuario>
+        if request.GET.get("resumen") in ("1", "true"):
+            return _listado_resumen(request, admin_id)
+
+        if admin_id:
+            formularios = Formulario.objects(administrador=admin_id, eliminado__ne=True)
+        else:
+            formularios = Formulario.objects(eliminado__ne=True)
+
+        serializer = FormularioSerializer(formularios, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        serializer = FormularioSerializer(data=request.data)
+        if serializer.is_valid():
+            formulario = serializer.save()
+            return Response({
+                "message": "Formulario creado correctamente",
+                "id": str(formulario.id)
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _validadores_http(version, fecha_modificacion):
+    """
+    (ETag, Last-Modified como timestamp) de un formulario a partir de su versión.
+    Last-Modified va en segundos enteros, como el header: con los milisegundos
+    de Mongo nunca sería <= al If-Modified-Since que devuelve el navegador.
+    """
+    etag = f'"{version or 0}"'
+    last_modified = int(fecha_modificacion.replace(tzinfo=timezone.utc).timestamp()) \
+        if isinstance(fecha_modificacion, datetime) else None
+    return etag, last_modified
+
+
+class FormularioDetailAPI(APIView):
+    """GET, PUT, DELETE por ID
+       GET responde 304 si el If-None-Match / If-Modified-Since del cliente sigue vigente"""
+
+    def get_object(self, id):
+        try:
+            return Formulario.objects.get(id=ObjectId(id))
+        except Formulario.DoesNotExist:
+            return None
+
+    CAMPOS_VALIDADORES = {"version": 1, "fecha_modificacion": 1, "fecha_creacion": 1}
+
+    def get(self, request, id):
+        # Revalidación: solo se leen version y fecha_modificacion, sin serializar nada
+        if self._es_revalidacion(request):
+            meta = Formulario._get_collection().find_one({"_id": ObjectId(id)}, self.CAMPOS_VALIDADORES)
+            revalidada = self._revalidar(request, meta)
+            if revalidada is not None:
+                return revalidada
+
+        try:
+            formulario = obtener_formulario(id)
+        except Formulario.DoesNotExist:
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return self._respuesta_formulario(formulario)
+
+    def _es_revalidacion(self, request):
+        return "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+
+    def _revalidar(self, request, meta):
+        """404 si no existe, 304 si la copia del cliente sigue vigente, None si hay que enviar el formulario."""
+        if not meta:
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        etag, last_modified = _validadores_http(
+            meta.get("version"), meta.get("fecha_modificacion") or meta.get("fecha_creacion")
+        )
+        no_modificado = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if no_modificado is not None:
+            return self._con_validadores(no_modificado, etag, last_modified)
+        return None
+
+    def _respuesta_formulario(self, formulario):
+        serializer = FormularioSerializer(formulario)
+        response = Response(serializer.data)
+
+        etag, last_modified = _validadores_http(
+            formulario.version, formulario.fecha_modificacion or formulario.fecha_creacion
+        )
+        return self._con_validadores(response, etag, last_modified)
+
+    def _con_validadores(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # El navegador guarda la copia pero siempre revalida con el ETag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    def put(self, request, id):
+        formulario = self.get_object(id)
+        if not formulario:
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = FormularioSerializer(formulario, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({"message": "Formulario actualizado correctamente"})
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, id):
+        formulario = self.get_object(id)
+        if not formulario:
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        formulario.eliminado = True
+        formulario.fecha_eliminacion = datetime.utcnow()
+        if formulario.configuracion:
+            formulario.configuracion.privado = True
+        formulario.marcar_modificado()
+        formulario.save()
+        invalidar_formulario(formulario.id)
+        return Response({"message": "Formulario eliminado lógicamente"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class FormularioAccesoAPI(APIView):
+    """
+    Verifica si un usuario tiene acceso para responder un formulario.
+    GET: /api/formularios/{id}/verificar-acceso/?email=user@example.com
+    """
+
+    def get_object(self, id):
+        try:
+            return obtener_formulario(id)
+        except Formulario.DoesNotExist:
+            return None
+
+    def get(self, request, id):
+        formulario = self.get_object(id)
+        email = self._email(request)
+        tiene_acceso = formulario.usuario_puede_responder(email) if self._debe_verificar(formulario, email) else None
+        return self._respuesta(formulario, tiene_acceso)
+
+    def _email(self, request):
+        # Obtener el email del usuario desde los query params o desde Firebase auth
+        email = request.GET.get('email')
+        
+        # Si no viene el email en los params, intentar obtenerlo del usuario autenticado
+        # Asumiendo que tienes el email en request.user (ajusta según tu implementación de Firebase)
+        if not email and hasattr(request, 'user') and hasattr(request.user, 'email'):
+            email = request.user.email
+        return email
+
+    def _debe_verificar(self, formulario, email):
+        """Solo se consulta el acceso de un email en formularios vigentes que requieren login."""
+        return bool(formulario and not formulario.eliminado and email
+                    and formulario.configuracion and formulario.configuracion.requerir_login)
+
+    def _respuesta(self, formulario, tiene_acceso):
+        if not formulario:
+            return Response({
+                "error": "Formulario no encontrado"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if formulario.eliminado:
+            return Response({
+                "error": "Este formulario ha sido eliminado y no acepta respuestas"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Verificar si el formulario requiere login
+        if formulario.configuracion and formulario.configuracion.requerir_login:
+            if tiene_acceso is None:  # sin email
+                return Response({
+                    "tiene_acceso": False,
+                    "razon": "Se requiere iniciar sesión para acceder a este formulario",
+                    "requerir_login": True
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            
+            if not tiene_acceso:
+                return Response({
+                    "tiene_acceso": False,
+                    "razon": "No tienes autorización para acceder a este formulario privado",
+                    "requerir_login": True,
+                    "es_publico": formulario.configuracion.es_publico
+                }, status=status.HTTP_403_FORBIDDEN)
+
+            return Response({
+                "tiene_acceso": True,
+                "requerir_login": True,
+                "es_publico": formulario.configuracion.es_publico,
+                "formulario": {
+                    "id": str(formulario.id),
+                    "titulo": formulario.titulo,
+                    "descripcion": formulario.descripcion
+                }
+            }, status=status.HTTP_200_OK)
+        
+        # Si no requiere login, todos tienen acceso
+        return Response({
+            "tiene_acceso": True,
+            "requerir_login": False,
+            "formulario": {
+                "id": str(formulario.id),
+                "titulo": formulario.titulo,
+                "descripcion": formulario.descripcion
+            }
+        }, status=status.HTTP_200_OK)
+
+
+def _marca_modificacion():
+    """Operadores que suben version y fecha_modificacion en un update atómico."""
+    return {"$inc": {"version": 1}, "$set": {"fecha_modificacion": datetime.utcnow()}}
+
+
+def _normalizar_emails(valores):
+    """
+    Normaliza (minúsculas, sin espacios) y valida una lista de emails en una pasada.
+    Devuelve (validos_sin_repetir, cantidad_repetidos, invalidos).
+    """
+    validos, vistos, invalidos = [], set(), []
+    repetidos = 0
+    for valor in valores:
+        email = str(valor).strip().lower()
+        if not email:
+            continue
+        try:
+            validate_email(email)
+        except ValidationError:
+            invalidos.append(email)
+            continue
+        if email in vistos:
+            repetidos += 1
+            continue
+        vistos.add(email)
+        validos.append(email)
+    return validos, repetidos, invalidos
+
+
+def _formulario_existe(id):
+    return Formulario.objects(id=ObjectId(id)).count() > 0
+
+
+class FormularioAgregarUsuarioAPI(APIView):
+    """
+    Agrega un usuario a la lista de usuarios autorizados de un formulario privado.
+    POST: /api/formularios/{id}/agregar-usuario/
+    Body: { "email": "usuario@example.com" }
+    """
+
+    def post(self, request, id):
+        email = request.data.get('email')
+        if not email:
+            return Response({
+                "error": "El campo 'email' es requerido"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Normalizar y validar que el email tenga formato correcto
+        email = email.lower().strip()
+        try:
+            validate_email(email)
+        except ValidationError:
+            return Response({
+                "error": "Formato de email inválido"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not _formulario_existe(id):
+            return Response({
+                "error": "Formulario no encontrado"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Un insert contra el índice único (formulario, email): atómico aunque
+        # dos administradores agreguen a la vez
+        if not UsuarioAutorizado.agregar_uno(id, email):
+            return Response({
+                "message": "El usuario ya está en la lista de autorizados"
+            }, status=status.HTTP_200_OK)
+
+        return Response({
+            "message": "Usuario agregado correctamente",
+            "email": email,
+            "total_usuarios": UsuarioAutorizado.contar(id)
+        }, status=status.HTTP_200_OK)
+
+
+class FormularioImportarUsuariosAPI(APIView):
+    """
+    Agrega muchos usuarios autorizados de una vez.
+    POST: /api/formularios/{id}/importar-usuarios/
+    Body JSON: { "emails": ["a@example.com", ...] }  (o un texto separado por comas / saltos de línea)
+    Multipart: archivo CSV en el campo "archivo" (se toman las celdas que tienen "@")
+    """
+
+    def _leer_emails(self, request):
+        archivo = request.FILES.get("archivo")
+        if archivo:
+            lineas = (linea.decode("utf-8-sig", errors="ignore") for linea in archivo)
+            valores = []
+            for fila in csv.reader(lineas):
+                # Solo las celdas con "@": se ignoran cabecera y columnas como el nombre
+                valores.extend(celda for celda in fila if "@" in celda)
+            return valores
+
+        emails = request.data.get("emails", [])
+        if isinstance(emails, str):
+            emails = emails.replace(";", ",").replace("\n", ",").split(",")
+        return emails
+
+    def post(self, request, id):
+        valores = self._leer_emails(request)
+        if not valores:
+            return Response({
+                "error": "Envía 'emails' o un archivo CSV en 'archivo'"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(valores) > settings.IMPORTAR_USUARIOS_MAXIMO:
+            return Response({
+                "error": f"Máximo {settings.IMPORTAR_USUARIOS_MAXIMO} emails por importación"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not _formulario_existe(id):
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        validos, repetidos, invalidos = _normalizar_emails(valores)
+
+        # Un solo insert_many desordenado: el índice único descarta los que ya estaban
+        agregados = UsuarioAutorizado.agregar(id, validos)
+
+        logger.info("importación de usuarios formulario=%s agregados=%d invalidos=%d", id, agregados, len(invalidos))
+        return Response({
+            "message": f"Usuarios agregados: {agregados}",
+            "agregados": agregados,
+            "duplicados": repetidos + (len(validos) - agregados),
+            "invalidos": len(invalidos),
+            "emails_invalidos": invalidos[:100],
+            "total_usuarios": UsuarioAutorizado.contar(id)
+        }, status=status.HTTP_200_OK)
+
+
+class FormularioRemoverUsuarioAPI(APIView):
+    """
+    Remueve un usuario de la lista de usuarios autorizados de un formulario privado.
+    DELETE: /api/formularios/{id}/remover-usuario/
+    Body: { "email": "usuario@example.com" }
+    """
+
+    def delete(self, request, id):
+        email = request.data.get('email')
+        if not email:
+            return Response({
+                "error": "El campo 'email' es requerido"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Normalizar email
+        email = email.lower().strip()
+
+        eliminado = UsuarioAutorizado.quitar(id, email)
+        # Formularios aún no migrados: quitarlo también de la lista embebida
+        legado = Formulario._get_collection().update_one(
+            {"_id": ObjectId(id), "configuracion.usuarios_autorizados": email},
+            {"$pull": {"configuracion.usuarios_autorizados": email}, **_marca_modificacion()},
+        ).modified_count
+        if legado:
+            invalidar_formulario(id)
+
+        if not (eliminado or legado):
+            if not _formulario_existe(id):
+                return Response({
+                    "error": "Formulario no encontrado"
+                }, status=status.HTTP_404_NOT_FOUND)
+            return Response({
+                "error": "El usuario no está en la lista de autorizados"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "message": "Usuario removido correctamente",
+            "email": email,
+            "total_usuarios": UsuarioAutorizado.contar(id)
+        }, status=status.HTTP_200_OK)
+
+
+class FormularioListarUsuariosAPI(APIView):
+    """
+    Lista los usuarios autorizados de un formulario privado, paginados en orden alfabético.
+    GET: /api/formularios/{id}/usuarios-autorizados/?limite=<n>&siguiente=<ultimo email>
+    """
+
+    def get_object(self, id):
+        try:
+            return obtener_formulario(id)
+        except Formulario.DoesNotExist:
+            return None
+
+    def get(self, request, id):
+        formulario = self.get_object(id)
+        if not formulario:
+            return Response({
+                "error": "Formulario no encontrado"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limite = int(request.GET.get("limite", settings.USUARIOS_AUTORIZADOS_PAGINA_DEFECTO))
+        except ValueError:
+            return Response({"error": "'limite' debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, settings.USUARIOS_AUTORIZADOS_PAGINA_MAXIMO))
+
+        # Paginación por el índice (formulario, email): la página sigue al último email visto
+        usuarios = UsuarioAutorizado.emails(id, desde=request.GET.get("siguiente"), limite=limite + 1)
+        hay_mas = len(usuarios) > limite
+        usuarios = usuarios[:limite]
+
+        # Formularios aún no migrados: la lista embebida va en la primera página
+        legado = []
+        if not request.GET.get("siguiente") and formulario.configuracion:
+            legado = [u for u in (formulario.configuracion.usuarios_autorizados or []) if u not in usuarios]
+
+        return Response({
+            "formulario_id": str(formulario.id),
+            "titulo": formulario.titulo,
+            "es_publico": formulario.configuracion.es_publico if formulario.configuracion else True,
+            "usuarios_autorizados": legado + usuarios,
+            "total": UsuarioAutorizado.contar(id) + len(legado),
+            "siguiente": usuarios[-1] if hay_mas else None,
+            "limite": limite
+        }, status=status.HTTP_200_OK)
+    
+
+class EnviarInvitacionesAPI(APIView):
+    """
+    POST: Enviar invitaciones por email a usuarios autorizados
+    """
+    
+    def post(self, request, form_id):
+        try:
+            # Importar aquí para evitar errores de importación circular
+            from utils.email_utils import send_form_invitations
+            
+            # Obtener el formulario
+            try:
+                form = Formulario.objects.get(id=ObjectId(form_id))
+            except DoesNotExist:
+                logger.warning("invitaciones: formulario=%s no encontrado", form_id)
+                return Response(
+                    {"error": "Formulario no encontrado"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            # Validar que el usuario sea el administrador
+            user_id = request.data.get("user_id")
+            admin_id = str(form.administrador.id) if form.administrador else None
+            
+            if str(user_id) != admin_id:
+                logger.warning("invitaciones rechazadas formulario=%s solicitante=%s", form_id, user_id)
+                return Response(
+                    {"error": "No tienes permiso para enviar invitaciones"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            
+            # Obtener usuarios autorizados (colección UsuarioAutorizado + lista embebida de formularios viejos)
+            usuarios = []
+            if hasattr(form, 'configuracion') and form.configuracion:
+                usuarios = list(getattr(form.configuracion, 'usuarios_autorizados', None) or [])
+            usuarios += UsuarioAutorizado.emails(form.id)
+            
+            if not usuarios:
+                return Response(
+                    {"error": "No hay usuarios autorizados en este formulario"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            form_link = self._link(form_id)
+            logger.debug("invitaciones formulario=%s destinatarios=%d link=%s", form_id, len(usuarios), form_link)
+
+            # Encolar todas las invitaciones de una vez: se envían por lotes
+            # (un request a Brevo por lote) desde run_email_worker
+            resultados = send_form_invitations(
+                recipient_emails=usuarios,
+                form_title=form.titulo,
+                form_description=form.descripcion or "",
+                form_link=form_link
+            )
+            resultado = self._resultado(resultados)
+            logger.info("invitaciones formulario=%s encoladas=%d fallidas=%d",
+                        form_id, resultado["enviados"], len(resultado["fallidos"]))
+            
+            return Response(resultado, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.exception("error al enviar invitaciones formulario=%s", form_id)
+            return Response(
+                {"error": f"Error interno: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def _link(self, form_id):
+        # Construir el enlace del formulario
+        # 🔗 Para producción (cuando esté desplegado) usar el origin del request:
+        # origin = request.META.get('HTTP_ORIGIN', 'https://tudominio.com')
+        # return f"{origin}/form/{form_id}/answer"
+        return f"https://form-creator-rosy.vercel.app/form/{form_id}/answer"
+
+    def _resultado(self, resultados):
+        enviados = sum(1 for estado in resultados.values() if estado == "encolado")
+        return {
+            "message": f"Invitaciones enviadas: {enviados}/{len(resultados)}",
+            "enviados": enviados,
+            "total": len(resultados),
+            "fallidos": [email for email, estado in resultados.items() if estado != "encolado"],
+            "resultados": resultados
+        }
+
+
+class FormularioPapeleraAPI(APIView):
+    """GET: Listar formularios en papelera para un administrador (resumidos y paginados: &limite=&siguiente=).
+       Los vencidos los borra la tarea `manage.py purge_papelera`, no esta lectura."""
+    
+    def get(self, request):
+        admin_id = request.GET.get("admin")
+        if not admin_id:
+            return Response({"error": "Se requiere el parámetro admin"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return _listado_resumen(request, admin_id, eliminados=True)
+
+
+class FormularioRestaurarAPI(APIView):
+    """POST: Restaurar un formulario de la papelera"""
+    
+    def post(self, request, id):
+        try:
+            formulario = Formulario.objects.get(id=ObjectId(id), eliminado=True)
+        except Formulario.DoesNotExist:
+            return Response({"error": "Formulario no encontrado en papelera"}, status=status.HTTP_404_NOT_FOUND)
+            
+        formulario.eliminado = False
+        formulario.fecha_eliminacion = None
+        formulario.marcar_modificado()
+        formulario.save()
+        invalidar_formulario(formulario.id)
+        
+        return Response({"message": "Formulario restaurado correctamente"}, status=status.HTTP_200_OK)
+
+
+class FormularioEliminarDefinitivoAPI(APIView):
+    """DELETE: Eliminar un formulario definitivamente"""
+    
+    def delete(self, request, id):
+        try:
+            formulario = Formulario.objects.get(id=ObjectId(id), eliminado=True)
+        except Formulario.DoesNotExist:
+            return Response({"error": "Formulario no encontrado en papelera"}, status=status.HTTP_404_NOT_FOUND)
+            
+        eliminar_definitivamente([formulario.id])
+        
+        return Response({"message": "Formulario eliminado definitivamente"}, status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,116 @@
+# formapp/views_async.py
+"""
+Vistas async del modo ASGI (SERVIDOR_ASGI=1, ver formapp/urls.py).
+Heredan de las vistas sync y reutilizan sus respuestas; solo cambian las
+lecturas y escrituras en MongoDB, que van por el cliente async. Los métodos
+que no se redefinen (PUT/DELETE del detalle) corren en un hilo como
+cualquier vista sync bajo ASGI.
+"""
+import logging
+from bson import DBRef, ObjectId
+from rest_framework import status
+from rest_framework.response import Response
+from apps.core.mongo_async import coleccion_async
+from apps.core.vistas_async import AsyncAPIView
+from formapp.cache import obtener_formulario_async
+from formapp.models import Formulario, UsuarioAutorizado
+from formapp.views import FormularioDetailAPI, FormularioAccesoAPI, EnviarInvitacionesAPI
+from usuarioapp.models import Usuario
+from utils.email_utils import send_form_invitations_async
+
+logger = logging.getLogger(__name__)
+
+
+async def _formulario_o_none(id):
+    try:
+        return await obtener_formulario_async(id)
+    except Formulario.DoesNotExist:
+        return None
+
+
+def _id_administrador(formulario):
+    """Id del administrador sin desreferenciar (mongoengine haría una consulta sync)."""
+    ref = formulario._data.get("administrador")
+    return str(getattr(ref, "id", ref)) if ref else None
+
+
+async def _cargar_administrador(formulario):
+    """
+    FormularioSerializer lee formulario.administrador: se resuelve la referencia
+    con el cliente async, como lo haría mongoengine al accederla.
+    """
+    ref = formulario._data.get("administrador")
+    if isinstance(ref, DBRef):
+        doc = await coleccion_async(Usuario).find_one({"_id": ref.id})
+        if doc is not None:
+            formulario._data["administrador"] = Usuario._from_son(doc)
+
+
+class FormularioDetailAsyncAPI(AsyncAPIView, FormularioDetailAPI):
+
+    async def get(self, request, id):
+        if self._es_revalidacion(request):
+            meta = await coleccion_async(Formulario).find_one({"_id": ObjectId(id)}, self.CAMPOS_VALIDADORES)
+            revalidada = self._revalidar(request, meta)
+            if revalidada is not None:
+                return revalidada
+
+        formulario = await _formulario_o_none(id)
+        if formulario is None:
+            return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        await _cargar_administrador(formulario)
+        return self._respuesta_formulario(formulario)
+
+
+class FormularioAccesoAsyncAPI(AsyncAPIView, FormularioAccesoAPI):
+
+    async def get(self, request, id):
+        formulario = await _formulario_o_none(id)
+        email = self._email(request)
+        tiene_acceso = None
+        if self._debe_verificar(formulario, email):
+            tiene_acceso = await formulario.usuario_puede_responder_async(email)
+        return self._respuesta(formulario, tiene_acceso)
+
+
+class EnviarInvitacionesAsyncAPI(AsyncAPIView, EnviarInvitacionesAPI):
+
+    async def post(self, request, form_id):
+        try:
+            form = await _formulario_o_none(form_id)
+            if form is None:
+                return Response({"error": "Formulario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+            # Validar que el usuario sea el administrador
+            if str(request.data.get("user_id")) != _id_administrador(form):
+                return Response(
+                    {"error": "No tienes permiso para enviar invitaciones"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            # Colección UsuarioAutorizado + lista embebida de formularios viejos
+            usuarios = list(getattr(form.configuracion, 'usuarios_autorizados', None) or []) if form.configuracion else []
+            usuarios += await UsuarioAutorizado.emails_async(form.id)
+            if not usuarios:
+                return Response(
+                    {"error": "No hay usuarios autorizados en este formulario"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            resultados = await send_form_invitations_async(
+                recipient_emails=usuarios,
+                form_title=form.titulo,
+                form_description=form.descripcion or "",
+                form_link=self._link(form_id)
+            )
+            resultado = self._resultado(resultados)
+            logger.info("invitaciones formulario=%s encoladas=%d fallidas=%d",
+                        form_id, resultado["enviados"], len(resultado["fallidos"]))
+            return Response(resultado, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception("error al enviar invitaciones formulario=%s", form_id)
+            return Response(
+                {"error": f"Error interno: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -0,0 +1,93 @@
+# responseapp/management/commands/deduplicar_respondedores.py
+from django.core.management.base import BaseCommand
+from apps.core.logs import enmascarar_email
+from apps.core.mongo import coleccion_sin_indices
+from responseapp.models import Respondedor, RespuestaFormulario
+
+# Campos únicos de Respondedor: por cada uno se fusionan los duplicados
+CAMPOS_UNICOS = ("email", "google_id")
+# Datos que el respondedor conservado hereda de los duplicados si no los tiene
+CAMPOS_HEREDABLES = CAMPOS_UNICOS + ("nombre", "foto_perfil")
+
+
+class Command(BaseCommand):
+    """
+    Fusiona los respondedores repetidos por email o google_id (creados antes
+    de los índices únicos parciales) y después crea los índices. Se conserva
+    el más antiguo: las respuestas de los duplicados pasan a apuntarle y los
+    duplicados se borran. Si al fusionar quedan varias respuestas de un
+    formulario con una_respuesta, solo la primera conserva la marca.
+    Correrlo antes de que la aplicación use Respondedor con los índices
+    nuevos (mongoengine los crea en el primer acceso y fallan si hay
+    duplicados). Se puede correr varias veces: sin duplicados solo crea los
+    índices.
+    Uso:
+        python manage.py deduplicar_respondedores
+    """
+    help = "Fusiona respondedores duplicados por email o google_id y crea sus índices únicos"
+
+    def _duplicados(self, respondedores, campo):
+        return respondedores.aggregate([
+            {"$match": {campo: {"$exists": True}}},
+            {"$sort": {"fecha_registro": 1, "_id": 1}},
+            {"$group": {"_id": f"${campo}", "ids": {"$push": "$_id"}, "total": {"$sum": 1}}},
+            {"$match": {"total": {"$gt": 1}}},
+        ], allowDiskUse=True)
+
+    def _reasignar_respuestas(self, respuestas, conservado, duplicados):
+        """Mueve las respuestas al conservado sin violar el índice de una_respuesta."""
+        repetidas = respuestas.aggregate([
+            {"$match": {"respondedor": {"$in": [conservado] + duplicados}, "una_respuesta": True}},
+            {"$sort": {"fecha_envio": 1, "_id": 1}},
+            {"$group": {"_id": "$formulario", "ids": {"$push": "$_id"}}},
+            {"$match": {"ids.1": {"$exists": True}}},
+        ])
+        desmarcar = [id_ for grupo in repetidas for id_ in grupo["ids"][1:]]
+        if desmarcar:
+            respuestas.update_many({"_id": {"$in": desmarcar}}, {"$unset": {"una_respuesta": ""}})
+        movidas = respuestas.update_many(
+            {"respondedor": {"$in": duplicados}}, {"$set": {"respondedor": conservado}}
+        ).modified_count
+        return movidas, len(desmarcar)
+
+    def _heredar(self, respondedores, conservado, docs_duplicados):
+        """Completa los datos que le faltan al conservado con los de sus duplicados."""
+        actual = respondedores.find_one({"_id": conservado}, {c: 1 for c in CAMPOS_HEREDABLES}) or {}
+        cambios = {}
+        for campo in CAMPOS_HEREDABLES:
+            if actual.get(campo) is not None:
+                continue
+            valor = next((d[campo] for d in docs_duplicados if d.get(campo) is not None), None)
+            if valor is None:
+                continue
+            # Un email/google_id que ya tiene otro respondedor se fusionará en su propia pasada
+            if campo in CAMPOS_UNICOS and respondedores.count_documents({campo: valor}, limit=1):
+                continue
+            cambios[campo] = valor
+        if cambios:
+            respondedores.update_one({"_id": conservado}, {"$set": cambios})
+
+    def handle(self, *args, **options):
+        respondedores = coleccion_sin_indices(Respondedor)
+        respuestas = coleccion_sin_indices(RespuestaFormulario)
+
+        fusionados = movidas = desmarcadas = 0
+        for campo in CAMPOS_UNICOS:
+            for grupo in self._duplicados(respondedores, campo):
+                conservado, *duplicados = grupo["ids"]
+                n_movidas, n_desmarcadas = self._reasignar_respuestas(respuestas, conservado, duplicados)
+                docs = list(respondedores.find({"_id": {"$in": duplicados}}, {c: 1 for c in CAMPOS_HEREDABLES}))
+                respondedores.delete_many({"_id": {"$in": duplicados}})
+                self._heredar(respondedores, conservado, docs)
+
+                fusionados += len(duplicados)
+                movidas += n_movidas
+                desmarcadas += n_desmarcadas
+                valor = enmascarar_email(grupo["_id"]) if campo == "email" else grupo["_id"]
+                self.stdout.write(f"  {campo}={valor}: {len(duplicados)} duplicado(s) → {conservado}")
+
+        Respondedor.ensure_indexes()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {fusionados} respondedor(es) fusionados, {movidas} respuesta(s) reasignadas, "
+            f"{desmarcadas} sin marca de una_respuesta; índices únicos creados"
+        ))
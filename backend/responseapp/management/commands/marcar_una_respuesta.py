@@ -0,0 +1,55 @@
+# responseapp/management/commands/marcar_una_respuesta.py
+from django.core.management.base import BaseCommand
+from apps.core.mongo import coleccion_sin_indices
+from formapp.models import Formulario
+from responseapp.models import RespuestaFormulario
+
+
+class Command(BaseCommand):
+    """
+    Marca con una_respuesta=True las respuestas guardadas antes de que existiera
+    el campo (o antes de activar la opción en el formulario), para que el índice
+    único (formulario, respondedor, una_respuesta) también las cubra. Por cada
+    respondedor se marca solo su primera respuesta: si ya había enviado varias,
+    las demás quedan sin marca y el índice se puede crear igual.
+    Correr después de deduplicar_respondedores y antes de que la aplicación
+    cree el índice. Se puede correr varias veces.
+    Uso:
+        python manage.py marcar_una_respuesta
+        python manage.py marcar_una_respuesta --lote 500
+    """
+    help = "Marca las respuestas existentes de los formularios con una_respuesta y crea su índice"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Respuestas por update_many")
+
+    def _primeras_sin_marca(self, respuestas, form_id):
+        """_id de la primera respuesta de cada respondedor que todavía no tiene una marcada."""
+        grupos = respuestas.aggregate([
+            {"$match": {"formulario": form_id}},
+            {"$sort": {"fecha_envio": 1, "_id": 1}},
+            {"$group": {"_id": "$respondedor", "primera": {"$first": "$_id"}, "marcada": {"$max": "$una_respuesta"}}},
+            {"$match": {"marcada": {"$ne": True}}},
+        ], allowDiskUse=True)
+        return [grupo["primera"] for grupo in grupos]
+
+    def handle(self, *args, **options):
+        respuestas = coleccion_sin_indices(RespuestaFormulario)
+        lote = max(1, options["lote"])
+        formularios = coleccion_sin_indices(Formulario).find({"configuracion.una_respuesta": True}, {"_id": 1})
+
+        total_formularios = marcadas = 0
+        for doc in formularios:
+            ids = self._primeras_sin_marca(respuestas, doc["_id"])
+            for inicio in range(0, len(ids), lote):
+                marcadas += respuestas.update_many(
+                    {"_id": {"$in": ids[inicio:inicio + lote]}}, {"$set": {"una_respuesta": True}}
+                ).modified_count
+            total_formularios += 1
+            if ids:
+                self.stdout.write(f"  {doc['_id']}: {len(ids)} respuesta(s)")
+
+        RespuestaFormulario.ensure_indexes()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {marcadas} respuesta(s) marcadas en {total_formularios} formulario(s); índice creado"
+        ))
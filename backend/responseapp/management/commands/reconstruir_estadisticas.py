@@ -0,0 +1,37 @@
+# responseapp/management/commands/reconstruir_estadisticas.py
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+from formapp.models import Formulario
+from responseapp.models import EstadisticasFormulario
+
+
+class Command(BaseCommand):
+    """
+    Recalcula los contadores de EstadisticasFormulario desde las respuestas.
+    Uso:
+        python manage.py reconstruir_estadisticas
+        python manage.py reconstruir_estadisticas --formulario <id>
+    """
+    help = "Recalcula las estadísticas incrementales de los formularios desde sus respuestas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formulario", help="ID del formulario a reconstruir (por defecto, todos)")
+
+    def handle(self, *args, **options):
+        form_id = options.get("formulario")
+        if form_id:
+            if not ObjectId.is_valid(form_id):
+                raise CommandError(f"ID de formulario inválido: {form_id}")
+            formularios = Formulario.objects(id=ObjectId(form_id)).only("id", "preguntas")
+            if not formularios.count():
+                raise CommandError(f"Formulario {form_id} no encontrado")
+        else:
+            formularios = Formulario.objects.only("id", "preguntas")
+
+        total = 0
+        for formulario in formularios:
+            estadisticas = EstadisticasFormulario.reconstruir(formulario)
+            total += 1
+            self.stdout.write(f"  {formulario.id}: {estadisticas.total_respuestas} respuestas")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Estadísticas reconstruidas para {total} formulario(s)"))
@@ -1,6 +1,13 @@
 # responseapp/models.py
 from datetime import datetime
-from mongoengine import Document, ReferenceField, DateTimeField, ListField, EmbeddedDocument, EmbeddedDocumentField, StringField, IntField, LongField
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from apps.core.mongo import usando_analiticas
+from apps.core.mongo_async import coleccion_async
+from mongoengine import Document, ReferenceField, DateTimeField, ListField, EmbeddedDocument, EmbeddedDocumentField, StringField, IntField, LongField, DictField, BooleanField
+
+# Cantidad de textos libres recientes que se guardan por pregunta en las estadísticas
+MAX_TEXTOS_ESTADISTICAS = 20
 
 class RespuestaPregunta(EmbeddedDocument):
     pregunta_id = IntField(required=True)
@@ -23,9 +30,140 @@ class Respondedor(Document):
     ultimo_login = DateTimeField(default=datetime.utcnow)
     
     meta = {
-        'collection': 'respondedores'
+        'collection': 'respondedores',
+        'indexes': [
+            # Parciales: muchos respondedores anónimos no tienen email ni google_id.
+            # Únicos: el upsert de resolver() no puede crear dos respondedores iguales
+            {'fields': ['email'], 'unique': True, 'partialFilterExpression': {'email': {'$exists': True}}},
+            {'fields': ['google_id'], 'unique': True, 'partialFilterExpression': {'google_id': {'$exists': True}}},
+            'ip_address',
+        ]
     }
 
+    @staticmethod
+    def _upsert(ip_address, email=None, google_id=None, nombre=None):
+        """
+        (filtro, operación) del upsert de un respondedor sobre su identidad más
+        fuerte: email, si no google_id, si no la IP.
+        """
+        google_id = int(google_id) if google_id and str(google_id).isdigit() else None
+        ahora = datetime.utcnow()
+        al_crear = {"ip_address": ip_address, "fecha_registro": ahora}
+        if email:
+            filtro = {"email": email}
+            if google_id:
+                al_crear["google_id"] = google_id
+        elif google_id:
+            filtro = {"google_id": google_id}
+        else:
+            filtro = {"ip_address": al_crear.pop("ip_address")}
+        cambios = {"ultimo_login": ahora}
+        if nombre:
+            cambios["nombre"] = nombre
+        return filtro, {"$set": cambios, "$setOnInsert": al_crear}
+
+    @staticmethod
+    def _filtros_tras_duplicado(filtro, operacion):
+        """
+        Dónde buscar al respondedor cuando el upsert choca con un índice único:
+        por su filtro (otro envío simultáneo lo creó) y, si traía email y
+        google_id, por el google_id (ya lo tiene otro respondedor).
+        """
+        filtros = [filtro]
+        google_id = operacion["$setOnInsert"].get("google_id")
+        if google_id is not None:
+            filtros.append({"google_id": google_id})
+        return filtros
+
+    @classmethod
+    def resolver(cls, ip_address, email=None, google_id=None, nombre=None):
+        """
+        Busca o crea el respondedor en una sola operación atómica
+        (find_one_and_update con upsert) sobre su identidad más fuerte:
+        email, si no google_id, si no la IP. Actualiza nombre y último login.
+        """
+        filtro, operacion = cls._upsert(ip_address, email, google_id, nombre)
+        try:
+            doc = cls._get_collection().find_one_and_update(
+                filtro, operacion, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Otro envío simultáneo lo creó primero, o el google_id ya es de otro respondedor
+            doc = None
+            for candidato in cls._filtros_tras_duplicado(filtro, operacion):
+                doc = cls._get_collection().find_one_and_update(
+                    candidato, operacion, return_document=ReturnDocument.AFTER
+                )
+                if doc is not None:
+                    break
+            if doc is None:
+                # El documento que chocó se borró entre medio: reintentar una vez
+                doc = cls._get_collection().find_one_and_update(
+                    filtro, operacion, upsert=True, return_document=ReturnDocument.AFTER
+                )
+        return cls._from_son(doc)
+
+    @classmethod
+    async def resolver_async(cls, ip_address, email=None, google_id=None, nombre=None):
+        """resolver() con el cliente async de MongoDB (vistas del modo ASGI)."""
+        filtro, operacion = cls._upsert(ip_address, email, google_id, nombre)
+        coleccion = coleccion_async(cls)
+        try:
+            doc = await coleccion.find_one_and_update(
+                filtro, operacion, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            doc = None
+            for candidato in cls._filtros_tras_duplicado(filtro, operacion):
+                doc = await coleccion.find_one_and_update(
+                    candidato, operacion, return_document=ReturnDocument.AFTER
+                )
+                if doc is not None:
+                    break
+            if doc is None:
+                doc = await coleccion.find_one_and_update(
+                    filtro, operacion, upsert=True, return_document=ReturnDocument.AFTER
+                )
+        return cls._from_son(doc)
+
+    @classmethod
+    def resolver_lote(cls, identidades):
+        """
+        Versión por lotes de resolver(): un bulk_write de upserts (uno por
+        identidad distinta) y una consulta para leer los _id.
+        `identidades` es una lista de dicts con ip_address, email, google_id y nombre;
+        devuelve una lista paralela con el _id de cada respondedor.
+        """
+        filtros = []
+        operaciones = {}
+        for identidad in identidades:
+            filtro, operacion = cls._upsert(**identidad)
+            clave = next(iter(filtro.items()))
+            filtros.append(clave)
+            if clave not in operaciones:
+                operaciones[clave] = UpdateOne(filtro, operacion, upsert=True)
+
+        coleccion = cls._get_collection()
+        if operaciones:
+            try:
+                coleccion.bulk_write(list(operaciones.values()), ordered=False)
+            except BulkWriteError as e:
+                # Claves duplicadas por envíos simultáneos: el respondedor ya existe
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+
+        por_campo = {}
+        for campo, valor in operaciones:
+            por_campo.setdefault(campo, []).append(valor)
+        ids = {}
+        if por_campo:
+            consulta = {"$or": [{campo: {"$in": valores}} for campo, valores in por_campo.items()]}
+            for doc in coleccion.find(consulta, {"email": 1, "google_id": 1, "ip_address": 1}):
+                for campo in por_campo:
+                    if doc.get(campo) is not None:
+                        ids.setdefault((campo, doc[campo]), doc["_id"])
+        return [ids.get(clave) for clave in filtros]
+
 class RespuestaFormulario(Document):
     formulario = ReferenceField('Formulario', required=True)
     respondedor = ReferenceField('Respondedor', required=True)
@@ -37,7 +175,315 @@ class RespuestaFormulario(Document):
     dispositivo = StringField(default="Desconocido")   # ✅ Desktop, Móvil, Tablet
     
     respuestas = ListField(EmbeddedDocumentField(RespuestaPregunta))
+
+    # True si el formulario era de una sola respuesta al guardarla (activa el índice único)
+    una_respuesta = BooleanField()
     
     meta = {
-        'collection': 'respuestaFormularios'
-    }
\ No newline at end of file
+        'collection': 'respuestaFormularios',
+        'indexes': [
+            # Búsqueda de "¿ya respondí?" por formulario + respondedor
+            ('formulario', 'respondedor'),
+            # Una sola respuesta por respondedor en formularios con una_respuesta:
+            # único y parcial, así dos envíos simultáneos no pueden pasar los dos
+            {
+                'fields': ['formulario', 'respondedor', 'una_respuesta'],
+                'unique': True,
+                'partialFilterExpression': {'una_respuesta': True}
+            },
+            # Listado paginado por cursor (fecha_envio, _id) descendente
+            ('formulario', '-fecha_envio', '-id'),
+        ]
+    }
+
+
+def pipeline_estadisticas(textos_ids, max_textos=MAX_TEXTOS_ESTADISTICAS):
+    """
+    Pipeline de agregación con $facet que calcula todas las estadísticas
+    del formulario en el servidor de MongoDB (una sola ida y vuelta).
+    Se antepone el $match por formulario desde el queryset.
+    Cuenta igual que EstadisticasFormulario.incrementos(): solo la primera
+    respuesta de cada pregunta y sin valores vacíos.
+    """
+    primera_por_pregunta = {"$reduce": {
+        "input": "$respuestas",
+        "initialValue": [],
+        "in": {"$cond": [
+            {"$in": ["$$this.pregunta_id", "$$value.pregunta_id"]},
+            "$$value",
+            {"$concatArrays": ["$$value", ["$$this"]]},
+        ]},
+    }}
+    respuestas_valores = [
+        {"$project": {"respuestas": primera_por_pregunta}},
+        {"$unwind": "$respuestas"},
+        {"$unwind": "$respuestas.valor"},
+        {"$match": {"respuestas.valor": {"$nin": [None, ""]}}},
+    ]
+    return [
+        {"$facet": {
+            "resumen": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "tiempo_total": {"$sum": {"$cond": [{"$gt": ["$tiempo_completacion", 0]}, "$tiempo_completacion", 0]}},
+                    "tiempo_cantidad": {"$sum": {"$cond": [{"$gt": ["$tiempo_completacion", 0]}, 1, 0]}},
+                }},
+            ],
+            "dispositivos": [
+                {"$group": {"_id": {"$ifNull": ["$dispositivo", "Desconocido"]}, "value": {"$sum": 1}}},
+                {"$sort": {"_id": 1}},
+            ],
+            "navegadores": [
+                {"$group": {"_id": {"$ifNull": ["$navegador", "Desconocido"]}, "value": {"$sum": 1}}},
+                {"$sort": {"_id": 1}},
+            ],
+            "fechas": [
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$fecha_envio"}}, "cantidad": {"$sum": 1}}},
+                {"$sort": {"_id": 1}},
+            ],
+            # Total de valores respondidos por pregunta (incluye texto libre)
+            "totales": respuestas_valores + [
+                {"$group": {"_id": "$respuestas.pregunta_id", "total": {"$sum": 1}}},
+            ],
+            # Conteo por opción/valor (excepto texto libre)
+            "conteos": respuestas_valores + [
+                {"$match": {"respuestas.pregunta_id": {"$nin": textos_ids}}},
+                {"$group": {"_id": {"p": "$respuestas.pregunta_id", "v": "$respuestas.valor"}, "value": {"$sum": 1}}},
+                {"$sort": {"_id.p": 1, "_id.v": 1}},
+            ],
+            # Últimos textos libres por pregunta
+            "textos": [
+                {"$match": {"respuestas.pregunta_id": {"$in": textos_ids}}},
+                {"$sort": {"_id": -1}},
+            ] + respuestas_valores + [
+                {"$match": {"respuestas.pregunta_id": {"$in": textos_ids}}},
+                {"$group": {"_id": "$respuestas.pregunta_id", "textos": {"$firstN": {"input": "$respuestas.valor", "n": max_textos}}}},
+            ],
+        }}
+    ]
+
+
+def codificar_llave(valor):
+    """MongoDB no admite '.' ni '$' en nombres de campo: se reemplazan por sus equivalentes de ancho completo."""
+    return str(valor).replace("$", "\uff04").replace(".", "\uff0e")
+
+
+def decodificar_llave(llave):
+    return llave.replace("\uff04", "$").replace("\uff0e", ".")
+
+
+def _id_referencia(ref):
+    return getattr(ref, "id", ref)
+
+
+class EstadisticasFormulario(Document):
+    """
+    Contadores de estadísticas de un formulario. Se actualizan con $inc cada vez
+    que se crea, edita o elimina una respuesta, de modo que leer las estadísticas
+    es una sola consulta. Si se desincronizan, `manage.py reconstruir_estadisticas`
+    los recalcula desde las respuestas.
+
+    Un documento sin fecha_reconstruccion lo creó el $inc de una respuesta nueva
+    y puede no incluir las anteriores: la vista de estadísticas lo reconstruye
+    la primera vez que lo lee.
+    """
+    formulario = ReferenceField('Formulario', required=True, unique=True)
+    total_respuestas = IntField(default=0)
+    tiempo_total = LongField(default=0)
+    tiempo_cantidad = IntField(default=0)
+    dispositivos = DictField()
+    navegadores = DictField()
+    fechas = DictField()
+    # {"<pregunta_id>": {"total": n, "valores": {"<valor>": n}, "textos": [...]}}
+    preguntas = DictField()
+    fecha_actualizacion = DateTimeField(default=datetime.utcnow)
+    fecha_reconstruccion = DateTimeField()
+
+    meta = {
+        'collection': 'estadisticasFormularios'
+    }
+
+    @staticmethod
+    def incrementos(respuesta, signo=1, incluir_envio=True):
+        """
+        Calcula los $inc (y los textos libres afectados) que aporta una respuesta.
+        Con incluir_envio=False solo se consideran tiempo y valores, útil al editar.
+        """
+        inc = {}
+        textos = {}
+
+        def sumar(ruta, cantidad=1):
+            inc[ruta] = inc.get(ruta, 0) + signo * cantidad
+
+        if incluir_envio:
+            sumar("total_respuestas")
+            sumar(f"dispositivos.{codificar_llave(respuesta.dispositivo or 'Desconocido')}")
+            sumar(f"navegadores.{codificar_llave(respuesta.navegador or 'Desconocido')}")
+            if respuesta.fecha_envio:
+                sumar(f"fechas.{respuesta.fecha_envio.strftime('%Y-%m-%d')}")
+
+        if respuesta.tiempo_completacion:
+            sumar("tiempo_total", respuesta.tiempo_completacion)
+            sumar("tiempo_cantidad")
+
+        vistas = set()
+        for rp in respuesta.respuestas:
+            # Como en el cálculo original, solo cuenta la primera respuesta de cada pregunta
+            # (igual que pipeline_estadisticas, aunque venga vacía)
+            if rp.pregunta_id in vistas:
+                continue
+            vistas.add(rp.pregunta_id)
+            valores = [v for v in rp.valor if v not in (None, "")]
+            sumar(f"preguntas.{rp.pregunta_id}.total", len(valores))
+            if rp.tipo == "texto_libre":
+                if valores:
+                    textos[rp.pregunta_id] = valores
+            else:
+                for v in valores:
+                    sumar(f"preguntas.{rp.pregunta_id}.valores.{codificar_llave(v)}")
+
+        return {ruta: n for ruta, n in inc.items() if n}, textos
+
+    @staticmethod
+    def _quitar_textos(textos):
+        """
+        Update con pipeline que quita una sola aparición de cada texto: $pull
+        borraría también las muestras iguales de otras respuestas.
+        """
+        etapas = []
+        for pid, valores in textos.items():
+            ruta = f"preguntas.{pid}.textos"
+            for valor in valores:
+                etapas.append({"$set": {ruta: {"$let": {
+                    "vars": {"t": f"${ruta}", "i": {"$indexOfArray": [f"${ruta}", valor]}},
+                    "in": {"$cond": [
+                        {"$lt": ["$$i", 0]},
+                        "$$t",
+                        {"$concatArrays": [
+                            {"$slice": ["$$t", "$$i"]},
+                            {"$slice": ["$$t", {"$add": ["$$i", 1]}, {"$size": "$$t"}]},
+                        ]},
+                    ]},
+                }}}})
+        return etapas
+
+    @classmethod
+    def registrar_respuesta(cls, respuesta, signo=1):
+        """Suma (signo=1) o resta (signo=-1) una respuesta en una sola operación atómica."""
+        filtro, update, quitar = cls._operacion_respuesta(respuesta, signo)
+        coleccion = cls._get_collection()
+        coleccion.update_one(filtro, update, upsert=signo > 0)
+        if quitar:
+            coleccion.update_one(filtro, quitar)
+
+    @classmethod
+    async def registrar_respuesta_async(cls, respuesta, signo=1):
+        filtro, update, quitar = cls._operacion_respuesta(respuesta, signo)
+        coleccion = coleccion_async(cls)
+        await coleccion.update_one(filtro, update, upsert=signo > 0)
+        if quitar:
+            await coleccion.update_one(filtro, quitar)
+
+    @classmethod
+    def _operacion_respuesta(cls, respuesta, signo):
+        """(filtro, update, pipeline que quita textos o None) de registrar_respuesta."""
+        inc, textos = cls.incrementos(respuesta, signo)
+        update = {"$inc": inc, "$set": {"fecha_actualizacion": datetime.utcnow()}}
+        quitar = None
+        if textos:
+            if signo > 0:
+                update["$push"] = {
+                    f"preguntas.{pid}.textos": {"$each": valores, "$slice": -MAX_TEXTOS_ESTADISTICAS}
+                    for pid, valores in textos.items()
+                }
+            else:
+                quitar = cls._quitar_textos(textos)
+        return {"formulario": _id_referencia(respuesta.formulario)}, update, quitar
+
+    @classmethod
+    def registrar_lote(cls, formulario_id, respuestas):
+        """Suma varias respuestas nuevas del mismo formulario en una sola operación."""
+        inc, textos = {}, {}
+        for respuesta in respuestas:
+            inc_respuesta, textos_respuesta = cls.incrementos(respuesta)
+            for ruta, n in inc_respuesta.items():
+                inc[ruta] = inc.get(ruta, 0) + n
+            for pid, valores in textos_respuesta.items():
+                textos.setdefault(pid, []).extend(valores)
+        if not inc:
+            return
+
+        update = {"$inc": inc, "$set": {"fecha_actualizacion": datetime.utcnow()}}
+        if textos:
+            update["$push"] = {
+                f"preguntas.{pid}.textos": {"$each": valores[-MAX_TEXTOS_ESTADISTICAS:], "$slice": -MAX_TEXTOS_ESTADISTICAS}
+                for pid, valores in textos.items()
+            }
+        cls._get_collection().update_one({"formulario": formulario_id}, update, upsert=True)
+
+    @classmethod
+    def registrar_edicion(cls, anterior, actual):
+        """Aplica la diferencia entre la versión anterior y la actual de una respuesta editada."""
+        inc_anterior, textos_anteriores = cls.incrementos(anterior, -1, incluir_envio=False)
+        inc, textos = cls.incrementos(actual, 1, incluir_envio=False)
+        for ruta, n in inc_anterior.items():
+            inc[ruta] = inc.get(ruta, 0) + n
+        inc = {ruta: n for ruta, n in inc.items() if n}
+
+        filtro = {"formulario": _id_referencia(actual.formulario)}
+        update = {"$set": {"fecha_actualizacion": datetime.utcnow()}}
+        if inc:
+            update["$inc"] = inc
+        coleccion = cls._get_collection()
+        coleccion.update_one(filtro, update)
+        # Quitar los textos anteriores y agregar los nuevos tocan el mismo campo: van por separado
+        if textos_anteriores:
+            coleccion.update_one(filtro, cls._quitar_textos(textos_anteriores))
+        if textos:
+            coleccion.update_one(filtro, {"$push": {
+                f"preguntas.{pid}.textos": {"$each": v, "$slice": -MAX_TEXTOS_ESTADISTICAS}
+                for pid, v in textos.items()
+            }})
+
+    @classmethod
+    def desde_facet(cls, formulario_id, facet):
+        """Construye el documento de estadísticas a partir del resultado de pipeline_estadisticas."""
+        resumen = (facet.get("resumen") or [{}])[0]
+        preguntas = {}
+
+        def pregunta(pid):
+            return preguntas.setdefault(str(pid), {"total": 0, "valores": {}, "textos": []})
+
+        for t in facet.get("totales", []):
+            pregunta(t["_id"])["total"] = t["total"]
+        for c in facet.get("conteos", []):
+            pregunta(c["_id"]["p"])["valores"][codificar_llave(c["_id"]["v"])] = c["value"]
+        for t in facet.get("textos", []):
+            # $firstN trae del más reciente al más antiguo
+            pregunta(t["_id"])["textos"] = list(reversed(t["textos"]))
+
+        return cls(
+            formulario=formulario_id,
+            total_respuestas=resumen.get("total", 0),
+            tiempo_total=resumen.get("tiempo_total", 0),
+            tiempo_cantidad=resumen.get("tiempo_cantidad", 0),
+            dispositivos={codificar_llave(d["_id"]): d["value"] for d in facet.get("dispositivos", [])},
+            navegadores={codificar_llave(n["_id"]): n["value"] for n in facet.get("navegadores", [])},
+            fechas={f["_id"]: f["cantidad"] for f in facet.get("fechas", [])},
+            preguntas=preguntas,
+            fecha_reconstruccion=datetime.utcnow(),
+        )
+
+    @classmethod
+    def reconstruir(cls, formulario):
+        """Recalcula los contadores desde las respuestas con un pipeline de agregación y los reemplaza."""
+        textos_ids = [p.id for p in formulario.preguntas if p.tipo == "texto_libre"]
+        cursor = usando_analiticas(RespuestaFormulario.objects(formulario=formulario.id)).aggregate(
+            pipeline_estadisticas(textos_ids), allowDiskUse=True
+        )
+        estadisticas = cls.desde_facet(formulario.id, next(iter(cursor), None) or {})
+        cls._get_collection().replace_one(
+            {"formulario": formulario.id}, estadisticas.to_mongo().to_dict(), upsert=True
+        )
+        return estadisticas
@@ -1,10 +1,66 @@
 # responseapp/serializers.py
-from rest_framework import serializers
+import logging
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from bson import ObjectId
-from .models import RespuestaFormulario, Respondedor, RespuestaPregunta
+from .models import RespuestaFormulario, Respondedor, RespuestaPregunta, EstadisticasFormulario
 from formapp.models import Formulario
-from mongoengine.errors import DoesNotExist
-from utils.email_utils import send_form_responses_copy
+from formapp.cache import obtener_formulario
+from mongoengine.errors import DoesNotExist, NotUniqueError
+from pymongo.errors import DuplicateKeyError
+from utils.email_utils import send_form_responses_copy, send_form_responses_copy_async
+from apps.core.mongo_async import coleccion_async
+from .validadores import obtener_validador
+from apps.core.logs import enmascarar_email
+
+logger = logging.getLogger(__name__)
+
+
+class RespuestaDuplicada(APIException):
+    """El respondedor ya respondió un formulario de una sola respuesta (409)."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Ya respondiste este formulario."
+    default_code = "respuesta_duplicada"
+
+    def __init__(self, respuesta_id=None):
+        super().__init__()
+        self.respuesta_id = respuesta_id
+
+
+def formulario_una_respuesta(formulario):
+    return bool(getattr(getattr(formulario, "configuracion", None), "una_respuesta", False))
+
+
+def _lista_copia(respuestas):
+    """Preguntas y respuestas para el correo con la copia."""
+    return [{
+        "pregunta": rp.pregunta_id,
+        "respuesta": ", ".join(rp.valor) if isinstance(rp.valor, list) else rp.valor
+    } for rp in respuestas]
+
+
+class RespuestaLoteItemSerializer(serializers.Serializer):
+    """
+    Una respuesta dentro de la carga masiva (POST /api/respuestas/lote/).
+    El formulario va una sola vez en el cuerpo del lote; fecha_envio permite
+    importar respuestas recogidas sin conexión o de encuestas anteriores.
+    """
+    respondedor = serializers.DictField(required=False, allow_null=True)
+    tiempo_completacion = serializers.IntegerField(required=False, default=0)
+    fecha_envio = serializers.DateTimeField(required=False, allow_null=True)
+    respuestas = serializers.ListField(
+        child=serializers.DictField()
+    )
+
+    def __init__(self, *args, validador=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validador = validador
+
+    def validate(self, data):
+        errores = self.validador.validar(data.get("respuestas", []))
+        if errores:
+            raise serializers.ValidationError(errores)
+        return data
 
 
 class RespuestaFormularioSerializer(serializers.Serializer):
@@ -30,82 +86,21 @@ class RespuestaFormularioSerializer(serializers.Serializer):
                 raise serializers.ValidationError({"formulario": "Campo requerido."})
             
             try:
-                form_obj = Formulario.objects.get(id=ObjectId(form_id_str))
+                # Lectura desde la cache de formularios (formapp/cache.py); las
+                # vistas async lo leen antes con obtener_formulario_async
+                precargado = self.context.get("formulario")
+                if precargado is not None and str(precargado.id) == str(form_id_str):
+                    form_obj = precargado
+                else:
+                    form_obj = obtener_formulario(form_id_str)
             except DoesNotExist:
                 raise serializers.ValidationError({"formulario": "Formulario no encontrado."})
         
         data["_form_obj"] = form_obj
 
-        # 🆕 VALIDACIÓN DE PREGUNTAS OBLIGATORIAS
-        respuestas_list = data.get("respuestas", [])
-        respuestas_map = {r.get("pregunta_id"): r.get("valor") for r in respuestas_list}
-        
-        errores = {}
-        for pregunta in form_obj.preguntas:
-            if pregunta.obligatorio:
-                pid = pregunta.id
-                # Verificar si la pregunta fue respondida
-                if pid not in respuestas_map:
-                     errores[f"pregunta_{pid}"] = f"¡Oops! Esta pregunta es obligatoria, no olvides responderla 📝"
-                else:
-                    valor = respuestas_map[pid]
-                    # Verificar si la respuesta está vacía (lista vacía o string vacío)
-                    if not valor or (isinstance(valor, list) and len(valor) == 0):
-                        errores[f"pregunta_{pid}"] = f"¡Oops! Esta pregunta es obligatoria, no olvides responderla 📝"
-
-        if errores:
-            raise serializers.ValidationError(errores)
-
-        # 🆕 VALIDACIÓN DE TIPOS DE PREGUNTAS (escala numérica y texto libre)
-        for pregunta in form_obj.preguntas:
-            pid = pregunta.id
-            
-            # Solo validar si la pregunta fue respondida
-            if pid in respuestas_map:
-                valor = respuestas_map[pid]
-                
-                # Validación para ESCALA NUMÉRICA
-                if pregunta.tipo == 'escala_numerica' and pregunta.validaciones:
-                    # Verificar que el valor sea numérico
-                    try:
-                        # El valor puede venir como lista o string
-                        if isinstance(valor, list):
-                            if len(valor) == 0:
-                                continue  # Ya validado en obligatorio
-                            valor_numerico = float(valor[0])
-                        else:
-                            valor_numerico = float(valor)
-                        
-                        # Validar rango
-                        if pregunta.validaciones.valor_minimo is not None:
-                            if valor_numerico < pregunta.validaciones.valor_minimo:
-                                errores[f"pregunta_{pid}"] = f"Por favor ingresa un número mayor o igual a {pregunta.validaciones.valor_minimo} 😊"
-                        
-                        if pregunta.validaciones.valor_maximo is not None:
-                            if valor_numerico > pregunta.validaciones.valor_maximo:
-                                errores[f"pregunta_{pid}"] = f"Por favor ingresa un número menor o igual a {pregunta.validaciones.valor_maximo} 😊"
-                    
-                    except (ValueError, TypeError):
-                        errores[f"pregunta_{pid}"] = f"Ups, necesitamos que ingreses un número válido aquí 🔢"
-                
-                # Validación para TEXTO LIBRE
-                elif pregunta.tipo == 'texto_libre' and pregunta.validaciones:
-                    # El valor puede venir como lista o string
-                    texto = valor[0] if isinstance(valor, list) and len(valor) > 0 else valor
-                    
-                    if isinstance(texto, str):
-                        longitud = len(texto)
-                        
-                        # Validar longitud mínima
-                        if pregunta.validaciones.longitud_minima is not None:
-                            if longitud < pregunta.validaciones.longitud_minima:
-                                errores[f"pregunta_{pid}"] = f"Tu respuesta es un poco corta. Por favor escribe al menos {pregunta.validaciones.longitud_minima} caracteres ✍️"
-                        
-                        # Validar longitud máxima
-                        if pregunta.validaciones.longitud_maxima is not None:
-                            if longitud > pregunta.validaciones.longitud_maxima:
-                                errores[f"pregunta_{pid}"] = f"Tu respuesta es un poco larga. Por favor no excedas {pregunta.validaciones.longitud_maxima} caracteres ✂️"
-
+        # 🆕 VALIDACIÓN DE PREGUNTAS (obligatorias, escala numérica, texto libre y opciones)
+        # Las reglas se compilan una vez por versión del formulario (ver validadores.py)
+        errores = obtener_validador(form_obj).validar(data.get("respuestas", []))
         if errores:
             raise serializers.ValidationError(errores)
 
@@ -115,8 +110,82 @@ class RespuestaFormularioSerializer(serializers.Serializer):
         """
         Crear una nueva respuesta de formulario
         """
+        form_obj, rf, identidad, enviar_copia = self._preparar(validated_data)
+
+        # Buscar o crear el respondedor en una sola operación (upsert indexado)
+        respondedor = rf.respondedor = Respondedor.resolver(**identidad)
+        try:
+            rf.save()
+        except NotUniqueError:
+            # El índice único parcial (formulario, respondedor) rechazó el duplicado
+            existente = RespuestaFormulario.objects(
+                formulario=form_obj.id, respondedor=respondedor.id
+            ).only("id").first()
+            raise RespuestaDuplicada(str(existente.id) if existente else None)
+
+        # Actualizar contadores de estadísticas ($inc atómico)
+        try:
+            EstadisticasFormulario.registrar_respuesta(rf)
+        except Exception:
+            logger.warning("no se pudieron actualizar las estadísticas formulario=%s", form_obj.id, exc_info=True)
+        self._log_guardada(rf, form_obj, respondedor)
+        
+        # 🆕 Enviar copia por correo — AHORA FUNCIONA
+        email = identidad["email"]
+        if enviar_copia and email:
+            send_form_responses_copy(
+                recipient_email=email,
+                form_title=form_obj.titulo,
+                respuestas_list=_lista_copia(rf.respuestas)
+            )
+            logger.info("copia de respuesta enviada respuesta=%s email=%s", rf.id, enmascarar_email(email))
+        
+        return rf
+
+    async def crear_async(self):
+        """
+        create() para las vistas async (modo ASGI): mismas reglas, pero las
+        escrituras van por el cliente async de MongoDB. Llamar después de is_valid().
+        """
+        form_obj, rf, identidad, enviar_copia = self._preparar({**self.validated_data})
+
+        respondedor = rf.respondedor = await Respondedor.resolver_async(**identidad)
+        rf.validate()
+        coleccion = coleccion_async(RespuestaFormulario)
+        try:
+            resultado = await coleccion.insert_one(rf.to_mongo().to_dict())
+        except DuplicateKeyError:
+            existente = await coleccion.find_one(
+                {"formulario": form_obj.id, "respondedor": respondedor.id}, {"_id": 1}
+            )
+            raise RespuestaDuplicada(str(existente["_id"]) if existente else None)
+        rf.id = resultado.inserted_id
+
+        try:
+            await EstadisticasFormulario.registrar_respuesta_async(rf)
+        except Exception:
+            logger.warning("no se pudieron actualizar las estadísticas formulario=%s", form_obj.id, exc_info=True)
+        self._log_guardada(rf, form_obj, respondedor)
+
+        email = identidad["email"]
+        if enviar_copia and email:
+            await send_form_responses_copy_async(
+                recipient_email=email,
+                form_title=form_obj.titulo,
+                respuestas_list=_lista_copia(rf.respuestas)
+            )
+            logger.info("copia de respuesta enviada respuesta=%s email=%s", rf.id, enmascarar_email(email))
+
+        self.instance = rf
+        return rf
+
+    def _preparar(self, validated_data):
+        """
+        Arma la RespuestaFormulario sin respondedor ni guardar. Devuelve
+        (formulario, respuesta, identidad del respondedor para resolver(), enviar_copia).
+        """
         form_obj = validated_data.pop("_form_obj")
-        respondedor_data = validated_data.pop("respondedor", {})
+        respondedor_data = validated_data.pop("respondedor", None) or {}
         tiempo_completacion = validated_data.pop("tiempo_completacion", 0)
         enviar_copia = validated_data.pop("enviar_copia", False)
         respuestas_data = validated_data.pop("respuestas", [])
@@ -132,46 +201,13 @@ class RespuestaFormularioSerializer(serializers.Serializer):
         navegador_final = navegador_payload if navegador_payload != "Desconocido" else "Desconocido"
         dispositivo_final = dispositivo_payload if dispositivo_payload != "Desconocido" else dispositivo_fallback
         
-        print(f"📊 Guardando respuesta - Navegador: {navegador_final}, Dispositivo: {dispositivo_final}")
-        
-        # Crear o buscar respondedor (SIN actualizar navegador/dispositivo)
-        ip = respondedor_data.get("ip_address", "0.0.0.0")
-        email = respondedor_data.get("email")
-        google_id = respondedor_data.get("google_id")
-        nombre = respondedor_data.get("nombre")
-        
-        # Buscar respondedor existente
-        respondedor = None
-        if email:
-            respondedor = Respondedor.objects(email=email).first()
-        if not respondedor and google_id:
-            respondedor = Respondedor.objects(google_id=google_id).first()
-        if not respondedor:
-            respondedor = Respondedor.objects(ip_address=ip).first()
-        
-        if not respondedor:
-            # Crear nuevo respondedor SIN navegador/dispositivo
-            respondedor = Respondedor(
-                ip_address=ip,
-                email=email,
-                nombre=nombre,
-                google_id=google_id
-            )
-            respondedor.save()
-            print(f"✅ Nuevo respondedor creado: {respondedor.id}")
-        else:
-            # ✅ Solo actualizar datos de identidad (NO navegador/dispositivo)
-            actualizado = False
-            if email and respondedor.email != email:
-                respondedor.email = email
-                actualizado = True
-            if nombre and respondedor.nombre != nombre:
-                respondedor.nombre = nombre
-                actualizado = True
-            
-            if actualizado:
-                respondedor.save()
-                print(f"✅ Respondedor actualizado (identidad): {respondedor.id}")
+        # Identidad del respondedor (SIN navegador/dispositivo)
+        identidad = {
+            "ip_address": respondedor_data.get("ip_address", "0.0.0.0"),
+            "email": respondedor_data.get("email"),
+            "google_id": respondedor_data.get("google_id"),
+            "nombre": respondedor_data.get("nombre"),
+        }
         
         # Crear las respuestas a preguntas
         respuestas_objs = []
@@ -186,35 +222,19 @@ class RespuestaFormularioSerializer(serializers.Serializer):
         # ✅ Crear RespuestaFormulario con navegador/dispositivo de ESTA respuesta
         rf = RespuestaFormulario(
             formulario=form_obj,
-            respondedor=respondedor,
             tiempo_completacion=tiempo_completacion,
             navegador=navegador_final,      # ✅ A nivel de respuesta
             dispositivo=dispositivo_final,  # ✅ A nivel de respuesta
-            respuestas=respuestas_objs
+            respuestas=respuestas_objs,
+            una_respuesta=formulario_una_respuesta(form_obj) or None
         )
-        rf.save()
-        
-        print(f"✅ RespuestaFormulario guardada con ID: {rf.id}")
-        print(f"   └─ Navegador: {rf.navegador}, Dispositivo: {rf.dispositivo}, Tiempo: {rf.tiempo_completacion}s")
-        
-        # TODO: Enviar copia por correo si enviar_copia == True
-        # 🆕 Enviar copia por correo — AHORA FUNCIONA
-        if enviar_copia and email:
-            respuestas_list = []
-            for rp in respuestas_objs:
-                respuestas_list.append({
-                    "pregunta": rp.pregunta_id,
-                    "respuesta": ", ".join(rp.valor) if isinstance(rp.valor, list) else rp.valor
-                })
+        return form_obj, rf, identidad, enviar_copia
 
-            send_form_responses_copy(
-                recipient_email=email,
-                form_title=form_obj.titulo,
-                respuestas_list=respuestas_list
-            )
-            print("📧 Copia enviada correctamente desde POST")
-        
-        return rf
+    def _log_guardada(self, rf, form_obj, respondedor):
+        logger.debug(
+            "respuesta guardada id=%s formulario=%s respondedor=%s navegador=%s dispositivo=%s tiempo=%s",
+            rf.id, form_obj.id, respondedor.id, rf.navegador, rf.dispositivo, rf.tiempo_completacion,
+        )
 
     def update(self, instance, validated_data):
         """
@@ -226,6 +246,13 @@ class RespuestaFormularioSerializer(serializers.Serializer):
         enviar_copia = validated_data.pop("enviar_copia", False)
         respuestas_data = validated_data.pop("respuestas", [])
 
+        # Copia de la versión anterior para descontarla de las estadísticas
+        anterior = RespuestaFormulario(
+            formulario=instance.formulario,
+            tiempo_completacion=instance.tiempo_completacion,
+            respuestas=list(instance.respuestas)
+        )
+
         instance.tiempo_completacion = tiempo_completacion
 
         # Reconstruir respuestas
@@ -241,22 +268,20 @@ class RespuestaFormularioSerializer(serializers.Serializer):
         instance.respuestas = respuestas_objs
         instance.save()
 
+        try:
+            EstadisticasFormulario.registrar_edicion(anterior, instance)
+        except Exception:
+            logger.warning("no se pudieron actualizar las estadísticas respuesta=%s", instance.id, exc_info=True)
+
         # 🆕 Enviar copia por correo también en UPDATE
         email = respondedor_data.get("email") or (instance.respondedor.email if instance.respondedor else None)
 
         if enviar_copia and email:
-            respuestas_list = []
-            for rp in respuestas_objs:
-                respuestas_list.append({
-                    "pregunta": rp.pregunta_id,
-                    "respuesta": ", ".join(rp.valor) if isinstance(rp.valor, list) else rp.valor
-                })
-
             send_form_responses_copy(
                 recipient_email=email,
                 form_title=form_obj.titulo if form_obj else instance.formulario.titulo,
-                respuestas_list=respuestas_list
+                respuestas_list=_lista_copia(respuestas_objs)
             )
-            print("📧 Copia enviada correctamente desde PUT")
+            logger.info("copia de respuesta enviada respuesta=%s email=%s", instance.id, enmascarar_email(email))
 
         return instance
\ No newline at end of file
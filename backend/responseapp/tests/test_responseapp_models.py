@@ -3,3 +3,252 @@ import pytest
 pytestmark = pytest.mark.django_db
 
 # Aquí irán las pruebas de los modelos de responseapp
+
+
+class TestEstadisticasFormularioIncrementos:
+    """
+    Verifica los $inc que aporta una respuesta a los contadores
+    de EstadisticasFormulario (sin conectarse a MongoDB).
+    """
+
+    def _respuesta(self, valores_p1, texto=None, tiempo=30):
+        from datetime import datetime
+        from responseapp.models import RespuestaFormulario, RespuestaPregunta
+        respuestas = [RespuestaPregunta(pregunta_id=1, tipo="checkbox", valor=valores_p1)]
+        if texto:
+            respuestas.append(RespuestaPregunta(pregunta_id=2, tipo="texto_libre", valor=[texto]))
+        return RespuestaFormulario(
+            fecha_envio=datetime(2024, 1, 5, 10, 0, 0),
+            tiempo_completacion=tiempo,
+            navegador="Chrome",
+            dispositivo="Desktop",
+            respuestas=respuestas,
+        )
+
+    def test_incrementos_de_una_respuesta_nueva(self):
+        from responseapp.models import EstadisticasFormulario
+        inc, textos = EstadisticasFormulario.incrementos(self._respuesta(["A", "B"], texto="Hola"))
+
+        assert inc["total_respuestas"] == 1
+        assert inc["dispositivos.Desktop"] == 1
+        assert inc["navegadores.Chrome"] == 1
+        assert inc["fechas.2024-01-05"] == 1
+        assert inc["tiempo_total"] == 30
+        assert inc["preguntas.1.total"] == 2
+        assert inc["preguntas.1.valores.A"] == 1
+        assert inc["preguntas.2.total"] == 1
+        assert textos == {2: ["Hola"]}
+
+    def test_valores_con_punto_se_codifican(self):
+        from responseapp.models import EstadisticasFormulario, decodificar_llave
+        inc, _ = EstadisticasFormulario.incrementos(self._respuesta(["v1.5 $"]), signo=-1)
+        llave = next(k for k in inc if k.startswith("preguntas.1.valores."))
+
+        assert inc[llave] == -1
+        assert llave.count(".") == 3
+        assert decodificar_llave(llave.split(".", 3)[3]) == "v1.5 $"
+
+    def test_cuenta_como_el_pipeline_primera_respuesta_y_sin_vacios(self):
+        from responseapp.models import EstadisticasFormulario, RespuestaPregunta
+        respuesta = self._respuesta(["A", "", "B"])
+        respuesta.respuestas.append(RespuestaPregunta(pregunta_id=1, tipo="checkbox", valor=["C"]))
+        respuesta.respuestas.append(RespuestaPregunta(pregunta_id=3, tipo="texto_libre", valor=[""]))
+        inc, textos = EstadisticasFormulario.incrementos(respuesta)
+
+        assert inc["preguntas.1.total"] == 2
+        assert "preguntas.1.valores.C" not in inc
+        assert not any(k.startswith("preguntas.3.") for k in inc)
+        assert textos == {}
+
+    def test_eliminar_quita_una_sola_muestra_de_texto(self):
+        from unittest.mock import patch
+        from bson import ObjectId
+        from responseapp.models import EstadisticasFormulario
+        respuesta = self._respuesta(["A"], texto="Bien")
+        respuesta.formulario = ObjectId()
+
+        with patch.object(EstadisticasFormulario, "_get_collection") as mock_col:
+            EstadisticasFormulario.registrar_respuesta(respuesta, signo=-1)
+
+        (_, update), (_, quitar) = [c[0] for c in mock_col.return_value.update_one.call_args_list]
+        assert "$pull" not in update and update["$inc"]["total_respuestas"] == -1
+        # Pipeline: busca la primera aparición y la recorta, sin tocar las iguales
+        expresion = quitar[0]["$set"]["preguntas.2.textos"]["$let"]
+        assert expresion["vars"]["i"] == {"$indexOfArray": ["$preguntas.2.textos", "Bien"]}
+
+    def test_edicion_solo_aplica_diferencias(self):
+        from unittest.mock import patch
+        from bson import ObjectId
+        from responseapp.models import EstadisticasFormulario
+        form_id = ObjectId()
+        anterior = self._respuesta(["A"])
+        actual = self._respuesta(["B"], tiempo=50)
+        anterior.formulario = actual.formulario = form_id
+
+        with patch.object(EstadisticasFormulario, "_get_collection") as mock_col:
+            EstadisticasFormulario.registrar_edicion(anterior, actual)
+
+        filtro, update = mock_col.return_value.update_one.call_args[0]
+        assert filtro == {"formulario": form_id}
+        assert update["$inc"] == {
+            "tiempo_total": 20,
+            "preguntas.1.valores.A": -1,
+            "preguntas.1.valores.B": 1,
+        }
+
+
+class TestRespondedorResolver:
+    """
+    Respondedor.resolver(): un solo find_one_and_update con upsert
+    sobre la identidad más fuerte (email → google_id → ip).
+    """
+
+    def _resolver(self, *args, **kwargs):
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from responseapp.models import Respondedor
+        col = MagicMock()
+        col.find_one_and_update.return_value = {"_id": ObjectId(), "ip_address": "1.2.3.4"}
+        with patch.object(Respondedor, "_get_collection", return_value=col):
+            respondedor = Respondedor.resolver(*args, **kwargs)
+        return respondedor, col
+
+    def test_email_es_la_clave_del_upsert(self):
+        respondedor, col = self._resolver("1.2.3.4", email="a@example.com", google_id="42", nombre="Ana")
+
+        filtro, operacion = col.find_one_and_update.call_args[0]
+        assert filtro == {"email": "a@example.com"}
+        assert operacion["$set"]["nombre"] == "Ana"
+        assert operacion["$setOnInsert"]["google_id"] == 42
+        assert operacion["$setOnInsert"]["ip_address"] == "1.2.3.4"
+        assert col.find_one_and_update.call_args[1]["upsert"] is True
+        assert col.find_one_and_update.call_count == 1
+        assert respondedor.ip_address == "1.2.3.4"
+
+    def test_anonimo_se_identifica_por_ip(self):
+        _, col = self._resolver("1.2.3.4")
+
+        filtro, operacion = col.find_one_and_update.call_args[0]
+        assert filtro == {"ip_address": "1.2.3.4"}
+        assert "ip_address" not in operacion["$setOnInsert"]
+
+    def test_carrera_con_clave_duplicada_reintenta_sin_upsert(self):
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from pymongo.errors import DuplicateKeyError
+        from responseapp.models import Respondedor
+        col = MagicMock()
+        col.find_one_and_update.side_effect = [DuplicateKeyError("dup"), {"_id": ObjectId(), "ip_address": "x"}]
+        with patch.object(Respondedor, "_get_collection", return_value=col):
+            Respondedor.resolver("x", google_id=7)
+
+        assert col.find_one_and_update.call_count == 2
+        assert "upsert" not in col.find_one_and_update.call_args[1]
+
+    def test_google_id_de_otro_respondedor_se_busca_por_google_id(self):
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from pymongo.errors import DuplicateKeyError
+        from responseapp.models import Respondedor
+        existente = ObjectId()
+        col = MagicMock()
+        # El email es nuevo pero el google_id ya lo tiene otro respondedor
+        col.find_one_and_update.side_effect = [DuplicateKeyError("dup"), None,
+                                               {"_id": existente, "ip_address": "x", "google_id": 7}]
+        with patch.object(Respondedor, "_get_collection", return_value=col):
+            respondedor = Respondedor.resolver("x", email="nuevo@example.com", google_id=7)
+
+        assert respondedor.id == existente
+        assert col.find_one_and_update.call_args[0][0] == {"google_id": 7}
+        assert "upsert" not in col.find_one_and_update.call_args[1]
+
+    def test_resolver_lote_un_upsert_por_identidad_y_una_lectura(self):
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from responseapp.models import Respondedor
+        id_a, id_ip = ObjectId(), ObjectId()
+        col = MagicMock()
+        col.find.return_value = [{"_id": id_a, "email": "a@x.com", "ip_address": "1.1.1.1"},
+                                 {"_id": id_ip, "ip_address": "2.2.2.2"}]
+        identidades = [
+            {"ip_address": "1.1.1.1", "email": "a@x.com"},
+            {"ip_address": "2.2.2.2"},
+            {"ip_address": "9.9.9.9", "email": "a@x.com", "nombre": "Ana"},
+        ]
+        with patch.object(Respondedor, "_get_collection", return_value=col):
+            ids = Respondedor.resolver_lote(identidades)
+
+        assert ids == [id_a, id_ip, id_a]
+        operaciones = col.bulk_write.call_args[0][0]
+        assert len(operaciones) == 2
+        col.find.assert_called_once()
+
+
+class TestDeduplicarRespondedores:
+    """
+    manage.py deduplicar_respondedores: fusiona los repetidos en el más antiguo
+    antes de crear los índices únicos.
+    """
+
+    def test_fusiona_en_el_mas_antiguo_y_crea_los_indices(self):
+        import io
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from django.core.management import call_command
+        from responseapp.models import Respondedor, RespuestaFormulario
+        viejo, nuevo, respuesta_repetida = ObjectId(), ObjectId(), ObjectId()
+        respondedores, respuestas = MagicMock(), MagicMock()
+        respondedores.aggregate.side_effect = [[{"_id": "ana@example.com", "ids": [viejo, nuevo]}], []]
+        respondedores.find.return_value = [{"_id": nuevo, "google_id": 42}]
+        respondedores.find_one.return_value = {"_id": viejo, "email": "ana@example.com"}
+        respondedores.count_documents.return_value = 0
+        respuestas.aggregate.return_value = [{"_id": ObjectId(), "ids": [ObjectId(), respuesta_repetida]}]
+        respuestas.update_many.return_value = MagicMock(modified_count=3)
+        colecciones = {Respondedor: respondedores, RespuestaFormulario: respuestas}
+        salida = io.StringIO()
+        with patch("responseapp.management.commands.deduplicar_respondedores.coleccion_sin_indices",
+                   side_effect=colecciones.get), \
+             patch.object(Respondedor, "ensure_indexes") as mock_indices:
+            call_command("deduplicar_respondedores", stdout=salida)
+
+        desmarcar, reasignar = respuestas.update_many.call_args_list
+        assert desmarcar[0] == ({"_id": {"$in": [respuesta_repetida]}}, {"$unset": {"una_respuesta": ""}})
+        assert reasignar[0] == ({"respondedor": {"$in": [nuevo]}}, {"$set": {"respondedor": viejo}})
+        respondedores.delete_many.assert_called_once_with({"_id": {"$in": [nuevo]}})
+        respondedores.update_one.assert_called_once_with({"_id": viejo}, {"$set": {"google_id": 42}})
+        mock_indices.assert_called_once()
+        assert "a***@example.com" in salida.getvalue()
+        assert "1 respondedor(es) fusionados" in salida.getvalue()
+
+
+class TestMarcarUnaRespuesta:
+    """manage.py marcar_una_respuesta: backfill del campo antes de crear el índice."""
+
+    def test_marca_la_primera_respuesta_de_cada_respondedor_por_lotes(self):
+        import io
+        from unittest.mock import patch, MagicMock
+        from bson import ObjectId
+        from django.core.management import call_command
+        from formapp.models import Formulario
+        from responseapp.models import RespuestaFormulario
+        form_id = ObjectId()
+        primeras = [ObjectId() for _ in range(3)]
+        formularios, respuestas = MagicMock(), MagicMock()
+        formularios.find.return_value = [{"_id": form_id}]
+        respuestas.aggregate.return_value = [{"_id": ObjectId(), "primera": id_} for id_ in primeras]
+        respuestas.update_many.return_value = MagicMock(modified_count=2)
+        colecciones = {Formulario: formularios, RespuestaFormulario: respuestas}
+        salida = io.StringIO()
+        with patch("responseapp.management.commands.marcar_una_respuesta.coleccion_sin_indices",
+                   side_effect=colecciones.get), \
+             patch.object(RespuestaFormulario, "ensure_indexes") as mock_indices:
+            call_command("marcar_una_respuesta", "--lote", "2", stdout=salida)
+
+        assert formularios.find.call_args[0][0] == {"configuracion.una_respuesta": True}
+        pipeline = respuestas.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"formulario": form_id}}
+        assert pipeline[-1] == {"$match": {"marcada": {"$ne": True}}}
+        lotes = [c[0][0]["_id"]["$in"] for c in respuestas.update_many.call_args_list]
+        assert lotes == [primeras[:2], primeras[2:]]
+        mock_indices.assert_called_once()
+        assert "4 respuesta(s) marcadas en 1 formulario(s)" in salida.getvalue()
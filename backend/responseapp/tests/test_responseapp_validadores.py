@@ -0,0 +1,74 @@
+# responseapp/tests/test_responseapp_validadores.py
+"""
+Pruebas del validador compilado de respuestas (responseapp/validadores.py):
+compilación única por versión del formulario e invalidación al editarlo.
+"""
+import pytest
+from bson import ObjectId
+from formapp.models import Formulario, Pregunta, Opcion, Validaciones
+from responseapp.validadores import (
+    ValidadorFormulario,
+    obtener_validador,
+    invalidar_validador,
+    MENSAJE_OBLIGATORIA,
+    MENSAJE_OPCION_INVALIDA,
+)
+
+
+def _make_formulario(version=0):
+    """Helper: formulario (sin guardar) con una pregunta de cada tipo."""
+    return Formulario(
+        id=ObjectId(),
+        titulo="Encuesta",
+        version_esquema=version,
+        preguntas=[
+            Pregunta(id=1, tipo="opcion_multiple", enunciado="Color", obligatorio=True,
+                     opciones=[Opcion(texto="Rojo"), Opcion(texto="Azul")]),
+            Pregunta(id=2, tipo="escala_numerica", enunciado="Nota",
+                     validaciones=Validaciones(valor_minimo=1, valor_maximo=5)),
+            Pregunta(id=3, tipo="texto_libre", enunciado="Comentario",
+                     validaciones=Validaciones(longitud_minima=3, longitud_maxima=10)),
+        ],
+    )
+
+
+class TestValidadorFormulario:
+
+    def test_respuestas_validas_no_tienen_errores(self):
+        validador = ValidadorFormulario(_make_formulario().preguntas)
+        errores = validador.validar([
+            {"pregunta_id": 1, "valor": ["Rojo"]},
+            {"pregunta_id": 2, "valor": ["4"]},
+            {"pregunta_id": 3, "valor": ["Muy bien"]},
+        ])
+        assert errores == {}
+
+    def test_obligatoria_faltante_se_reporta_antes_que_tipos(self):
+        validador = ValidadorFormulario(_make_formulario().preguntas)
+        errores = validador.validar([{"pregunta_id": 2, "valor": ["99"]}])
+        assert errores == {"pregunta_1": MENSAJE_OBLIGATORIA}
+
+    def test_rango_longitud_y_opcion_invalidos(self):
+        validador = ValidadorFormulario(_make_formulario().preguntas)
+        errores = validador.validar([
+            {"pregunta_id": 1, "valor": ["Verde"]},
+            {"pregunta_id": 2, "valor": ["9"]},
+            {"pregunta_id": 3, "valor": ["no"]},
+        ])
+        assert errores["pregunta_1"] == MENSAJE_OPCION_INVALIDA
+        assert "menor o igual a 5" in errores["pregunta_2"]
+        assert "al menos 3" in errores["pregunta_3"]
+
+    def test_validador_se_compila_una_vez_por_version(self):
+        form = _make_formulario()
+        primero = obtener_validador(form)
+        assert obtener_validador(form) is primero
+
+        form.version_esquema = 1
+        assert obtener_validador(form) is not primero
+
+    def test_invalidar_elimina_versiones_en_cache(self):
+        form = _make_formulario()
+        primero = obtener_validador(form)
+        invalidar_validador(form.id)
+        assert obtener_validador(form) is not primero
@@ -11,10 +11,17 @@ CP-10: Exportación de Datos a CSV (RF-10)
 import pytest
 import io
 import csv as csv_module
+from bson import ObjectId
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 from django.test import RequestFactory
-from responseapp.views import FormularioEstadisticasAPI, FormularioExportarAPI
+from responseapp.views import (
+    FormularioEstadisticasAPI,
+    FormularioExportarAPI,
+    RespuestaPropiaAPI,
+    RespuestaListCreateAPI,
+    RespuestaLoteAPI,
+)
 
 
 def _make_mock_form_con_respuestas(n_respuestas=3):
@@ -58,6 +65,58 @@ def _make_mock_form_con_respuestas(n_respuestas=3):
     return mock_form, respuestas_objs
 
 
+def _make_facet_estadisticas(respuestas):
+    """
+    Helper: construye el documento que devuelve el pipeline $facet de
+    estadísticas a partir de las respuestas mockeadas.
+    """
+    if not respuestas:
+        return {"resumen": [], "dispositivos": [], "navegadores": [], "fechas": [],
+                "totales": [], "conteos": [], "textos": []}
+    conteos = {}
+    for r in respuestas:
+        for rp in r.respuestas:
+            for v in rp.valor:
+                conteos[(rp.pregunta_id, v)] = conteos.get((rp.pregunta_id, v), 0) + 1
+    return {
+        "resumen": [{
+            "_id": None,
+            "total": len(respuestas),
+            "tiempo_total": sum(r.tiempo_completacion for r in respuestas),
+            "tiempo_cantidad": len(respuestas),
+        }],
+        "dispositivos": [{"_id": "Desktop", "value": len(respuestas)}],
+        "navegadores": [{"_id": "Chrome", "value": len(respuestas)}],
+        "fechas": [{"_id": r.fecha_envio.strftime("%Y-%m-%d"), "cantidad": 1} for r in respuestas],
+        "totales": [{"_id": 1, "total": sum(conteos.values())}],
+        "conteos": [{"_id": {"p": p, "v": v}, "value": c} for (p, v), c in conteos.items()],
+        "textos": [],
+    }
+
+
+def _make_documentos_raw(respuestas):
+    """
+    Helper: convierte las respuestas mockeadas en documentos crudos de pymongo
+    (como los lee la exportación) y sus respondedores.
+    """
+    docs, respondedores = [], []
+    for r in respuestas:
+        respondedor_id = ObjectId()
+        respondedores.append({"_id": respondedor_id, "email": r.respondedor.email, "nombre": r.respondedor.nombre})
+        docs.append({
+            "_id": ObjectId(),
+            "fecha_envio": r.fecha_envio,
+            "dispositivo": r.dispositivo,
+            "navegador": r.navegador,
+            "tiempo_completacion": r.tiempo_completacion,
+            "respondedor": respondedor_id,
+            "respuestas": [
+                {"pregunta_id": rp.pregunta_id, "tipo": rp.tipo, "valor": rp.valor} for rp in r.respuestas
+            ],
+        })
+    return docs, respondedores
+
+
 class TestFormularioEstadisticasAPI:
     """
     CP-07 | RF-11: Suite para validar el endpoint de estadísticas que
@@ -79,9 +138,12 @@ class TestFormularioEstadisticasAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection"):
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = MagicMock(count=lambda: 3, __iter__=lambda s: iter(respuestas))
+            mock_est_qs.return_value.first.return_value = None  # fuerza la reconstrucción
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas(respuestas)])
 
             response = self.view(request, id=form_id)
 
@@ -97,11 +159,12 @@ class TestFormularioEstadisticasAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection"):
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = MagicMock(
-                count=lambda: len(respuestas), __iter__=lambda s: iter(respuestas)
-            )
+            mock_est_qs.return_value.first.return_value = None  # fuerza la reconstrucción
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas(respuestas)])
             response = self.view(request, id=form_id)
 
         assert response.data["total_respuestas"] == 3
@@ -116,11 +179,12 @@ class TestFormularioEstadisticasAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection"):
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = MagicMock(
-                count=lambda: len(respuestas), __iter__=lambda s: iter(respuestas)
-            )
+            mock_est_qs.return_value.first.return_value = None  # fuerza la reconstrucción
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas(respuestas)])
             response = self.view(request, id=form_id)
 
         preguntas = response.data.get("preguntas", [])
@@ -131,6 +195,77 @@ class TestFormularioEstadisticasAPI:
         assert "enunciado" in primera
         assert "datos" in primera
 
+    def test_estadisticas_agrupa_opciones_y_promedia_tiempo(self):
+        """
+        CP-07 | RF-11: Los conteos por opción y el tiempo promedio se arman
+        a partir del resultado del pipeline de agregación.
+        """
+        mock_form, respuestas = _make_mock_form_con_respuestas(3)
+        form_id = str(mock_form.id)
+        request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
+
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection"):
+            mock_form_qs.get.return_value = mock_form
+            mock_est_qs.return_value.first.return_value = None  # fuerza la reconstrucción
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas(respuestas)])
+            response = self.view(request, id=form_id)
+
+        assert response.data["tiempo_promedio"] == 40
+        assert response.data["dispositivos"] == [{"name": "Desktop", "value": 3}]
+        datos = response.data["preguntas"][0]["datos"]
+        assert {"name": "Google", "value": 1} in datos
+        assert response.data["preguntas"][0]["total_respuestas"] == 3
+        assert len(response.data["respuestas_por_fecha"]) == 3
+
+    def test_estadisticas_creadas_por_un_inc_se_reconstruyen(self):
+        """
+        Un documento que creó el $inc de la primera respuesta nueva de un
+        formulario con respuestas anteriores se reconstruye al leerlo.
+        """
+        from responseapp.models import EstadisticasFormulario
+        mock_form, respuestas = _make_mock_form_con_respuestas(3)
+        form_id = str(mock_form.id)
+        parcial = EstadisticasFormulario(formulario=ObjectId(form_id), total_respuestas=1)
+        request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
+
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection") as mock_col:
+            mock_form_qs.get.return_value = mock_form
+            mock_est_qs.return_value.first.return_value = parcial
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas(respuestas)])
+            response = self.view(request, id=form_id)
+
+        assert response.data["total_respuestas"] == 3
+        reemplazo = mock_col.return_value.replace_one.call_args[0][1]
+        assert reemplazo["fecha_reconstruccion"] is not None
+
+    def test_estadisticas_lee_contadores_sin_recorrer_respuestas(self):
+        """
+        Si ya existe el documento EstadisticasFormulario, se responde con sus
+        contadores sin consultar ni agregar las respuestas.
+        """
+        from responseapp.models import EstadisticasFormulario
+        mock_form, respuestas = _make_mock_form_con_respuestas(3)
+        form_id = str(mock_form.id)
+        stats = EstadisticasFormulario.desde_facet(ObjectId(form_id), _make_facet_estadisticas(respuestas))
+        request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
+
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs:
+            mock_form_qs.get.return_value = mock_form
+            mock_est_qs.return_value.first.return_value = stats
+            response = self.view(request, id=form_id)
+
+        mock_resp_qs.assert_not_called()
+        assert response.data["total_respuestas"] == 3
+        assert {"name": "Recomendación", "value": 1} in response.data["preguntas"][0]["datos"]
+
     def test_estadisticas_formulario_sin_respuestas_retorna_total_cero(self):
         """
         CP-07 | RF-11: Si el formulario no tiene respuestas aún,
@@ -143,9 +278,12 @@ class TestFormularioEstadisticasAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/estadisticas/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs, \
+             patch("responseapp.views.EstadisticasFormulario.objects") as mock_est_qs, \
+             patch("responseapp.views.EstadisticasFormulario._get_collection"):
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = MagicMock(count=lambda: 0, __iter__=lambda s: iter([]))
+            mock_est_qs.return_value.first.return_value = None  # fuerza la reconstrucción
+            mock_resp_qs.return_value.aggregate.return_value = iter([_make_facet_estadisticas([])])
             response = self.view(request, id=form_id)
 
         assert response.status_code == 200
@@ -186,9 +324,12 @@ class TestFormularioExportarAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/exportar/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = iter(respuestas)
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
             response = self.view(request, id=form_id)
 
         assert "text/csv" in response["Content-Type"]
@@ -203,9 +344,12 @@ class TestFormularioExportarAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/exportar/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = iter(respuestas)
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
             response = self.view(request, id=form_id)
 
         assert "attachment" in response["Content-Disposition"]
@@ -220,9 +364,12 @@ class TestFormularioExportarAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/exportar/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = iter(respuestas)
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
             response = self.view(request, id=form_id)
 
         # Leer contenido del CSV
@@ -247,9 +394,12 @@ class TestFormularioExportarAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/exportar/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = iter(respuestas)
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
             response = self.view(request, id=form_id)
 
         csv_content = b"".join(response.streaming_content) if hasattr(response, "streaming_content") else response.content
@@ -270,9 +420,12 @@ class TestFormularioExportarAPI:
         request = self.factory.get(f"/api/formularios/{form_id}/exportar/")
 
         with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
-             patch("responseapp.views.RespuestaFormulario.objects") as mock_resp_qs:
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
             mock_form_qs.get.return_value = mock_form
-            mock_resp_qs.return_value = iter(respuestas)
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
             response = self.view(request, id=form_id)
 
         csv_content = b"".join(response.streaming_content) if hasattr(response, "streaming_content") else response.content
@@ -282,6 +435,49 @@ class TestFormularioExportarAPI:
         data_rows = rows[1:]
         assert len(data_rows) == n
 
+    def test_exportar_csv_resuelve_respondedores_por_lote(self):
+        """
+        CP-10 | RF-10: Los respondedores se consultan una vez por lote ($in)
+        y no una vez por fila; los filtros se envían en la consulta.
+        """
+        mock_form, respuestas = _make_mock_form_con_respuestas(5)
+        form_id = str(mock_form.id)
+        request = self.factory.get(
+            f"/api/formularios/{form_id}/exportar/?dispositivo=Desktop&desde=2024-01-01&hasta=2024-01-31"
+        )
+
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col, \
+             patch.object(FormularioExportarAPI, "tamano_lote", 2):
+            mock_form_qs.get.return_value = mock_form
+            docs, respondedores = _make_documentos_raw(respuestas)
+            mock_resp_col.return_value.find.return_value = iter(docs)
+            mock_rd_col.return_value.find.return_value = respondedores
+            response = self.view(request, id=form_id)
+            csv_content = b"".join(response.streaming_content)
+
+        rows = list(csv_module.reader(io.StringIO(csv_content.decode("utf-8"))))
+        assert len(rows) == 6
+        assert rows[1][4] == "usuario0@empresa.com"
+        # 5 respuestas en lotes de 2 → 3 consultas de respondedores
+        assert mock_rd_col.return_value.find.call_count == 3
+        query = mock_resp_col.return_value.find.call_args[0][0]
+        assert query["dispositivo"] == "Desktop"
+        assert query["fecha_envio"]["$gte"] == datetime(2024, 1, 1)
+        assert query["fecha_envio"]["$lt"] == datetime(2024, 2, 1)
+
+    def test_exportar_csv_fecha_invalida_retorna_400(self):
+        mock_form, _ = _make_mock_form_con_respuestas(1)
+        form_id = str(mock_form.id)
+        request = self.factory.get(f"/api/formularios/{form_id}/exportar/?desde=01-2024")
+
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs:
+            mock_form_qs.get.return_value = mock_form
+            response = self.view(request, id=form_id)
+
+        assert response.status_code == 400
+
     def test_exportar_csv_formulario_inexistente_retorna_404(self):
         """
         CP-10: Si el formulario no existe, el endpoint retorna HTTP 404.
@@ -295,3 +491,303 @@ class TestFormularioExportarAPI:
             response = self.view(request, id=form_id)
 
         assert response.status_code == 404
+
+
+class TestRespuestaPropiaAPI:
+    """
+    Verifica el endpoint /respuestas/mi-respuesta/ que reemplaza la descarga
+    de todas las respuestas para saber si el usuario ya respondió. El
+    respondedor sale del token o del comprobante, nunca del query string.
+    """
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = RespuestaPropiaAPI.as_view()
+        self.form_id = "64b7f1e2a3c4d5e6f7a8b9c0"
+
+    def _get(self, query, email=None, privado=False):
+        from rest_framework.test import force_authenticate
+        request = self.factory.get(f"/api/respuestas/mi-respuesta/?{query}")
+        if email:
+            force_authenticate(request, user=MagicMock(is_authenticated=True, email=email, id=ObjectId()))
+        form = MagicMock(id=ObjectId(self.form_id), administrador=ObjectId())
+        form.configuracion.privado = privado
+        with patch("responseapp.views.obtener_formulario", return_value=form):
+            return self.view(request)
+
+    def test_sin_sesion_ni_comprobante_retorna_401(self):
+        response = self._get(f"formulario={self.form_id}")
+        assert response.status_code == 401
+
+    def test_el_email_del_query_string_se_ignora(self):
+        with patch("responseapp.views.Respondedor.objects") as mock_resp_qs:
+            response = self._get(f"formulario={self.form_id}&email=otro@empresa.com&ip=1.2.3.4")
+
+        assert response.status_code == 401
+        mock_resp_qs.assert_not_called()
+
+    def test_formulario_invalido_retorna_400(self):
+        request = self.factory.get("/api/respuestas/mi-respuesta/?formulario=abc")
+        response = self.view(request)
+        assert response.status_code == 400
+
+    def test_formulario_despublicado_retorna_403(self):
+        with patch("responseapp.views.Respondedor.objects") as mock_resp_qs:
+            response = self._get(f"formulario={self.form_id}", email="usuario0@empresa.com", privado=True)
+
+        assert response.status_code == 403
+        mock_resp_qs.assert_not_called()
+
+    def test_sin_respuesta_previa_retorna_null(self):
+        with patch("responseapp.views.Respondedor.objects") as mock_resp_qs, \
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_rf_qs:
+            mock_resp_qs.return_value.scalar.return_value = []
+            response = self._get(f"formulario={self.form_id}", email="nuevo@empresa.com")
+
+        assert response.status_code == 200
+        assert response.data["respondido"] is False
+        assert response.data["respuesta"] is None
+        mock_rf_qs.assert_not_called()
+
+    def test_respuesta_previa_del_usuario_autenticado(self):
+        respondedor_id = ObjectId()
+        mock_rp = MagicMock(pregunta_id=1, tipo="opcion_multiple", valor=["Google"])
+        mock_r = MagicMock(id=ObjectId(), fecha_envio=datetime(2024, 1, 1), respuestas=[mock_rp])
+
+        with patch("responseapp.views.Respondedor.objects") as mock_resp_qs, \
+             patch("responseapp.views.RespuestaFormulario.objects") as mock_rf_qs:
+            mock_resp_qs.return_value.scalar.return_value = [respondedor_id]
+            mock_rf_qs.return_value.only.return_value.order_by.return_value.first.return_value = mock_r
+            response = self._get(f"formulario={self.form_id}&email=otro@empresa.com", email="usuario0@empresa.com")
+
+        mock_resp_qs.assert_called_once_with(email="usuario0@empresa.com")
+        mock_rf_qs.assert_called_once_with(formulario=ObjectId(self.form_id), respondedor__in=[respondedor_id])
+        assert response.data["respondido"] is True
+        assert response.data["respuesta"]["id"] == str(mock_r.id)
+        assert response.data["respuesta"]["respuestas"][0]["valor"] == ["Google"]
+
+    def test_comprobante_solo_sirve_para_su_formulario(self):
+        comprobante = ObjectId()
+        with patch("responseapp.views.RespuestaFormulario.objects") as mock_rf_qs:
+            mock_rf_qs.return_value.only.return_value.first.return_value = None
+            response = self._get(f"formulario={self.form_id}&respuesta={comprobante}")
+
+        mock_rf_qs.assert_called_once_with(id=comprobante, formulario=ObjectId(self.form_id))
+        assert response.status_code == 200
+        assert response.data["respondido"] is False
+
+
+class TestRespuestaListCreateAPIListado:
+    """
+    Verifica el listado paginado por cursor de respuestas de un formulario:
+    una consulta por página y una sola consulta $in para los respondedores.
+    """
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = RespuestaListCreateAPI.as_view()
+
+    def _listar(self, url, docs, respondedores):
+        mock_form, _ = _make_mock_form_con_respuestas(0)
+        mock_form.configuracion.privado = False
+        with patch("responseapp.views.Formulario.objects") as mock_form_qs, \
+             patch("responseapp.views.RespuestaFormulario._get_collection") as mock_resp_col, \
+             patch("responseapp.views.Respondedor._get_collection") as mock_rd_col:
+            mock_form_qs.get.return_value = mock_form
+            mock_find = mock_resp_col.return_value.find
+            mock_find.return_value.sort.return_value.limit.side_effect = lambda n: iter(docs[:n])
+            mock_rd_col.return_value.find.return_value = respondedores
+            response = self.view(self.factory.get(url))
+        return response, mock_find, mock_rd_col.return_value.find
+
+    def test_primera_pagina_retorna_token_siguiente(self):
+        _, respuestas = _make_mock_form_con_respuestas(3)
+        docs, respondedores = _make_documentos_raw(respuestas)
+        response, _, mock_rd_find = self._listar(
+            "/api/respuestas/?formulario=64b7f1e2a3c4d5e6f7a8b9c0&limite=2", docs, respondedores
+        )
+
+        assert response.status_code == 200
+        assert len(response.data["resultados"]) == 2
+        assert response.data["resultados"][0]["respondedor"]["email"] == "usuario0@empresa.com"
+        assert response.data["siguiente"] is not None
+        mock_rd_find.assert_called_once()
+
+    def test_ultima_pagina_sin_token_y_cursor_en_consulta(self):
+        from apps.core.cursores import codificar_cursor
+        _, respuestas = _make_mock_form_con_respuestas(2)
+        docs, respondedores = _make_documentos_raw(respuestas)
+        token = codificar_cursor(docs[0], "fecha_envio")
+        response, mock_find, _ = self._listar(
+            f"/api/respuestas/?formulario=64b7f1e2a3c4d5e6f7a8b9c0&siguiente={token}", docs[1:], respondedores
+        )
+
+        assert response.data["siguiente"] is None
+        assert len(response.data["resultados"]) == 1
+        query = mock_find.call_args[0][0]
+        assert query["$or"][1]["_id"] == {"$lt": docs[0]["_id"]}
+
+    def test_limite_se_acota_al_maximo(self, settings):
+        settings.RESPUESTAS_PAGINA_MAXIMO = 10
+        response, _, _ = self._listar("/api/respuestas/?formulario=64b7f1e2a3c4d5e6f7a8b9c0&limite=9999", [], [])
+        assert response.data["limite"] == 10
+
+    def test_token_invalido_retorna_400(self):
+        response, _, _ = self._listar("/api/respuestas/?formulario=64b7f1e2a3c4d5e6f7a8b9c0&siguiente=xx", [], [])
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("contenido", [
+        '{"f": null, "id": "no-es-un-objectid"}',  # bson InvalidId
+        '{"f": null}',                              # falta el id
+        '["f", "id"]',                              # no es un objeto
+        '{"f": 123, "id": "64b7f1e2a3c4d5e6f7a8b9c0"}',
+    ])
+    def test_token_manipulado_retorna_400(self, contenido):
+        import base64
+        token = base64.urlsafe_b64encode(contenido.encode()).decode()
+        response, _, _ = self._listar(
+            f"/api/respuestas/?formulario=64b7f1e2a3c4d5e6f7a8b9c0&siguiente={token}", [], []
+        )
+        assert response.status_code == 400
+
+
+class TestRespuestaLoteAPI:
+    """
+    Carga masiva: el formulario y su validador se usan una vez, los respondedores
+    se resuelven por lote y las respuestas van en un solo insert_many no ordenado.
+    """
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = RespuestaLoteAPI.as_view()
+        self.form_id = "64b7f1e2a3c4d5e6f7a8b9c0"
+
+    def _item(self, email, valor="Google"):
+        return {
+            "respondedor": {"email": email, "ip_address": "1.2.3.4"},
+            "tiempo_completacion": 20,
+            "fecha_envio": "2024-03-01T10:00:00Z",
+            "respuestas": [{"pregunta_id": 1, "tipo": "opcion_multiple", "valor": [valor]}],
+        }
+
+    def _enviar(self, items, col, es_admin=True, resolver=None):
+        mock_form = MagicMock(id=ObjectId(self.form_id))
+        validador = MagicMock()
+        validador.validar.side_effect = lambda rs: {"pregunta_1": "inválida"} if rs[0]["valor"] == ["?"] else {}
+        request = self.factory.post("/api/respuestas/lote/", {"formulario": self.form_id, "respuestas": items},
+                                    content_type="application/json")
+        with patch("responseapp.views.obtener_formulario", return_value=mock_form), \
+             patch("responseapp.views.is_admin_of_form", return_value=es_admin), \
+             patch("responseapp.views.obtener_validador", return_value=validador) as mock_validador, \
+             patch("responseapp.views.Respondedor.resolver_lote",
+                   side_effect=resolver or (lambda ids: [ObjectId() for _ in ids])) as mock_resolver, \
+             patch("responseapp.views.RespuestaFormulario._get_collection", return_value=col), \
+             patch("responseapp.views.EstadisticasFormulario.registrar_lote") as mock_stats:
+            response = self.view(request)
+        return response, mock_validador, mock_resolver, mock_stats
+
+    def test_lote_inserta_validos_y_reporta_invalidos(self):
+        col = MagicMock()
+        col.insert_many.side_effect = lambda docs, ordered: [d.setdefault("_id", ObjectId()) for d in docs]
+        items = [self._item("a@x.com"), self._item("b@x.com", valor="?"), self._item("c@x.com")]
+
+        response, mock_validador, mock_resolver, mock_stats = self._enviar(items, col)
+
+        assert response.status_code == 200
+        assert response.data["creadas"] == 2
+        assert response.data["fallidas"] == 1
+        assert "id" in response.data["resultados"][0]
+        assert response.data["resultados"][1]["errores"]["pregunta_1"] == ["inválida"]
+        mock_validador.assert_called_once()
+        mock_resolver.assert_called_once()
+        assert [i["email"] for i in mock_resolver.call_args[0][0]] == ["a@x.com", "c@x.com"]
+        col.insert_many.assert_called_once()
+        documentos = col.insert_many.call_args[0][0]
+        assert len(documentos) == 2
+        assert documentos[0]["fecha_envio"] == datetime(2024, 3, 1, 10, 0, 0)
+        assert col.insert_many.call_args[1]["ordered"] is False
+        assert len(mock_stats.call_args[0][1]) == 2
+
+    def test_error_de_escritura_se_reporta_por_elemento(self):
+        from pymongo.errors import BulkWriteError
+        col = MagicMock()
+
+        def insertar(docs, ordered):
+            for d in docs:
+                d["_id"] = ObjectId()
+            raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicado"}]})
+        col.insert_many.side_effect = insertar
+
+        response, _, _, mock_stats = self._enviar([self._item("a@x.com"), self._item("b@x.com")], col)
+
+        assert response.data["creadas"] == 1
+        assert response.data["resultados"][1]["errores"]["error"] == "Este respondedor ya respondió el formulario."
+        assert len(mock_stats.call_args[0][1]) == 1
+
+    def test_elementos_invalidos_para_el_modelo_no_se_insertan(self):
+        col = MagicMock()
+        col.insert_many.side_effect = lambda docs, ordered: [d.setdefault("_id", ObjectId()) for d in docs]
+        tipo_falso = self._item("b@x.com")
+        tipo_falso["respuestas"] = [{"pregunta_id": 1, "tipo": "inventado", "valor": 5}]
+        valor_no_texto = self._item("c@x.com")
+        valor_no_texto["respuestas"] = [{"pregunta_id": 1, "tipo": "checkbox", "valor": [5]}]
+        items = [self._item("a@x.com"), tipo_falso, valor_no_texto, self._item("d@x.com")]
+        # El último respondedor no se pudo resolver
+        resolver = lambda ids: [ObjectId() for _ in ids[:-1]] + [None]
+
+        response, _, _, mock_stats = self._enviar(items, col, resolver=resolver)
+
+        assert response.data["creadas"] == 1
+        resultados = response.data["resultados"]
+        assert "id" in resultados[0]
+        assert set(resultados[1]["errores"]["respuestas"][0]) == {"tipo", "valor"}
+        assert "valor" in resultados[2]["errores"]["respuestas"][0]
+        assert "respondedor" in resultados[3]["errores"]
+        assert len(col.insert_many.call_args[0][0]) == 1
+        assert len(mock_stats.call_args[0][1]) == 1
+
+    def test_solo_el_administrador_puede_cargar(self):
+        col = MagicMock()
+        response, _, _, _ = self._enviar([self._item("a@x.com")], col, es_admin=False)
+
+        assert response.status_code == 403
+        col.insert_many.assert_not_called()
+
+
+class TestRespuestaUnica:
+    """
+    una_respuesta se aplica en el servidor con el índice único parcial
+    (formulario, respondedor): el duplicado se responde con 409 y el id existente.
+    """
+
+    def test_duplicado_retorna_409_con_respuesta_existente(self):
+        from responseapp.serializers import RespuestaDuplicada
+        existente_id = str(ObjectId())
+        mock_serializer = MagicMock()
+        mock_serializer.validated_data = {"_form_obj": MagicMock(configuracion=MagicMock(requerir_login=False))}
+        mock_serializer.save.side_effect = RespuestaDuplicada(existente_id)
+        request = RequestFactory().post("/api/respuestas/", {"formulario": "x", "respuestas": []},
+                                        content_type="application/json")
+
+        with patch("responseapp.views.RespuestaFormularioSerializer", return_value=mock_serializer):
+            response = RespuestaListCreateAPI.as_view()(request)
+
+        assert response.status_code == 409
+        assert response.data["respuesta_id"] == existente_id
+
+    def test_serializer_traduce_clave_duplicada(self):
+        from mongoengine.errors import NotUniqueError
+        from responseapp.serializers import RespuestaFormularioSerializer, RespuestaDuplicada
+        existente = MagicMock(id=ObjectId())
+        form = MagicMock(id=ObjectId())
+        form.configuracion.una_respuesta = True
+        serializer = RespuestaFormularioSerializer()
+
+        with patch("responseapp.serializers.Respondedor.resolver", return_value=MagicMock(id=ObjectId())), \
+             patch("responseapp.serializers.RespuestaFormulario.save", side_effect=NotUniqueError("dup")), \
+             patch("responseapp.serializers.RespuestaFormulario.objects") as mock_qs:
+            mock_qs.return_value.only.return_value.first.return_value = existente
+            with pytest.raises(RespuestaDuplicada) as exc:
+                serializer.create({"_form_obj": form, "respondedor": {"email": "a@x.com"}, "respuestas": []})
+
+        assert exc.value.respuesta_id == str(existente.id)
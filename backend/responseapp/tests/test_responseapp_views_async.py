@@ -0,0 +1,86 @@
+# responseapp/tests/test_responseapp_views_async.py
+"""
+POST /api/respuestas/ en el modo ASGI: el formulario se lee con el cliente
+async y las escrituras (respondedor, respuesta, estadísticas) también.
+"""
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+from bson import ObjectId
+from django.test import RequestFactory
+from pymongo.errors import DuplicateKeyError
+from formapp.models import Formulario
+from responseapp.views_async import RespuestaListCreateAsyncAPI
+
+FORM_ID = "64b7f1e2a3c4d5e6f7a8b9c0"
+RESPONDEDOR_ID = ObjectId()
+
+
+def _formulario(**configuracion):
+    son = {"_id": ObjectId(FORM_ID), "titulo": "Encuesta", "administrador": ObjectId(), "preguntas": [], "version": 1}
+    if configuracion:
+        son["configuracion"] = configuracion
+    return Formulario._from_son(son)
+
+
+def _colecciones(insert_one=None):
+    respuestas = MagicMock()
+    respuestas.insert_one = insert_one or AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
+    respuestas.find_one = AsyncMock(return_value={"_id": ObjectId("64b7f1e2a3c4d5e6f7a8b9aa")})
+    otras = MagicMock()
+    otras.find_one_and_update = AsyncMock(return_value={"_id": RESPONDEDOR_ID, "ip_address": "1.2.3.4"})
+    otras.update_one = AsyncMock()
+    return respuestas, otras
+
+
+class TestRespuestaListCreateAsyncAPI:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = RespuestaListCreateAsyncAPI.as_view()
+
+    def _post(self, formulario, respuestas, otras, payload=None):
+        payload = payload or {"formulario": FORM_ID, "respuestas": [], "respondedor": {"ip_address": "1.2.3.4"}}
+        request = self.factory.post("/api/respuestas/", payload, content_type="application/json")
+        with patch("responseapp.views_async.obtener_formulario_async", AsyncMock(return_value=formulario)), \
+             patch("responseapp.serializers.obtener_formulario") as mock_sync, \
+             patch("responseapp.serializers.coleccion_async", return_value=respuestas), \
+             patch("responseapp.models.coleccion_async", return_value=otras):
+            response = asyncio.run(self.view(request))
+        mock_sync.assert_not_called()
+        return response
+
+    def test_guarda_la_respuesta_con_el_cliente_async(self):
+        respuestas, otras = _colecciones()
+        response = self._post(_formulario(), respuestas, otras)
+
+        assert response.status_code == 201
+        doc = respuestas.insert_one.call_args[0][0]
+        assert doc["formulario"] == ObjectId(FORM_ID)
+        assert doc["respondedor"] == RESPONDEDOR_ID
+        assert response.data["id"] == str(respuestas.insert_one.return_value.inserted_id)
+        otras.update_one.assert_awaited_once()  # estadísticas
+
+    def test_respuesta_duplicada_retorna_409(self):
+        respuestas, otras = _colecciones(insert_one=AsyncMock(side_effect=DuplicateKeyError("dup")))
+        response = self._post(_formulario(una_respuesta=True), respuestas, otras)
+
+        assert response.status_code == 409
+        assert response.data["respuesta_id"] == "64b7f1e2a3c4d5e6f7a8b9aa"
+
+    def test_formulario_con_login_sin_respondedor_retorna_403(self):
+        respuestas, otras = _colecciones()
+        response = self._post(_formulario(requerir_login=True), respuestas, otras,
+                              payload={"formulario": FORM_ID, "respuestas": []})
+
+        assert response.status_code == 403
+        respuestas.insert_one.assert_not_called()
+
+    def test_formulario_inexistente_retorna_400(self):
+        request = self.factory.post("/api/respuestas/", {"formulario": FORM_ID, "respuestas": []},
+                                    content_type="application/json")
+        with patch("responseapp.views_async.obtener_formulario_async",
+                   AsyncMock(side_effect=Formulario.DoesNotExist)):
+            response = asyncio.run(self.view(request))
+
+        assert response.status_code == 400
+        assert "formulario" in response.data
@@ -1,8 +1,15 @@
 # responseapp/urls.py
+from django.conf import settings
 from django.urls import path
-from .views import RespuestaListCreateAPI, RespuestaDetailAPI
+from .views import RespuestaListCreateAPI, RespuestaDetailAPI, RespuestaPropiaAPI, RespuestaLoteAPI
+
+# Despliegue ASGI: el envío de respuestas usa la vista async (ver responseapp/views_async.py)
+if settings.SERVIDOR_ASGI:
+    from .views_async import RespuestaListCreateAsyncAPI as RespuestaListCreateAPI
 
 urlpatterns = [
     path('', RespuestaListCreateAPI.as_view(), name='respuestas-list-create'),
+    path('lote/', RespuestaLoteAPI.as_view(), name='respuestas-lote'),
+    path('mi-respuesta/', RespuestaPropiaAPI.as_view(), name='respuestas-propia'),  # 👈 antes de <str:id>
     path('<str:id>/', RespuestaDetailAPI.as_view(), name='respuestas-detail'),
 ]
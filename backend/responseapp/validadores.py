@@ -0,0 +1,125 @@
+# responseapp/validadores.py
+import threading
+from cachetools import LRUCache
+from django.conf import settings
+
+# ====================================================
+# Validador compilado de respuestas por formulario
+# ====================================================
+# Las reglas de las preguntas (obligatorias, rangos, longitudes y opciones)
+# se leen una sola vez del formulario y se guardan en estructuras planas.
+# La cache se indexa por (id del formulario, version_esquema), así que
+# cuando FormularioSerializer.update cambia las preguntas la entrada vieja
+# deja de usarse (y además se invalida explícitamente).
+
+MENSAJE_OBLIGATORIA = "¡Oops! Esta pregunta es obligatoria, no olvides responderla 📝"
+MENSAJE_NUMERO_INVALIDO = "Ups, necesitamos que ingreses un número válido aquí 🔢"
+MENSAJE_OPCION_INVALIDA = "Selecciona una de las opciones disponibles 🙂"
+
+
+class ValidadorFormulario:
+    """Reglas de validación de un formulario compiladas en diccionarios planos."""
+
+    __slots__ = ("obligatorias", "rangos", "longitudes", "opciones")
+
+    def __init__(self, preguntas):
+        self.obligatorias = []
+        self.rangos = {}       # escala_numerica: pid -> (valor_minimo, valor_maximo)
+        self.longitudes = {}   # texto_libre: pid -> (longitud_minima, longitud_maxima)
+        self.opciones = {}     # opcion_multiple/checkbox: pid -> frozenset de valores válidos
+
+        for p in preguntas:
+            if p.obligatorio:
+                self.obligatorias.append(p.id)
+            v = p.validaciones
+            if p.tipo == 'escala_numerica' and v:
+                self.rangos[p.id] = (v.valor_minimo, v.valor_maximo)
+            elif p.tipo == 'texto_libre' and v:
+                self.longitudes[p.id] = (v.longitud_minima, v.longitud_maxima)
+            elif p.tipo in ('opcion_multiple', 'checkbox'):
+                permitidos = set()
+                for o in (p.opciones or []):
+                    permitidos.update(x for x in (o.texto, o.valor) if isinstance(x, str) and x)
+                if permitidos:
+                    self.opciones[p.id] = frozenset(permitidos)
+
+    def validar(self, respuestas_list):
+        """
+        Retorna un diccionario {"pregunta_<id>": mensaje} con los errores.
+        Primero se revisan las obligatorias; si faltan, no se revisan tipos.
+        """
+        respuestas_map = {r.get("pregunta_id"): r.get("valor") for r in respuestas_list}
+
+        errores = {}
+        for pid in self.obligatorias:
+            valor = respuestas_map.get(pid)
+            if pid not in respuestas_map or not valor:
+                errores[f"pregunta_{pid}"] = MENSAJE_OBLIGATORIA
+        if errores:
+            return errores
+
+        for pid, (minimo, maximo) in self.rangos.items():
+            if pid not in respuestas_map:
+                continue
+            valor = respuestas_map[pid]
+            try:
+                if isinstance(valor, list):
+                    if len(valor) == 0:
+                        continue  # Ya validado en obligatorio
+                    valor_numerico = float(valor[0])
+                else:
+                    valor_numerico = float(valor)
+            except (ValueError, TypeError):
+                errores[f"pregunta_{pid}"] = MENSAJE_NUMERO_INVALIDO
+                continue
+            if minimo is not None and valor_numerico < minimo:
+                errores[f"pregunta_{pid}"] = f"Por favor ingresa un número mayor o igual a {minimo} 😊"
+            if maximo is not None and valor_numerico > maximo:
+                errores[f"pregunta_{pid}"] = f"Por favor ingresa un número menor o igual a {maximo} 😊"
+
+        for pid, (minimo, maximo) in self.longitudes.items():
+            if pid not in respuestas_map:
+                continue
+            valor = respuestas_map[pid]
+            texto = valor[0] if isinstance(valor, list) and len(valor) > 0 else valor
+            if not isinstance(texto, str):
+                continue
+            longitud = len(texto)
+            if minimo is not None and longitud < minimo:
+                errores[f"pregunta_{pid}"] = f"Tu respuesta es un poco corta. Por favor escribe al menos {minimo} caracteres ✍️"
+            if maximo is not None and longitud > maximo:
+                errores[f"pregunta_{pid}"] = f"Tu respuesta es un poco larga. Por favor no excedas {maximo} caracteres ✂️"
+
+        for pid, permitidos in self.opciones.items():
+            valor = respuestas_map.get(pid)
+            if not valor:
+                continue
+            valores = valor if isinstance(valor, list) else [valor]
+            if any(v not in permitidos for v in valores):
+                errores[f"pregunta_{pid}"] = MENSAJE_OPCION_INVALIDA
+
+        return errores
+
+
+_validadores = LRUCache(maxsize=getattr(settings, 'VALIDADORES_CACHE_MAXSIZE', 512))
+_validadores_lock = threading.Lock()
+
+
+def obtener_validador(formulario):
+    """Devuelve el validador compilado del formulario, compilándolo si no está en cache."""
+    clave = (str(formulario.id), getattr(formulario, 'version_esquema', 0) or 0)
+    with _validadores_lock:
+        validador = _validadores.get(clave)
+    if validador is None:
+        validador = ValidadorFormulario(formulario.preguntas)
+        with _validadores_lock:
+            _validadores[clave] = validador
+    return validador
+
+
+def invalidar_validador(formulario_id):
+    """Elimina de la cache todas las versiones compiladas de un formulario."""
+    formulario_id = str(formulario_id)
+    with _validadores_lock:
+        for clave in [c for c in _validadores if c[0] == formulario_id]:
+            del _validadores[clave]
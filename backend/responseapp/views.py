@@ -1,13 +1,29 @@
+import csv
+import logging
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework import serializers
 from bson import ObjectId
-from .models import RespuestaFormulario, Respondedor
-from .serializers import RespuestaFormularioSerializer
+from pymongo.errors import BulkWriteError
+from .models import RespuestaFormulario, RespuestaPregunta, Respondedor, EstadisticasFormulario, decodificar_llave
+from .serializers import (
+    RespuestaFormularioSerializer,
+    RespuestaLoteItemSerializer,
+    RespuestaDuplicada,
+    formulario_una_respuesta,
+)
+from .validadores import obtener_validador
 from formapp.models import Formulario
-from mongoengine.errors import DoesNotExist
+from formapp.cache import obtener_formulario
+from mongoengine.errors import DoesNotExist, ValidationError as MongoValidationError
+from apps.core.cursores import codificar_cursor, decodificar_cursor
+from apps.core.mongo import coleccion_analiticas
+
+logger = logging.getLogger(__name__)
 
 
 def is_admin_of_form(user, form):
@@ -33,9 +49,18 @@ def is_admin_of_form(user, form):
     return False
 
 
+def _dispositivo_desde_user_agent(request):
+    user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
+    if "mobile" in user_agent or "android" in user_agent or "iphone" in user_agent:
+        return "Móvil"
+    elif "tablet" in user_agent or "ipad" in user_agent:
+        return "Tablet"
+    return "Desktop"
+
+
 class RespuestaListCreateAPI(APIView):
     """
-    GET: listar respuestas (filtro ?formulario=<id>)
+    GET: listar respuestas paginadas (filtro ?formulario=<id>&limite=<n>&siguiente=<token>)
     POST: crear respuesta para un formulario
     """
     permission_classes = [permissions.AllowAny]
@@ -55,42 +80,73 @@ class RespuestaListCreateAPI(APIView):
                 return Response({"error": "No autorizado. Solo el administrador puede listar respuestas."},
                                 status=status.HTTP_403_FORBIDDEN)
 
-        respuestas = RespuestaFormulario.objects(formulario=form)
-        out = []
-        for r in respuestas:
+        try:
+            limite = int(request.GET.get("limite", settings.RESPUESTAS_PAGINA_DEFECTO))
+        except ValueError:
+            return Response({"error": "'limite' debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, settings.RESPUESTAS_PAGINA_MAXIMO))
+
+        # Paginación por cursor: (fecha_envio, _id) descendente, de la más reciente a la más antigua
+        query = {"formulario": form.id}
+        siguiente = request.GET.get("siguiente")
+        if siguiente:
             try:
-                resp = r.respondedor
-                resp_info = {
-                    "id": str(resp.id) if resp else None,
-                    "ip_address": getattr(resp, "ip_address", None),
-                    "email": getattr(resp, "email", None),
-                    "nombre": getattr(resp, "nombre", None),
-                }
-            except DoesNotExist:
-                resp_info = {
-                    "id": None, 
-                    "ip_address": None, 
-                    "email": None, 
-                    "nombre": None,
-                }
+                fecha_cursor, id_cursor = decodificar_cursor(siguiente)
+            except ValueError:
+                return Response({"error": "Token 'siguiente' inválido."}, status=status.HTTP_400_BAD_REQUEST)
+            query["$or"] = [
+                {"fecha_envio": {"$lt": fecha_cursor}},
+                {"fecha_envio": fecha_cursor, "_id": {"$lt": id_cursor}},
+            ]
+
+        docs = list(
+            RespuestaFormulario._get_collection()
+            .find(query, {"formulario": 0})
+            .sort([("fecha_envio", -1), ("_id", -1)])
+            .limit(limite + 1)
+        )
+        hay_mas = len(docs) > limite
+        docs = docs[:limite]
+
+        # Respondedores de la página en una sola consulta ($in)
+        ids = list({d["respondedor"] for d in docs if d.get("respondedor")})
+        respondedores = {
+            rd["_id"]: rd for rd in Respondedor._get_collection().find(
+                {"_id": {"$in": ids}}, {"ip_address": 1, "email": 1, "nombre": 1}
+            )
+        } if ids else {}
+
+        out = []
+        for r in docs:
+            resp = respondedores.get(r.get("respondedor"))
+            resp_info = {
+                "id": str(resp["_id"]) if resp else None,
+                "ip_address": resp.get("ip_address") if resp else None,
+                "email": resp.get("email") if resp else None,
+                "nombre": resp.get("nombre") if resp else None,
+            }
             
             out.append({
-                "id": str(r.id),
-                "formulario": str(r.formulario.id),
+                "id": str(r["_id"]),
+                "formulario": str(form.id),
                 "respondedor": resp_info,
-                "fecha_envio": r.fecha_envio,
-                "tiempo_completacion": r.tiempo_completacion,
-                "navegador": getattr(r, "navegador", "Desconocido"),      # ✅ Desde respuesta
-                "dispositivo": getattr(r, "dispositivo", "Desconocido"),  # ✅ Desde respuesta
+                "fecha_envio": r.get("fecha_envio"),
+                "tiempo_completacion": r.get("tiempo_completacion", 0),
+                "navegador": r.get("navegador", "Desconocido"),      # ✅ Desde respuesta
+                "dispositivo": r.get("dispositivo", "Desconocido"),  # ✅ Desde respuesta
                 "respuestas": [
-                    {"pregunta_id": rp.pregunta_id, "tipo": rp.tipo, "valor": rp.valor} for rp in r.respuestas
+                    {"pregunta_id": rp.get("pregunta_id"), "tipo": rp.get("tipo"), "valor": rp.get("valor", [])}
+                    for rp in r.get("respuestas", [])
                 ]
             })
-        return Response(out, status=status.HTTP_200_OK)
 
-    def post(self, request):
-        import traceback
+        return Response({
+            "resultados": out,
+            "siguiente": codificar_cursor(docs[-1], "fecha_envio") if hay_mas else None,
+            "limite": limite
+        }, status=status.HTTP_200_OK)
 
+    def post(self, request):
         serializer = RespuestaFormularioSerializer(data=request.data, context={"request": request})
         try:
             serializer.is_valid(raise_exception=True)
@@ -101,45 +157,225 @@ class RespuestaListCreateAPI(APIView):
 
         # Comprobar requisito de login
         form = serializer.validated_data.get("_form_obj")
-        config = getattr(form, "configuracion", None)
-        if config and getattr(config, "requerir_login", False):
-            user_authenticated = getattr(request, "user", None) and getattr(request.user, "is_authenticated", False)
-            payload_respondedor = request.data.get("respondedor")
-            if not user_authenticated and not payload_respondedor:
-                return Response({"error": "Este formulario requiere autenticación para responder."},
-                                status=status.HTTP_403_FORBIDDEN)
+        falta_login = self._falta_login(request, form)
+        if falta_login is not None:
+            return falta_login
 
         try:
             # 🆕 Detectar dispositivo desde User-Agent (como fallback)
-            user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
-            if "mobile" in user_agent or "android" in user_agent or "iphone" in user_agent:
-                dispositivo_fallback = "Móvil"
-            elif "tablet" in user_agent or "ipad" in user_agent:
-                dispositivo_fallback = "Tablet"
-            else:
-                dispositivo_fallback = "Desktop"
+            dispositivo_fallback = _dispositivo_desde_user_agent(request)
             
             # Pasar dispositivo al serializer
             serializer.context["dispositivo"] = dispositivo_fallback
             
-            print("📊 Datos recibidos del frontend:")
-            print(f"  - Tiempo completación: {request.data.get('tiempo_completacion')} segundos")
-            print(f"  - Navegador: {request.data.get('respondedor', {}).get('navegador', 'N/A')}")
-            print(f"  - Dispositivo: {request.data.get('respondedor', {}).get('dispositivo', dispositivo_fallback)}")
-            
             rf = serializer.save()
-            
-            return Response({
-                "message": "Respuesta guardada correctamente.",
-                "id": str(rf.id),
-                "tiempo_completacion": rf.tiempo_completacion  # 🆕 Para verificar
-            }, status=status.HTTP_201_CREATED)
+            return self._creada(rf)
+        except RespuestaDuplicada as dup:
+            return self._duplicada(dup)
         except serializers.ValidationError as ve:
             return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("error al guardar respuesta formulario=%s", getattr(form, "id", None))
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _falta_login(self, request, form):
+        """403 si el formulario requiere login y no hay usuario ni datos de respondedor."""
+        config = getattr(form, "configuracion", None)
+        if config and getattr(config, "requerir_login", False):
+            user_authenticated = getattr(request, "user", None) and getattr(request.user, "is_authenticated", False)
+            payload_respondedor = request.data.get("respondedor")
+            if not user_authenticated and not payload_respondedor:
+                return Response({"error": "Este formulario requiere autenticación para responder."},
+                                status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def _creada(self, rf):
+        return Response({
+            "message": "Respuesta guardada correctamente.",
+            "id": str(rf.id),
+            "tiempo_completacion": rf.tiempo_completacion  # 🆕 Para verificar
+        }, status=status.HTTP_201_CREATED)
+
+    def _duplicada(self, dup):
+        return Response({
+            "error": str(dup.detail),
+            "respuesta_id": dup.respuesta_id
+        }, status=status.HTTP_409_CONFLICT)
+
+
+class RespuestaLoteAPI(APIView):
+    """
+    POST /api/respuestas/lote/
+    Carga masiva de respuestas de un formulario (equipos de campo sin conexión,
+    importación de encuestas anteriores). Solo el administrador del formulario.
+    Cuerpo: {"formulario": "<id>", "respuestas": [{respondedor, tiempo_completacion,
+             fecha_envio, respuestas}, ...]}
+    El formulario se lee y su validador se compila una vez; los respondedores se
+    resuelven con un bulk_write y las respuestas se insertan con un insert_many
+    no ordenado. Devuelve el resultado de cada elemento, en el mismo orden.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        form_id = request.data.get("formulario")
+        items = request.data.get("respuestas")
+        if not form_id or not isinstance(items, list):
+            return Response({"error": "Se requieren 'formulario' y la lista 'respuestas'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.RESPUESTAS_LOTE_MAXIMO:
+            return Response({"error": f"Máximo {settings.RESPUESTAS_LOTE_MAXIMO} respuestas por lote."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            form = obtener_formulario(form_id)
+        except Exception:
+            return Response({"error": "Formulario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        if not is_admin_of_form(request.user, form):
+            return Response({"error": "No autorizado."}, status=status.HTTP_403_FORBIDDEN)
+
+        validador = obtener_validador(form)
+        dispositivo_fallback = _dispositivo_desde_user_agent(request)
+        resultados = [None] * len(items)
+        validos = []  # (índice, datos validados)
+        for i, item in enumerate(items):
+            serializer = RespuestaLoteItemSerializer(data=item, validador=validador)
+            if serializer.is_valid():
+                validos.append((i, serializer.validated_data))
+            else:
+                resultados[i] = {"indice": i, "errores": serializer.errors}
+
+        respondedores = Respondedor.resolver_lote([
+            {
+                "ip_address": (datos.get("respondedor") or {}).get("ip_address", "0.0.0.0"),
+                "email": (datos.get("respondedor") or {}).get("email"),
+                "google_id": (datos.get("respondedor") or {}).get("google_id"),
+                "nombre": (datos.get("respondedor") or {}).get("nombre"),
+            }
+            for _, datos in validos
+        ])
+
+        ahora = datetime.utcnow()
+        una_respuesta = formulario_una_respuesta(form) or None
+        nuevas = []
+        for (i, datos), respondedor_id in zip(validos, respondedores):
+            if respondedor_id is None:
+                resultados[i] = {"indice": i, "errores": {"respondedor": ["No se pudo resolver el respondedor."]}}
+                continue
+            respondedor_data = datos.get("respondedor") or {}
+            fecha_envio = datos.get("fecha_envio") or ahora
+            if fecha_envio.tzinfo:
+                fecha_envio = fecha_envio.astimezone(timezone.utc).replace(tzinfo=None)
+            rf = RespuestaFormulario(
+                formulario=form.id,
+                respondedor=respondedor_id,
+                fecha_envio=fecha_envio,
+                tiempo_completacion=datos.get("tiempo_completacion", 0),
+                navegador=respondedor_data.get("navegador", "Desconocido"),
+                dispositivo=respondedor_data.get("dispositivo") or dispositivo_fallback,
+                respuestas=[
+                    RespuestaPregunta(pregunta_id=r.get("pregunta_id"), tipo=r.get("tipo"), valor=r.get("valor", []))
+                    for r in datos["respuestas"]
+                ],
+                una_respuesta=una_respuesta,
+            )
+            # insert_many no valida: tipo, pregunta_id y valor se revisan aquí como en rf.save()
+            try:
+                rf.validate()
+            except MongoValidationError as e:
+                resultados[i] = {"indice": i, "errores": e.to_dict() or {"error": str(e)}}
+                continue
+            nuevas.append((i, rf))
+
+        fallidas = {}
+        if nuevas:
+            documentos = [rf.to_mongo().to_dict() for _, rf in nuevas]
+            try:
+                RespuestaFormulario._get_collection().insert_many(documentos, ordered=False)
+            except BulkWriteError as e:
+                for err in e.details.get("writeErrors", []):
+                    if err.get("code") == 11000:
+                        fallidas[err["index"]] = "Este respondedor ya respondió el formulario."
+                    else:
+                        fallidas[err["index"]] = err.get("errmsg", "Error al guardar")
+
+            guardadas = []
+            for posicion, ((i, rf), doc) in enumerate(zip(nuevas, documentos)):
+                if posicion in fallidas:
+                    resultados[i] = {"indice": i, "errores": {"error": fallidas[posicion]}}
+                else:
+                    rf.id = doc["_id"]
+                    guardadas.append(rf)
+                    resultados[i] = {"indice": i, "id": str(doc["_id"])}
+
+            try:
+                EstadisticasFormulario.registrar_lote(form.id, guardadas)
+            except Exception:
+                logger.warning("no se pudieron actualizar las estadísticas formulario=%s", form.id, exc_info=True)
+
+        creadas = sum(1 for res in resultados if "id" in res)
+        logger.info("lote de respuestas formulario=%s creadas=%d fallidas=%d", form.id, creadas, len(items) - creadas)
+        return Response({
+            "creadas": creadas,
+            "fallidas": len(items) - creadas,
+            "resultados": resultados,
+        }, status=status.HTTP_200_OK)
+
+
+class RespuestaPropiaAPI(APIView):
+    """
+    GET /api/respuestas/mi-respuesta/?formulario=<id>[&respuesta=<id>]
+    Retorna la respuesta del propio respondedor (o null) sin listar todas las
+    respuestas. El respondedor sale del token (email del usuario autenticado);
+    sin sesión, del comprobante 'respuesta': el id que devolvió el POST.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        form_id = request.GET.get("formulario")
+        if not form_id or not ObjectId.is_valid(form_id):
+            return Response({"error": "Query param 'formulario' es requerido y debe ser un ID válido."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            form = obtener_formulario(form_id)
+        except DoesNotExist:
+            return Response({"error": "Formulario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        if not is_admin_of_form(request.user, form):
+            if getattr(form.configuracion, "privado", False):
+                return Response({"error": "No autorizado."}, status=status.HTTP_403_FORBIDDEN)
+
+        campos = ("id", "fecha_envio", "respuestas")
+        email = getattr(request.user, "email", None) if getattr(request.user, "is_authenticated", False) else None
+        comprobante = request.GET.get("respuesta")
+        if email:
+            # Mismo respondedor que al crear la respuesta con sesión (identidad por email)
+            respondedor_ids = list(Respondedor.objects(email=email).scalar("id"))
+            r = None
+            if respondedor_ids:
+                r = (RespuestaFormulario.objects(formulario=form.id, respondedor__in=respondedor_ids)
+                     .only(*campos)
+                     .order_by("-fecha_envio")
+                     .first())
+        elif comprobante and ObjectId.is_valid(comprobante):
+            r = RespuestaFormulario.objects(id=ObjectId(comprobante), formulario=form.id).only(*campos).first()
+        else:
+            return Response({"error": "Inicia sesión o envía el comprobante 'respuesta' para consultar tu respuesta."},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+        if not r:
+            return Response({"respondido": False, "respuesta": None}, status=status.HTTP_200_OK)
+
+        return Response({
+            "respondido": True,
+            "respuesta": {
+                "id": str(r.id),
+                "fecha_envio": r.fecha_envio,
+                "respuestas": [
+                    {"pregunta_id": rp.pregunta_id, "tipo": rp.tipo, "valor": rp.valor} for rp in r.respuestas
+                ]
+            }
+        }, status=status.HTTP_200_OK)
+
 
 class RespuestaDetailAPI(APIView):
     """
@@ -190,6 +426,10 @@ class RespuestaDetailAPI(APIView):
         if not is_admin_of_form(request.user, r.formulario):
             return Response({"error": "No autorizado."}, status=status.HTTP_403_FORBIDDEN)
         r.delete()
+        try:
+            EstadisticasFormulario.registrar_respuesta(r, signo=-1)
+        except Exception:
+            logger.warning("no se pudieron actualizar las estadísticas respuesta=%s", r.id, exc_info=True)
         return Response({"message": "Respuesta eliminada."}, status=status.HTTP_204_NO_CONTENT)
 
     def put(self, request, id):
@@ -244,6 +484,10 @@ class FormularioEstadisticasAPI(APIView):
     """
     GET /api/formularios/<id>/estadisticas/
     Retorna métricas y datos para gráficos.
+    Se leen los contadores de EstadisticasFormulario (una sola consulta); si aún
+    no existen para este formulario, o nunca se reconstruyeron (los creó el $inc
+    de una respuesta nueva y pueden faltar las anteriores), se reconstruyen
+    desde las respuestas.
     """
     permission_classes = [permissions.AllowAny]
 
@@ -256,10 +500,13 @@ class FormularioEstadisticasAPI(APIView):
         if not is_admin_of_form(request.user, form):
             pass  # Bypass temporal
 
-        respuestas = RespuestaFormulario.objects(formulario=form)
-        total_respuestas = respuestas.count()
+        stats = EstadisticasFormulario.objects(formulario=form.id).first()
+        if stats is None or stats.fecha_reconstruccion is None:
+            stats = EstadisticasFormulario.reconstruir(form)
 
-        if total_respuestas == 0:
+        total_respuestas = stats.total_respuestas or 0
+
+        if total_respuestas <= 0:
             return Response({
                 "total_respuestas": 0,
                 "tiempo_promedio": 0,
@@ -270,67 +517,40 @@ class FormularioEstadisticasAPI(APIView):
             })
 
         # 1. Tiempo promedio
-        tiempos = [r.tiempo_completacion for r in respuestas if r.tiempo_completacion]
-        tiempo_promedio = sum(tiempos) / len(tiempos) if tiempos else 0
-
-        # 2. Dispositivos - ✅ desde RespuestaFormulario
-        dispositivos_count = {}
-        for r in respuestas:
-            dev = getattr(r, "dispositivo", "Desconocido")  # ✅ Desde la respuesta
-            dispositivos_count[dev] = dispositivos_count.get(dev, 0) + 1
+        tiempo_promedio = stats.tiempo_total / stats.tiempo_cantidad if stats.tiempo_cantidad else 0
 
+        # 2. Dispositivos y 3. Navegadores - ✅ desde RespuestaFormulario
         dispositivos_data = [
-            {"name": k, "value": v} for k, v in dispositivos_count.items()
+            {"name": decodificar_llave(k), "value": v} for k, v in stats.dispositivos.items() if v > 0
         ]
-
-        # 🆕 3. Navegadores - ✅ desde RespuestaFormulario
-        navegadores_count = {}
-        for r in respuestas:
-            nav = getattr(r, "navegador", "Desconocido")  # ✅ Desde la respuesta
-            navegadores_count[nav] = navegadores_count.get(nav, 0) + 1
-
         navegadores_data = [
-            {"name": k, "value": v} for k, v in navegadores_count.items()
+            {"name": decodificar_llave(k), "value": v} for k, v in stats.navegadores.items() if v > 0
         ]
 
         # 4. Respuestas por fecha
-        fechas_count = {}
-        for r in respuestas:
-            fecha_str = r.fecha_envio.strftime("%Y-%m-%d")
-            fechas_count[fecha_str] = fechas_count.get(fecha_str, 0) + 1
-        
         respuestas_por_fecha = [
-            {"fecha": k, "cantidad": v} for k, v in sorted(fechas_count.items())
+            {"fecha": k, "cantidad": v} for k, v in sorted(stats.fechas.items()) if v > 0
         ]
 
         # 5. Análisis por pregunta
         preguntas_stats = []
         for p in form.preguntas:
+            contadores = stats.preguntas.get(str(p.id), {})
             p_stats = {
                 "id": p.id,
                 "enunciado": p.enunciado,
                 "tipo": p.tipo,
-                "total_respuestas": 0,
+                "total_respuestas": contadores.get("total", 0),
                 "datos": []
             }
 
-            valores = []
-            for r in respuestas:
-                resp_p = next((rp for rp in r.respuestas if rp.pregunta_id == p.id), None)
-                if resp_p and resp_p.valor:
-                    valores.extend(resp_p.valor)
-            
-            p_stats["total_respuestas"] = len(valores)
-
             if p.tipo in ["opcion_multiple", "checkbox", "escala_numerica"]:
-                conteo = {}
-                for v in valores:
-                    conteo[v] = conteo.get(v, 0) + 1
                 p_stats["datos"] = [
-                    {"name": k, "value": v} for k, v in conteo.items()
+                    {"name": decodificar_llave(k), "value": v}
+                    for k, v in contadores.get("valores", {}).items() if v > 0
                 ]
             elif p.tipo == "texto_libre":
-                p_stats["datos"] = [{"texto": v} for v in valores[-20:]]
+                p_stats["datos"] = [{"texto": v} for v in contadores.get("textos", [])]
 
             preguntas_stats.append(p_stats)
 
@@ -344,16 +564,26 @@ class FormularioEstadisticasAPI(APIView):
         })
 
 
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
 class FormularioExportarAPI(APIView):
     """
     GET /api/formularios/<id>/exportar/
     Descarga un CSV con todas las respuestas.
+    Filtros opcionales: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&dispositivo=...&navegador=...
+    El CSV se transmite por lotes desde un cursor de pymongo, así la memoria
+    del worker no depende del número de respuestas.
     """
     permission_classes = [permissions.AllowAny]
+    tamano_lote = 1000
 
     def get(self, request, id):
-        import csv
-        from django.http import HttpResponse
+        from django.http import StreamingHttpResponse
 
         try:
             form = Formulario.objects.get(id=ObjectId(id))
@@ -363,13 +593,23 @@ class FormularioExportarAPI(APIView):
         if not is_admin_of_form(request.user, form):
             pass  # Bypass temporal
 
-        respuestas = RespuestaFormulario.objects(formulario=form)
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="respuestas_{id}.csv"'
+        query = {"formulario": form.id}
+        try:
+            fecha_envio = {}
+            if request.GET.get("desde"):
+                fecha_envio["$gte"] = datetime.strptime(request.GET["desde"], "%Y-%m-%d")
+            if request.GET.get("hasta"):
+                fecha_envio["$lt"] = datetime.strptime(request.GET["hasta"], "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            return Response({"error": "Las fechas deben tener el formato YYYY-MM-DD."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if fecha_envio:
+            query["fecha_envio"] = fecha_envio
+        if request.GET.get("dispositivo"):
+            query["dispositivo"] = request.GET["dispositivo"]
+        if request.GET.get("navegador"):
+            query["navegador"] = request.GET["navegador"]
 
-        writer = csv.writer(response)
-        
         # Headers - 🆕 Agregado Navegador
         headers = ["Fecha", "Dispositivo", "Navegador", "Tiempo (s)", "Email", "Nombre"]
         pregunta_map = {}
@@ -377,28 +617,64 @@ class FormularioExportarAPI(APIView):
         for p in form.preguntas:
             headers.append(p.enunciado)
             pregunta_map[p.id] = len(headers) - 1
-        
-        writer.writerow(headers)
-
-        # Rows
-# Rows
-        for r in respuestas:
-            row = [""] * len(headers)
-            row[0] = r.fecha_envio.strftime("%Y-%m-%d %H:%M:%S")
-            row[1] = getattr(r, "dispositivo", "Desconocido")  # ✅ Desde respuesta
-            row[2] = getattr(r, "navegador", "Desconocido")    # ✅ Desde respuesta
-            row[3] = r.tiempo_completacion
-            row[4] = r.respondedor.email if r.respondedor else ""
-            row[5] = r.respondedor.nombre if r.respondedor else ""
-
-            for rp in r.respuestas:
-                idx = pregunta_map.get(rp.pregunta_id)
-                if idx:
-                    val = rp.valor
-                    if isinstance(val, list):
-                        val = ", ".join(val)
-                    row[idx] = val
-            
-            writer.writerow(row)
 
-        return response
\ No newline at end of file
+        # El cursor de pymongo es perezoso: no consulta nada hasta que se empieza a transmitir
+        # Lectura pesada: por el alias de analíticas si está configurado (apps/core/mongo.py)
+        cursor = coleccion_analiticas(RespuestaFormulario).find(
+            query,
+            {"fecha_envio": 1, "dispositivo": 1, "navegador": 1, "tiempo_completacion": 1,
+             "respondedor": 1, "respuestas": 1},
+            batch_size=self.tamano_lote
+        )
+        filas = self._filas_csv(cursor, coleccion_analiticas(Respondedor), headers, pregunta_map)
+
+        response = StreamingHttpResponse(filas, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="respuestas_{id}.csv"'
+        return response
+
+    def _lotes(self, cursor):
+        """Agrupa los documentos crudos del cursor en lotes de tamano_lote."""
+        lote = []
+        for doc in cursor:
+            lote.append(doc)
+            if len(lote) >= self.tamano_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def _filas_csv(self, cursor, respondedores_col, headers, pregunta_map):
+        writer = csv.writer(_Eco())
+        yield writer.writerow(headers)
+
+        for lote in self._lotes(cursor):
+            # Respondedores del lote en una sola consulta ($in) en vez de uno por fila
+            ids = list({doc["respondedor"] for doc in lote if doc.get("respondedor")})
+            respondedores = {
+                rd["_id"]: rd for rd in respondedores_col.find(
+                    {"_id": {"$in": ids}}, {"email": 1, "nombre": 1}
+                )
+            } if ids else {}
+
+            filas = []
+            for doc in lote:
+                row = [""] * len(headers)
+                fecha = doc.get("fecha_envio")
+                row[0] = fecha.strftime("%Y-%m-%d %H:%M:%S") if fecha else ""
+                row[1] = doc.get("dispositivo", "Desconocido")  # ✅ Desde respuesta
+                row[2] = doc.get("navegador", "Desconocido")    # ✅ Desde respuesta
+                row[3] = doc.get("tiempo_completacion", 0)
+                respondedor = respondedores.get(doc.get("respondedor"), {})
+                row[4] = respondedor.get("email") or ""
+                row[5] = respondedor.get("nombre") or ""
+
+                for rp in doc.get("respuestas", []):
+                    idx = pregunta_map.get(rp.get("pregunta_id"))
+                    if idx:
+                        val = rp.get("valor", "")
+                        if isinstance(val, list):
+                            val = ", ".join(str(v) for v in val)  # datos viejos pueden traer no-strings
+                        row[idx] = val
+
+                filas.append(writer.writerow(row))
+            yield "".join(filas)
@@ -0,0 +1,51 @@
+# responseapp/views_async.py
+"""
+Vistas async del modo ASGI (SERVIDOR_ASGI=1, ver responseapp/urls.py).
+Heredan de las vistas sync: los métodos que no se redefinen (el GET del
+listado) corren en un hilo como cualquier vista sync bajo ASGI.
+"""
+import logging
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from apps.core.vistas_async import AsyncAPIView
+from formapp.cache import obtener_formulario_async
+from formapp.models import Formulario
+from .serializers import RespuestaFormularioSerializer, RespuestaDuplicada
+from .views import RespuestaListCreateAPI, _dispositivo_desde_user_agent
+
+logger = logging.getLogger(__name__)
+
+
+class RespuestaListCreateAsyncAPI(AsyncAPIView, RespuestaListCreateAPI):
+
+    async def post(self, request):
+        # El formulario se lee antes con el cliente async; validate() lo toma del contexto
+        contexto = {"request": request, "dispositivo": _dispositivo_desde_user_agent(request)}
+        form_id = request.data.get("formulario")
+        if form_id:
+            try:
+                contexto["formulario"] = await obtener_formulario_async(form_id)
+            except Formulario.DoesNotExist:
+                return Response({"formulario": ["Formulario no encontrado."]}, status=status.HTTP_400_BAD_REQUEST)
+            except Exception as e:
+                return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        serializer = RespuestaFormularioSerializer(data=request.data, context=contexto)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        form = serializer.validated_data.get("_form_obj")
+        falta_login = self._falta_login(request, form)
+        if falta_login is not None:
+            return falta_login
+
+        try:
+            rf = await serializer.crear_async()
+            return self._creada(rf)
+        except RespuestaDuplicada as dup:
+            return self._duplicada(dup)
+        except serializers.ValidationError as ve:
+            return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception("error al guardar respuesta formulario=%s", getattr(form, "id", None))
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
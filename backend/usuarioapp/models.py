@@ -35,7 +35,15 @@ class Usuario(Document):
 class ResetPasswordToken(Document):
     email = StringField(required=True)
     token = StringField(required=True)
-    expires_at = DateTimeField(default=lambda: datetime.now() + timedelta(minutes=10))  # válido por 10 min
+    expires_at = DateTimeField(default=lambda: datetime.utcnow() + timedelta(minutes=10))  # válido por 10 min
+
+    meta = {
+        'indexes': [
+            ('email', 'token'),
+            # TTL: MongoDB borra los tokens vencidos
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0},
+        ]
+    }
 
 
 class EmailVerificationToken(Document):
@@ -45,5 +53,10 @@ class EmailVerificationToken(Document):
     expires_at = DateTimeField(default=lambda: datetime.utcnow() + timedelta(minutes=10))  # válido por 10 min
 
     meta = {
-        'collection': 'email_verification_tokens'
+        'collection': 'email_verification_tokens',
+        'indexes': [
+            ('email', 'token'),
+            # TTL: MongoDB borra los tokens vencidos
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0},
+        ]
     }
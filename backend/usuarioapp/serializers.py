@@ -1,6 +1,6 @@
 # usuarioapp/serializers.py
 from rest_framework import serializers
-from usuarioapp.models import Usuario, Empresa, Perfil
+from usuarioapp.models import Usuario, Empresa, Perfil, ResetPasswordToken
 from datetime import datetime, timedelta
 
 
@@ -86,7 +86,7 @@ class ResetPasswordTokenSerializer(serializers.Serializer):
     def create(self, validated_data):
         # Si no se envía expires_at, se establece por defecto (10 minutos)
         if 'expires_at' not in validated_data:
-            validated_data['expires_at'] = datetime.now() + timedelta(minutes=10)
+            validated_data['expires_at'] = datetime.utcnow() + timedelta(minutes=10)
         token = ResetPasswordToken(**validated_data)
         token.save()
         return token
@@ -3,3 +3,14 @@ import pytest
 pytestmark = pytest.mark.django_db
 
 # Aquí irán las pruebas de los modelos de usuarioapp
+
+
+class TestResetPasswordToken:
+
+    def test_expires_at_por_defecto_vence_despues_de_ahora_en_utc(self):
+        """El índice TTL compara contra la hora UTC: un default en hora local ya nacería vencido."""
+        from datetime import datetime, timedelta
+        from usuarioapp.models import ResetPasswordToken
+        token = ResetPasswordToken(email="a@b.co", token="123456")
+
+        assert datetime.utcnow() < token.expires_at <= datetime.utcnow() + timedelta(minutes=10)
@@ -96,3 +96,19 @@ class TestEmpresaSerializer:
         from usuarioapp.serializers import EmpresaSerializer
         serializer = EmpresaSerializer(data={"nombre": "Mi Empresa SAS", "nit": "900123456-1"})
         assert serializer.is_valid(), f"Errores: {serializer.errors}"
+
+
+class TestResetPasswordTokenSerializer:
+    """Pruebas para ResetPasswordTokenSerializer"""
+
+    def test_expires_at_por_defecto_en_utc(self):
+        """Sin expires_at el token vence en 10 min contados en UTC (lo que compara el índice TTL)."""
+        from datetime import datetime, timedelta
+        from usuarioapp.serializers import ResetPasswordTokenSerializer
+        serializer = ResetPasswordTokenSerializer(data={"email": "a@b.co", "token": "123456"})
+        assert serializer.is_valid(), f"Errores: {serializer.errors}"
+
+        with patch("usuarioapp.models.ResetPasswordToken.save"):
+            token = serializer.save()
+
+        assert datetime.utcnow() < token.expires_at <= datetime.utcnow() + timedelta(minutes=10)
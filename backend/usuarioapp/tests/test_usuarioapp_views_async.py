@@ -0,0 +1,74 @@
+# usuarioapp/tests/test_usuarioapp_views_async.py
+"""
+POST /api/auth/firebase/ en el modo ASGI: el usuario se busca, crea y
+actualiza con el cliente async de MongoDB.
+"""
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+from bson import ObjectId
+from django.test import RequestFactory
+from pymongo.errors import DuplicateKeyError
+from usuarioapp.views_async import FirebaseAuthSyncAsyncAPI
+
+TOKEN = {"uid": "uid-1", "email": "ana@example.com", "picture": "https://foto/ana.png"}
+
+
+def _coleccion(*encontrados, insert_one=None):
+    col = MagicMock()
+    col.find_one = AsyncMock(side_effect=list(encontrados))
+    col.insert_one = insert_one or AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
+    col.update_one = AsyncMock()
+    return col
+
+
+class TestFirebaseAuthSyncAsyncAPI:
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+        self.view = FirebaseAuthSyncAsyncAPI.as_view()
+
+    def _post(self, col, token=TOKEN):
+        request = self.factory.post("/api/auth/firebase/", {"nombre": "Ana"}, content_type="application/json",
+                                    HTTP_AUTHORIZATION="Bearer abc")
+        with patch("usuarioapp.views_async.verificar_token", return_value=token), \
+             patch("usuarioapp.views_async.coleccion_async", return_value=col), \
+             patch("apps.authentication.firebase_auth.FirebaseAuthentication.authenticate", return_value=None):
+            return asyncio.run(self.view(request))
+
+    def test_primer_login_crea_el_usuario(self):
+        col = _coleccion(None)
+        response = self._post(col)
+
+        assert response.status_code == 200
+        doc = col.insert_one.call_args[0][0]
+        assert doc["email"] == "ana@example.com" and doc["nombre"] == "Ana"
+        assert response.data["user"]["id"] == str(col.insert_one.return_value.inserted_id)
+
+    def test_usuario_existente_actualiza_nombre_y_avatar(self):
+        existente = {"_id": ObjectId(), "nombre": "Viejo", "email": "ana@example.com", "clave_hash": "x"}
+        col = _coleccion(existente)
+        response = self._post(col)
+
+        assert response.status_code == 200
+        col.insert_one.assert_not_called()
+        filtro, update = col.update_one.call_args[0]
+        assert filtro == {"_id": existente["_id"]}
+        assert update["$set"]["nombre"] == "Ana"
+        assert update["$set"]["perfil"]["avatar_url"] == "https://foto/ana.png"
+
+    def test_login_simultaneo_relee_el_usuario_creado(self):
+        creado = {"_id": ObjectId(), "nombre": "Ana", "email": "ana@example.com", "clave_hash": "x",
+                  "perfil": {"avatar_url": "https://foto/ana.png", "idioma": "es", "timezone": "America/Bogota"}}
+        col = _coleccion(None, creado, insert_one=AsyncMock(side_effect=DuplicateKeyError("dup")))
+        response = self._post(col)
+
+        assert response.status_code == 200
+        assert response.data["user"]["id"] == str(creado["_id"])
+        col.update_one.assert_not_called()
+
+    def test_sin_token_retorna_401(self):
+        request = self.factory.post("/api/auth/firebase/", {}, content_type="application/json")
+        with patch("apps.authentication.firebase_auth.FirebaseAuthentication.authenticate", return_value=None):
+            response = asyncio.run(self.view(request))
+
+        assert response.status_code == 401
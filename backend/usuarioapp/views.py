@@ -1,4 +1,5 @@
 # usuarioapp/views.py
+import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -9,6 +10,7 @@ from usuarioapp.serializers import UsuarioSerializer
 from bson import ObjectId
 from rest_framework.permissions import IsAuthenticated
 from firebase_admin import auth
+from apps.authentication.firebase_auth import verificar_token
 from datetime import datetime, timedelta
 from django.http import HttpResponse
 from django.conf import settings
@@ -16,6 +18,9 @@ import random, string
 from django.core.mail import send_mail
 from utils.email_utils import send_otp_email, send_verification_email
 from django.core.cache import cache  # para guardar temporalmente el OTP
+from apps.core.logs import enmascarar_email
+
+logger = logging.getLogger(__name__)
 
 def hello(request):
     """Vista de prueba para verificar que Django funciona"""
@@ -74,196 +79,189 @@ def firebase_auth_sync(request):
           → Retorna datos del usuario
     """
     
-    print("=" * 80)
-    print("🚀 INICIANDO firebase_auth_sync")
-    print("=" * 80)
-    
     try:
         # ===============================================
         # PASO 1: Extraer y validar el token
         # ===============================================
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        print(f"🔑 Authorization Header: {auth_header[:50]}..." if len(auth_header) > 50 else f"🔑 Authorization Header: {auth_header}")
-        
-        if not auth_header.startswith('Bearer '):
-            print("❌ Error: Falta header Authorization")
-            return Response(
-                {'error': 'Token de autorización requerido. Header debe ser: Authorization: Bearer <token>'},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-        
-        # Extraer token (formato: "Bearer <token>")
-        id_token = auth_header.split(' ')[1]
-        print(f"🔑 Token extraído (primeros 30 chars): {id_token[:30]}...")
+        id_token = token_de_header(request)
+        if id_token is None:
+            return falta_token()
         
         # ===============================================
         # PASO 2: Verificar token con Firebase Admin SDK
         # ===============================================
-        print("🔵 Verificando token con Firebase...")
-        
         try:
             # ¡ESTE ES EL MOMENTO CLAVE!
             # Firebase Admin SDK verifica:
             # 1. Firma digital del token
             # 2. Fecha de expiración
             # 3. Que el token pertenece a este proyecto
-            decoded_token = auth.verify_id_token(id_token)
-            
-            firebase_uid = decoded_token['uid']
-            firebase_email = decoded_token.get('email')
-            firebase_picture = decoded_token.get('picture', '')
-            
-            print(f"✅ Token verificado exitosamente")
-            print(f"   ├─ UID: {firebase_uid}")
-            print(f"   ├─ Email: {firebase_email}")
-            print(f"   └─ Picture: {firebase_picture[:50]}..." if firebase_picture else "   └─ Picture: (no disponible)")
-            
-        except auth.InvalidIdTokenError as e:
-            print(f"❌ Token inválido: {str(e)}")
-            return Response(
-                {'error': 'Token de Firebase inválido'}, 
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-        except auth.ExpiredIdTokenError:
-            print("❌ Token expirado")
-            return Response(
-                {'error': 'Token expirado. Por favor inicia sesión nuevamente.'}, 
-                status=status.HTTP_401_UNAUTHORIZED
-            )
+            decoded_token = verificar_token(id_token)  # 👈 comparte la cache con FirebaseAuthentication
         except Exception as e:
-            print(f"❌ Error al verificar token: {str(e)}")
-            return Response(
-                {'error': f'Error al verificar token: {str(e)}'}, 
-                status=status.HTTP_401_UNAUTHORIZED
-            )
+            return error_de_token(e)
+        
+        firebase_uid = decoded_token['uid']
+        firebase_email = decoded_token.get('email')
+        firebase_picture = decoded_token.get('picture', '')
+        logger.debug("sync token verificado uid=%s", firebase_uid)
         
         # Extraer datos adicionales del body
         data = request.data
         firebase_name = data.get('nombre', firebase_email.split('@')[0])
-        print(f"📝 Nombre desde request: {firebase_name}")
         
         # ===============================================
         # PASO 3: Buscar o crear usuario en MongoDB
         # ===============================================
-        print(f"🔍 Buscando usuario en MongoDB con email: {firebase_email}")
-        
         try:
             # CASO 1: Usuario YA EXISTE (login subsecuente)
             usuario = Usuario.objects.get(email=firebase_email)
-            print(f"✅ Usuario encontrado en MongoDB: {usuario.nombre} (ID: {usuario.id})")
             
             # Actualizar datos si cambiaron en Google
-            updated = False
-            
-            if usuario.nombre != firebase_name and firebase_name:
-                print(f"   ├─ Actualizando nombre: {usuario.nombre} → {firebase_name}")
-                usuario.nombre = firebase_name
-                updated = True
-            
-            # Actualizar avatar si cambió
-            if usuario.perfil:
-                if usuario.perfil.avatar_url != firebase_picture:
-                    print(f"   ├─ Actualizando avatar")
-                    usuario.perfil.avatar_url = firebase_picture
-                    updated = True
-            else:
-                # Crear perfil si no existe
-                print(f"   ├─ Creando perfil nuevo")
-                usuario.perfil = Perfil(
-                    avatar_url=firebase_picture,
-                    idioma='es',
-                    timezone='America/Bogota'
-                )
-                updated = True
-            
+            updated = actualizar_desde_google(usuario, firebase_name, firebase_picture)
             if updated:
                 usuario.save()
-                print("   └─ Cambios guardados en MongoDB")
-            else:
-                print("   └─ No hay cambios que guardar")
+            logger.debug("sync usuario existente id=%s actualizado=%s", usuario.id, updated)
                 
         except Usuario.DoesNotExist:
             # CASO 2: Usuario NUEVO (primer registro)
-            print(f"📝 Usuario NO existe. Creando nuevo usuario en MongoDB...")
-            
-            # Crear perfil con datos de Google
-            perfil = Perfil(
-                avatar_url=firebase_picture,
-                idioma='es',
-                timezone='America/Bogota'
-            )
-            print(f"   ├─ Perfil creado")
-            
-            # Crear empresa por defecto o desde request
-            if data.get('empresa'):
-                empresa_data = data.get('empresa')
-                empresa = Empresa(
-                    nombre=empresa_data.get('nombre', 'sin_empresa'),
-                    telefono=empresa_data.get('telefono'),
-                    nit=empresa_data.get('nit')
-                )
-                print(f"   ├─ Empresa desde request: {empresa.nombre}")
-            else:
-                empresa = Empresa(nombre='sin_empresa')
-                print(f"   ├─ Empresa por defecto: sin_empresa")
-            
-            # Crear usuario en MongoDB
-            usuario = Usuario(
-                nombre=firebase_name,
-                email=firebase_email,
-                clave_hash=firebase_uid,  # ← IMPORTANTE: UID de Firebase como identificador
-                fecha_registro=datetime.utcnow(),
-                perfil=perfil,
-                empresa=empresa
-            )
+            usuario = nuevo_usuario_google(data, firebase_name, firebase_email, firebase_uid, firebase_picture)
             usuario.save()
-            print(f"   └─ ✅ Usuario creado con ID: {usuario.id}")
+            logger.info("sync usuario creado id=%s email=%s", usuario.id, enmascarar_email(firebase_email))
         
         # ===============================================
         # PASO 4: Preparar respuesta para el frontend
         # ===============================================
-        print("📦 Preparando respuesta...")
-        
-        user_data = {
-            'id': str(usuario.id),
-            'nombre': usuario.nombre,
-            'email': usuario.email,
-            'fecha_registro': usuario.fecha_registro.isoformat(),
-            'perfil': {
-                'avatar_url': usuario.perfil.avatar_url if usuario.perfil else None,
-                'idioma': usuario.perfil.idioma if usuario.perfil else 'es',
-                'timezone': usuario.perfil.timezone if usuario.perfil else 'America/Bogota'
-            },
-            'empresa': {
-                'nombre': usuario.empresa.nombre if usuario.empresa else None,
-                'telefono': usuario.empresa.telefono if usuario.empresa else None,
-                'nit': usuario.empresa.nit if usuario.empresa else None,
-            } if usuario.empresa else None,
-            'firebase_uid': firebase_uid
-        }
-        
-        print("=" * 80)
-        print("✅ SINCRONIZACIÓN COMPLETADA EXITOSAMENTE")
-        print("=" * 80)
-        
-        return Response({
-            'success': True,
-            'user': user_data,
-            'message': 'Usuario sincronizado correctamente'
-        }, status=status.HTTP_200_OK)
+        return usuario_sincronizado(usuario, firebase_uid)
         
     except Exception as e:
-        print("=" * 80)
-        print(f"❌ ERROR GENERAL en firebase_auth_sync")
-        print("=" * 80)
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
+        logger.exception("error general en firebase_auth_sync")
+        return error_interno_sync(e)
+
+
+# Piezas de firebase_auth_sync compartidas con la versión async (usuarioapp/views_async.py)
+
+def token_de_header(request):
+    """Token de "Authorization: Bearer <token>" (None si falta el header)."""
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not auth_header.startswith('Bearer '):
+        logger.info("sync sin header Authorization")
+        return None
+    return auth_header.split(' ')[1]
+
+
+def falta_token():
+    return Response(
+        {'error': 'Token de autorización requerido. Header debe ser: Authorization: Bearer <token>'},
+        status=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+def error_de_token(e):
+    """Respuesta 401 para un error al verificar el token de Firebase."""
+    if isinstance(e, auth.InvalidIdTokenError):
+        logger.info("sync token inválido tipo=%s", type(e).__name__)
         return Response(
-            {'error': f'Error interno del servidor: {str(e)}'}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': 'Token de Firebase inválido'}, 
+            status=status.HTTP_401_UNAUTHORIZED
         )
+    if isinstance(e, auth.ExpiredIdTokenError):
+        logger.info("sync token expirado")
+        return Response(
+            {'error': 'Token expirado. Por favor inicia sesión nuevamente.'}, 
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    logger.warning("sync error al verificar token tipo=%s", type(e).__name__)
+    return Response(
+        {'error': f'Error al verificar token: {str(e)}'}, 
+        status=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+def actualizar_desde_google(usuario, firebase_name, firebase_picture):
+    """Copia nombre y avatar de Google al usuario; devuelve True si cambió algo."""
+    updated = False
+    
+    if usuario.nombre != firebase_name and firebase_name:
+        usuario.nombre = firebase_name
+        updated = True
+    
+    # Actualizar avatar si cambió
+    if usuario.perfil:
+        if usuario.perfil.avatar_url != firebase_picture:
+            usuario.perfil.avatar_url = firebase_picture
+            updated = True
+    else:
+        # Crear perfil si no existe
+        usuario.perfil = Perfil(
+            avatar_url=firebase_picture,
+            idioma='es',
+            timezone='America/Bogota'
+        )
+        updated = True
+    return updated
+
+
+def nuevo_usuario_google(data, firebase_name, firebase_email, firebase_uid, firebase_picture):
+    """Usuario (sin guardar) para el primer login con Google."""
+    # Crear perfil con datos de Google
+    perfil = Perfil(
+        avatar_url=firebase_picture,
+        idioma='es',
+        timezone='America/Bogota'
+    )
+    
+    # Crear empresa por defecto o desde request
+    if data.get('empresa'):
+        empresa_data = data.get('empresa')
+        empresa = Empresa(
+            nombre=empresa_data.get('nombre', 'sin_empresa'),
+            telefono=empresa_data.get('telefono'),
+            nit=empresa_data.get('nit')
+        )
+    else:
+        empresa = Empresa(nombre='sin_empresa')
+    
+    return Usuario(
+        nombre=firebase_name,
+        email=firebase_email,
+        clave_hash=firebase_uid,  # ← IMPORTANTE: UID de Firebase como identificador
+        fecha_registro=datetime.utcnow(),
+        perfil=perfil,
+        empresa=empresa
+    )
+
+
+def usuario_sincronizado(usuario, firebase_uid):
+    user_data = {
+        'id': str(usuario.id),
+        'nombre': usuario.nombre,
+        'email': usuario.email,
+        'fecha_registro': usuario.fecha_registro.isoformat(),
+        'perfil': {
+            'avatar_url': usuario.perfil.avatar_url if usuario.perfil else None,
+            'idioma': usuario.perfil.idioma if usuario.perfil else 'es',
+            'timezone': usuario.perfil.timezone if usuario.perfil else 'America/Bogota'
+        },
+        'empresa': {
+            'nombre': usuario.empresa.nombre if usuario.empresa else None,
+            'telefono': usuario.empresa.telefono if usuario.empresa else None,
+            'nit': usuario.empresa.nit if usuario.empresa else None,
+        } if usuario.empresa else None,
+        'firebase_uid': firebase_uid
+    }
+    
+    return Response({
+        'success': True,
+        'user': user_data,
+        'message': 'Usuario sincronizado correctamente'
+    }, status=status.HTTP_200_OK)
+
+
+def error_interno_sync(e):
+    return Response(
+        {'error': f'Error interno del servidor: {str(e)}'}, 
+        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
 
 
 # ==========================================
@@ -292,7 +290,8 @@ class UsuarioListCreateAPI(APIView):
 
             enviado = send_verification_email(usuario.email, otp_code)
             if not enviado:
-                print(f"⚠️ No se pudo enviar correo de verificación a {usuario.email}, pero el usuario fue creado.")
+                logger.warning("no se pudo enviar el correo de verificación email=%s (el usuario fue creado)",
+                               enmascarar_email(usuario.email))
 
             return Response({
                 "message": "Usuario creado. Se envió un código de verificación a tu correo.",
@@ -440,15 +439,13 @@ class UsuarioDetailAPI(APIView):
         # 💡 Importante: `partial=True` permite enviar solo algunos campos
         serializer = UsuarioSerializer(usuario, data=request.data, partial=True)
 
-        # DEBUG: ver lo que llega desde el cliente
-        print("=== UsuarioDetailAPI.put request.data ===")
-        print(request.data)
+        # Solo los nombres de campo: el cuerpo puede traer la clave
+        logger.debug("actualizar usuario id=%s campos=%s", id, sorted(request.data.keys()))
 
         try:
             if not serializer.is_valid():
                 # devolver errores de validación al frontend
-                print("=== Serializer errors ===")
-                print(serializer.errors)
+                logger.info("actualizar usuario id=%s inválido campos=%s", id, sorted(serializer.errors))
                 return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
             # intentar guardar; catch para devolver detalle si falla
@@ -464,8 +461,7 @@ class UsuarioDetailAPI(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("error al actualizar usuario id=%s", id)
             return Response(
                 {"error": "Error al validar/guardar usuario", "details": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,74 @@
+# usuarioapp/views_async.py
+"""
+Vistas async del modo ASGI (SERVIDOR_ASGI=1, ver formCreatorApp/urls.py).
+Mismo contrato que las vistas sync de usuarioapp/views.py; las consultas a
+MongoDB van por el cliente async y la verificación del token de Firebase
+(sync en firebase_admin) corre en un hilo.
+"""
+import logging
+from asgiref.sync import sync_to_async
+from pymongo.errors import DuplicateKeyError
+from rest_framework.permissions import AllowAny
+from apps.authentication.firebase_auth import verificar_token
+from apps.core.logs import enmascarar_email
+from apps.core.mongo_async import coleccion_async
+from apps.core.vistas_async import AsyncAPIView
+from usuarioapp.models import Usuario
+from usuarioapp.views import (
+    token_de_header, falta_token, error_de_token, actualizar_desde_google,
+    nuevo_usuario_google, usuario_sincronizado, error_interno_sync,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FirebaseAuthSyncAsyncAPI(AsyncAPIView):
+    """POST /api/auth/firebase/ — versión async de firebase_auth_sync."""
+    permission_classes = [AllowAny]  # Público porque el usuario aún no existe en MongoDB
+
+    async def post(self, request):
+        try:
+            id_token = token_de_header(request)
+            if id_token is None:
+                return falta_token()
+
+            try:
+                decoded_token = await sync_to_async(verificar_token, thread_sensitive=False)(id_token)
+            except Exception as e:
+                return error_de_token(e)
+
+            firebase_uid = decoded_token['uid']
+            firebase_email = decoded_token.get('email')
+            firebase_picture = decoded_token.get('picture', '')
+            logger.debug("sync token verificado uid=%s", firebase_uid)
+
+            data = request.data
+            firebase_name = data.get('nombre', firebase_email.split('@')[0])
+
+            coleccion = coleccion_async(Usuario)
+            doc = await coleccion.find_one({"email": firebase_email})
+            if doc is None:
+                usuario = nuevo_usuario_google(data, firebase_name, firebase_email, firebase_uid, firebase_picture)
+                usuario.validate()
+                try:
+                    usuario.id = (await coleccion.insert_one(usuario.to_mongo().to_dict())).inserted_id
+                    logger.info("sync usuario creado id=%s email=%s", usuario.id, enmascarar_email(firebase_email))
+                except DuplicateKeyError:
+                    # Dos logins simultáneos del mismo usuario nuevo: el otro lo creó primero
+                    doc = await coleccion.find_one({"email": firebase_email})
+
+            if doc is not None:
+                usuario = Usuario._from_son(doc)
+                updated = actualizar_desde_google(usuario, firebase_name, firebase_picture)
+                if updated:
+                    await coleccion.update_one(
+                        {"_id": usuario.id},
+                        {"$set": {"nombre": usuario.nombre, "perfil": usuario.perfil.to_mongo().to_dict()}}
+                    )
+                logger.debug("sync usuario existente id=%s actualizado=%s", usuario.id, updated)
+
+            return usuario_sincronizado(usuario, firebase_uid)
+
+        except Exception as e:
+            logger.exception("error general en firebase_auth_sync")
+            return error_interno_sync(e)
@@ -0,0 +1,381 @@
+# ====================================================
+# ARCHIVO NUEVO: form-creator/utils/email_outbox.py
+# ====================================================
+# FUNCIÓN: bandeja de salida (outbox) de correos guardada en Mongo.
+# ====================================================
+# Las vistas ya no llaman a Brevo dentro del request: encolan el correo aquí
+# y el proceso `python manage.py run_email_worker` lo envía por su cuenta,
+# con reintentos (backoff exponencial) y cola de muertos (estado "muerto").
+# En el despliegue start.sh lo arranca junto a gunicorn (EMAIL_WORKER=0 si
+# corre como servicio aparte): sin ese proceso ningún correo sale.
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import sib_api_v3_sdk
+from sib_api_v3_sdk.rest import ApiException
+from django.conf import settings
+from mongoengine import Document, StringField, IntField, DateTimeField, ListField
+from pymongo import ReturnDocument
+from apps.core.logs import enmascarar_email
+from apps.core.mongo_async import coleccion_async
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_ENVIANDO = "enviando"
+ESTADO_ENVIADO = "enviado"
+ESTADO_MUERTO = "muerto"
+
+ESTADOS = (ESTADO_PENDIENTE, ESTADO_ENVIANDO, ESTADO_ENVIADO, ESTADO_MUERTO)
+
+
+class CorreoSaliente(Document):
+    """
+    Correo encolado a la espera de que el worker lo entregue.
+    Lleva `destinatario` (envío individual) o `destinatarios` (envío por lote:
+    un solo request a Brevo con una versión del mensaje por destinatario).
+    """
+    destinatario = StringField()
+    destinatarios = ListField(StringField())
+    asunto = StringField(required=True)
+    html = StringField(required=True)
+    etiqueta = StringField()  # tipo de correo (otp, verificacion, copia, invitacion)
+    estado = StringField(choices=ESTADOS, default=ESTADO_PENDIENTE)
+    intentos = IntField(default=0)
+    max_intentos = IntField(default=5)
+    # Momento a partir del cual se puede (re)intentar. Mientras el correo está
+    # "enviando" funciona como lease: si el worker muere, otro lo retoma al vencer.
+    proximo_intento = DateTimeField(default=datetime.utcnow)
+    ultimo_error = StringField()
+    message_ids = ListField(StringField())  # ids que devuelve Brevo al aceptar el envío
+    fecha_creacion = DateTimeField(default=datetime.utcnow)
+    fecha_envio = DateTimeField()
+
+    meta = {
+        'collection': 'correos_salientes',
+        'indexes': [
+            ('estado', 'proximo_intento'),
+        ],
+    }
+
+    def __str__(self):
+        destino = self.destinatario or f"{len(self.destinatarios)} destinatarios"
+        return f"{self.etiqueta or 'correo'} → {destino} ({self.estado})"
+
+
+def _correo(destinatario, asunto, html, etiqueta=None):
+    return CorreoSaliente(
+        destinatario=destinatario,
+        asunto=asunto,
+        html=html,
+        etiqueta=etiqueta,
+        max_intentos=getattr(settings, 'EMAIL_OUTBOX_MAX_INTENTOS', 5),
+    )
+
+
+def _lotes(destinatarios, asunto, html, etiqueta=None, tamano_lote=None):
+    """Documentos (dicts) de encolar_lote: uno por cada `tamano_lote` destinatarios."""
+    tamano_lote = tamano_lote or getattr(settings, 'EMAIL_LOTE_TAMANO', 1000)
+    max_intentos = getattr(settings, 'EMAIL_OUTBOX_MAX_INTENTOS', 5)
+    return [
+        CorreoSaliente(
+            destinatarios=destinatarios[i:i + tamano_lote],
+            asunto=asunto,
+            html=html,
+            etiqueta=etiqueta,
+            max_intentos=max_intentos,
+        ).to_mongo().to_dict()
+        for i in range(0, len(destinatarios), tamano_lote)
+    ]
+
+
+def encolar_correo(destinatario, asunto, html, etiqueta=None):
+    """
+    Guarda el correo en la bandeja de salida.
+    Devuelve True si quedó encolado, False si no se pudo guardar.
+    """
+    try:
+        _correo(destinatario, asunto, html, etiqueta).save()
+        logger.info("correo encolado etiqueta=%s destinatario=%s", etiqueta, enmascarar_email(destinatario))
+        return True
+    except Exception:
+        logger.exception("error al encolar correo etiqueta=%s destinatario=%s", etiqueta, enmascarar_email(destinatario))
+        return False
+
+
+async def encolar_correo_async(destinatario, asunto, html, etiqueta=None):
+    """encolar_correo() con el cliente async de MongoDB (vistas del modo ASGI)."""
+    try:
+        correo = _correo(destinatario, asunto, html, etiqueta)
+        correo.validate()
+        await coleccion_async(CorreoSaliente).insert_one(correo.to_mongo().to_dict())
+        logger.info("correo encolado etiqueta=%s destinatario=%s", etiqueta, enmascarar_email(destinatario))
+        return True
+    except Exception:
+        logger.exception("error al encolar correo etiqueta=%s destinatario=%s", etiqueta, enmascarar_email(destinatario))
+        return False
+
+
+def encolar_lote(destinatarios, asunto, html, etiqueta=None, tamano_lote=None):
+    """
+    Encola el mismo correo para muchos destinatarios, partido en lotes de
+    `tamano_lote` (EMAIL_LOTE_TAMANO). Cada lote es un solo envío a Brevo y
+    todos los lotes se insertan con un único insert_many.
+    Devuelve la cantidad de lotes encolados.
+    """
+    documentos = _lotes(destinatarios, asunto, html, etiqueta, tamano_lote)
+    if documentos:
+        CorreoSaliente._get_collection().insert_many(documentos, ordered=False)
+    logger.info("correos encolados etiqueta=%s destinatarios=%d lotes=%d", etiqueta, len(destinatarios), len(documentos))
+    return len(documentos)
+
+
+async def encolar_lote_async(destinatarios, asunto, html, etiqueta=None, tamano_lote=None):
+    """encolar_lote() con el cliente async de MongoDB."""
+    documentos = _lotes(destinatarios, asunto, html, etiqueta, tamano_lote)
+    if documentos:
+        await coleccion_async(CorreoSaliente).insert_many(documentos, ordered=False)
+    return len(documentos)
+
+
+# ===============================================
+# TRANSPORTES
+# ===============================================
+# Un transporte expone enviar(destinatario, asunto, html) y
+# enviar_lote(destinatarios, asunto, html), devuelve los message ids y lanza
+# una excepción si el envío falla. El worker no sabe nada de Brevo.
+
+# Un solo ApiClient por proceso: su pool de conexiones urllib3 reutiliza las
+# conexiones HTTPS a Brevo en vez de hacer un handshake por correo.
+_api_brevo = None
+_api_brevo_lock = threading.Lock()
+
+
+def obtener_api_brevo():
+    """Devuelve el cliente de Brevo compartido del proceso, creándolo la primera vez."""
+    global _api_brevo
+    if _api_brevo is None:
+        with _api_brevo_lock:
+            if _api_brevo is None:
+                configuration = sib_api_v3_sdk.Configuration()
+                configuration.api_key['api-key'] = settings.BREVO_API_KEY
+                # Una conexión por hilo del worker
+                configuration.connection_pool_maxsize = getattr(settings, 'EMAIL_WORKER_CONCURRENCIA', 4)
+                _api_brevo = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+    return _api_brevo
+
+
+class BrevoTransport:
+    """Envía por la API transaccional de Brevo usando el cliente compartido."""
+
+    def __init__(self):
+        self.api_instance = obtener_api_brevo()
+
+    def _remitente(self):
+        return {"name": settings.BREVO_SENDER_NAME, "email": settings.BREVO_SENDER_EMAIL}
+
+    def enviar(self, destinatario, asunto, html):
+        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+            to=[{"email": destinatario}],
+            sender=self._remitente(),
+            subject=asunto,
+            html_content=html
+        )
+        api_response = self.api_instance.send_transac_email(send_smtp_email)
+        return [getattr(api_response, 'message_id', None) or str(api_response)]
+
+    def enviar_lote(self, destinatarios, asunto, html):
+        """Un solo request con una versión del mensaje por destinatario (no se ven entre sí)."""
+        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+            sender=self._remitente(),
+            subject=asunto,
+            html_content=html,
+            message_versions=[{"to": [{"email": email}]} for email in destinatarios]
+        )
+        api_response = self.api_instance.send_transac_email(send_smtp_email)
+        return list(getattr(api_response, 'message_ids', None) or [])
+
+
+class MemoryTransport:
+    """
+    Transporte en memoria para pruebas: guarda los correos en `enviados`.
+    `fallos` indica cuántos envíos seguidos deben fallar antes de aceptar.
+    """
+
+    def __init__(self, fallos=0):
+        self.enviados = []
+        self.fallos = fallos
+        self._lock = threading.Lock()
+
+    def enviar(self, destinatario, asunto, html):
+        return self.enviar_lote([destinatario], asunto, html)
+
+    def enviar_lote(self, destinatarios, asunto, html):
+        with self._lock:
+            if self.fallos > 0:
+                self.fallos -= 1
+                raise ApiException(status=503, reason="Fallo simulado")
+            ids = []
+            for destinatario in destinatarios:
+                self.enviados.append({"destinatario": destinatario, "asunto": asunto, "html": html})
+                ids.append(f"memoria-{len(self.enviados)}")
+            return ids
+
+
+TRANSPORTES = {
+    'brevo': BrevoTransport,
+    'memoria': MemoryTransport,
+}
+
+
+def obtener_transporte(nombre=None):
+    """Crea el transporte configurado (EMAIL_TRANSPORT) o el indicado."""
+    nombre = nombre or getattr(settings, 'EMAIL_TRANSPORT', 'brevo')
+    try:
+        return TRANSPORTES[nombre]()
+    except KeyError:
+        raise ValueError(f"Transporte de correo desconocido: {nombre}")
+
+
+# ===============================================
+# MÉTRICAS
+# ===============================================
+
+class MetricasOutbox:
+    """Contadores del worker: envíos, reintentos, muertos y latencias."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.enviados = 0
+            self.reintentos = 0
+            self.muertos = 0
+            self.latencia_envio_total = 0.0   # segundos dentro de transporte.enviar
+            self.latencia_envio_max = 0.0
+            self.espera_total = 0.0           # segundos desde que se encoló hasta entregarlo
+            self.espera_max = 0.0
+
+    def registrar_envio(self, duracion, espera):
+        with self._lock:
+            self.enviados += 1
+            self.latencia_envio_total += duracion
+            self.latencia_envio_max = max(self.latencia_envio_max, duracion)
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+    def registrar_fallo(self, muerto):
+        with self._lock:
+            if muerto:
+                self.muertos += 1
+            else:
+                self.reintentos += 1
+
+    def como_dict(self):
+        with self._lock:
+            return {
+                "enviados": self.enviados,
+                "reintentos": self.reintentos,
+                "muertos": self.muertos,
+                "latencia_envio_promedio": self.latencia_envio_total / self.enviados if self.enviados else 0.0,
+                "latencia_envio_max": self.latencia_envio_max,
+                "espera_promedio": self.espera_total / self.enviados if self.enviados else 0.0,
+                "espera_max": self.espera_max,
+            }
+
+
+metricas = MetricasOutbox()
+
+
+def profundidad_cola():
+    """Cantidad de correos por estado en la bandeja de salida."""
+    conteos = {estado: 0 for estado in ESTADOS}
+    for fila in CorreoSaliente._get_collection().aggregate([
+        {"$group": {"_id": "$estado", "total": {"$sum": 1}}}
+    ]):
+        conteos[fila["_id"]] = fila["total"]
+    return conteos
+
+
+# ===============================================
+# PROCESAMIENTO
+# ===============================================
+
+def calcular_backoff(intentos):
+    """Espera antes del siguiente intento: base * 2^(intentos-1) con jitter, acotada."""
+    base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_BASE', 30)
+    maximo = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_MAX', 3600)
+    espera = min(maximo, base * (2 ** max(intentos - 1, 0)))
+    return timedelta(seconds=espera * random.uniform(0.8, 1.2))
+
+
+def reclamar_siguiente(lease_segundos=300):
+    """
+    Toma atómicamente el siguiente correo listo para enviar y lo marca "enviando".
+    También retoma correos "enviando" cuyo lease venció (worker caído).
+    Devuelve el documento crudo o None si no hay nada pendiente.
+    """
+    ahora = datetime.utcnow()
+    return CorreoSaliente._get_collection().find_one_and_update(
+        {
+            "estado": {"$in": [ESTADO_PENDIENTE, ESTADO_ENVIANDO]},
+            "proximo_intento": {"$lte": ahora},
+        },
+        {
+            "$set": {
+                "estado": ESTADO_ENVIANDO,
+                "proximo_intento": ahora + timedelta(seconds=lease_segundos),
+            },
+            "$inc": {"intentos": 1},
+        },
+        sort=[("proximo_intento", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def procesar_correo(doc, transporte):
+    """
+    Envía un correo ya reclamado y guarda el resultado:
+    "enviado", "pendiente" con backoff, o "muerto" si agotó los intentos.
+    Devuelve el estado final.
+    """
+    coleccion = CorreoSaliente._get_collection()
+    destino = enmascarar_email(doc["destinatario"]) if doc.get("destinatario") \
+        else f"{len(doc.get('destinatarios', []))} destinatarios"
+    inicio = time.monotonic()
+    try:
+        if doc.get("destinatarios"):
+            message_ids = transporte.enviar_lote(doc["destinatarios"], doc["asunto"], doc["html"])
+        else:
+            message_ids = transporte.enviar(doc["destinatario"], doc["asunto"], doc["html"])
+    except Exception as e:
+        muerto = doc.get("intentos", 1) >= doc.get("max_intentos", 5)
+        cambios = {"ultimo_error": str(e)[:1000]}
+        if muerto:
+            cambios["estado"] = ESTADO_MUERTO
+            logger.error("correo descartado id=%s destino=%s intentos=%s error=%s", doc["_id"], destino, doc.get("intentos"), e)
+        else:
+            cambios["estado"] = ESTADO_PENDIENTE
+            cambios["proximo_intento"] = datetime.utcnow() + calcular_backoff(doc.get("intentos", 1))
+            logger.warning("falló el envío id=%s destino=%s intento=%s, se reintentará error=%s", doc["_id"], destino, doc.get("intentos"), e)
+        coleccion.update_one({"_id": doc["_id"]}, {"$set": cambios})
+        metricas.registrar_fallo(muerto)
+        return cambios["estado"]
+
+    duracion = time.monotonic() - inicio
+    ahora = datetime.utcnow()
+    coleccion.update_one(
+        {"_id": doc["_id"]},
+        {"$set": {"estado": ESTADO_ENVIADO, "fecha_envio": ahora, "message_ids": message_ids},
+         "$unset": {"ultimo_error": ""}}
+    )
+    espera = (ahora - doc["fecha_creacion"]).total_seconds() if doc.get("fecha_creacion") else 0.0
+    metricas.registrar_envio(duracion, espera)
+    logger.info("correo enviado etiqueta=%s destino=%s duracion_s=%.2f", doc.get("etiqueta"), destino, duracion)
+    return ESTADO_ENVIADO
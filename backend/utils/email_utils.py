@@ -1,12 +1,16 @@
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
-from django.conf import settings
-import random
+import logging
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from utils.email_outbox import encolar_correo, encolar_lote, encolar_correo_async, encolar_lote_async
+
+logger = logging.getLogger(__name__)
 
 # ====================================================
 # ARCHIVO NUEVO: form-creator/utils/email_utils.py
 # ====================================================
 # FUNCIÓN: la función envía el OTP, se genera y guarda en (views.py)
+# Los correos ya no se envían dentro del request: se encolan en la bandeja de
+# salida (utils/email_outbox.py) y los entrega `manage.py run_email_worker`.
 # ====================================================
 # ¿Por qué está aquí?
 #Este módulo centraliza la lógica de envío de correos, la cual podría ser utilizada en diferentes  partes del proyecto.
@@ -15,15 +19,9 @@ import random
 
 def send_otp_email(recipient_email, otp_code):
     """
-    Envía correo con Brevo. Recibe recipient_email (str) y otp_code (str, 6 dígitos).
-    Devuelve True si Brevo aceptó el envío, False si hubo error.
+    Encola el correo con el OTP. Recibe recipient_email (str) y otp_code (str, 6 dígitos).
+    Devuelve True si quedó en la bandeja de salida, False si hubo error.
     """
-    # Configurar SDK de Brevo con tu API Key
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
-
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-
     subject = "Tu código OTP de recuperación - FormCreator"
     html_content = f"""
     <body style="background:#F5FBFA;padding:32px 0;">
@@ -40,29 +38,12 @@ def send_otp_email(recipient_email, otp_code):
 </body>
     """
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": recipient_email}],
-        sender={"name": settings.BREVO_SENDER_NAME, "email": settings.BREVO_SENDER_EMAIL},
-        subject=subject,
-        html_content=html_content
-    )
-
-    try:
-        # Llamada al API de Brevo
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        # Si llega aquí sin excepción => Brevo aceptó la petición de envío
-        # api_response contiene info; suele venir messageId
-        print("Brevo response:", getattr(api_response, 'messageId', api_response))
-        return True
-    except ApiException as e:
-        # Aquí logueamos el error (en producción guardarlo en logs)
-        print("Error al enviar correo con Brevo:", e)
-        return False
+    return encolar_correo(recipient_email, subject, html_content, etiqueta="otp")
 
 
 def send_verification_email(recipient_email, otp_code):
     """
-    Envía correo de verificación de cuenta con código OTP vía Brevo.
+    Encola el correo de verificación de cuenta con código OTP.
     Se usa al registrarse un usuario con email/contraseña.
     
     Args:
@@ -70,13 +51,8 @@ def send_verification_email(recipient_email, otp_code):
         otp_code (str): Código OTP de 6 dígitos
     
     Returns:
-        bool: True si Brevo aceptó el envío, False si hubo error
+        bool: True si quedó en la bandeja de salida, False si hubo error
     """
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
-
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-
     subject = "Verifica tu cuenta - FormCreator"
     html_content = f"""
     <body style="background:#F5FBFA;padding:32px 0;">
@@ -93,20 +69,7 @@ def send_verification_email(recipient_email, otp_code):
 </body>
     """
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": recipient_email}],
-        sender={"name": settings.BREVO_SENDER_NAME, "email": settings.BREVO_SENDER_EMAIL},
-        subject=subject,
-        html_content=html_content
-    )
-
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print("✅ Correo de verificación enviado. MessageId:", getattr(api_response, 'messageId', api_response))
-        return True
-    except ApiException as e:
-        print("❌ Error al enviar correo de verificación con Brevo:", e)
-        return False
+    return encolar_correo(recipient_email, subject, html_content, etiqueta="verificacion")
 
 
 # 🆕 NUEVA FUNCIÓN PARA ENVIAR COPIA DE RESPUESTAS
@@ -121,13 +84,20 @@ def send_form_responses_copy(recipient_email, form_title, respuestas_list):
             [{"pregunta": "¿Pregunta?", "respuesta": "Respuesta del usuario"}, ...]
     
     Returns:
-        bool: True si se envió correctamente, False si hubo error
+        bool: True si quedó en la bandeja de salida, False si hubo error
     """
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
+    subject, html_content = _copia_respuestas_html(form_title, respuestas_list)
+    return encolar_correo(recipient_email, subject, html_content, etiqueta="copia_respuestas")
 
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
 
+async def send_form_responses_copy_async(recipient_email, form_title, respuestas_list):
+    """send_form_responses_copy() para las vistas async (modo ASGI)."""
+    subject, html_content = _copia_respuestas_html(form_title, respuestas_list)
+    return await encolar_correo_async(recipient_email, subject, html_content, etiqueta="copia_respuestas")
+
+
+def _copia_respuestas_html(form_title, respuestas_list):
+    """Arma (asunto, html) de la copia de respuestas."""
     # Construir el HTML de las respuestas
     respuestas_html = ""
     for idx, item in enumerate(respuestas_list, 1):
@@ -163,20 +133,7 @@ def send_form_responses_copy(recipient_email, form_title, respuestas_list):
     </body>
     """
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": recipient_email}],
-        sender={"name": settings.BREVO_SENDER_NAME, "email": settings.BREVO_SENDER_EMAIL},
-        subject=subject,
-        html_content=html_content
-    )
-
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print("✅ Copia de respuestas enviada. MessageId:", getattr(api_response, 'messageId', api_response))
-        return True
-    except ApiException as e:
-        print("❌ Error al enviar copia de respuestas con Brevo:", e)
-        return False
+    return subject, html_content
     
 
     # 🆕 NUEVA FUNCIÓN PARA INVITAR USUARIOS A RESPONDER
@@ -191,13 +148,67 @@ def send_form_invitation(recipient_email, form_title, form_description, form_lin
         form_link (str): Enlace para responder el formulario
     
     Returns:
-        bool: True si se envió correctamente, False si hubo error
+        bool: True si quedó en la bandeja de salida, False si hubo error
     """
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
+    subject, html_content = _invitacion_html(form_title, form_description, form_link)
+    return encolar_correo(recipient_email, subject, html_content, etiqueta="invitacion")
 
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
 
+def send_form_invitations(recipient_emails, form_title, form_description, form_link):
+    """
+    Envía la misma invitación a muchos destinatarios en lotes (un request a
+    Brevo por lote, ver encolar_lote). El HTML se arma una sola vez.
+    
+    Args:
+        recipient_emails (list): Emails de los destinatarios
+        form_title, form_description, form_link: igual que send_form_invitation
+    
+    Returns:
+        dict: resultado por destinatario: "encolado", "email_invalido" o "error"
+    """
+    resultados, validos = _validar_destinatarios(recipient_emails)
+    subject, html_content = _invitacion_html(form_title, form_description, form_link)
+    try:
+        encolar_lote(validos, subject, html_content, etiqueta="invitacion")
+    except Exception:
+        logger.exception("error al encolar invitaciones destinatarios=%d", len(validos))
+        for email in validos:
+            resultados[email] = "error"
+    return resultados
+
+
+async def send_form_invitations_async(recipient_emails, form_title, form_description, form_link):
+    """send_form_invitations() para las vistas async (modo ASGI)."""
+    resultados, validos = _validar_destinatarios(recipient_emails)
+    subject, html_content = _invitacion_html(form_title, form_description, form_link)
+    try:
+        await encolar_lote_async(validos, subject, html_content, etiqueta="invitacion")
+    except Exception:
+        logger.exception("error al encolar invitaciones destinatarios=%d", len(validos))
+        for email in validos:
+            resultados[email] = "error"
+    return resultados
+
+
+def _validar_destinatarios(recipient_emails):
+    """({email: "encolado" | "email_invalido"}, emails válidos sin repetir)."""
+    resultados = {}
+    validos = []
+    for email in recipient_emails:
+        if email in resultados:  # repetido: se invita una sola vez
+            continue
+        try:
+            validate_email(email)
+        except ValidationError:
+            resultados[email] = "email_invalido"
+            continue
+        resultados[email] = "encolado"
+        validos.append(email)
+    return resultados, validos
+
+
+def _invitacion_html(form_title, form_description, form_link):
+    """Arma (asunto, html) de la invitación a responder un formulario."""
     subject = f"📬 Invitación: {form_title}"
     html_content = f"""
     <body style="background:#F5FBFA;padding:32px 0;">
@@ -230,17 +241,4 @@ def send_form_invitation(recipient_email, form_title, form_description, form_lin
     </body>
     """
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": recipient_email}],
-        sender={"name": settings.BREVO_SENDER_NAME, "email": settings.BREVO_SENDER_EMAIL},
-        subject=subject,
-        html_content=html_content
-    )
-
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print(f"✅ Invitación enviada a {recipient_email}. MessageId:", getattr(api_response, 'messageId', api_response))
-        return True
-    except ApiException as e:
-        print(f"❌ Error al enviar invitación a {recipient_email}:", e)
-        return False
\ No newline at end of file
+    return subject, html_content
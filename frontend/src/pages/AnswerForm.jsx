@@ -17,6 +17,7 @@ function AnswerForm() {
   const [isEditing, setIsEditing] = useState(false);
   const [showModal, setShowModal] = useState(false);
   const [modalDismissed, setModalDismissed] = useState(false);
+  const [accesoVerificado, setAccesoVerificado] = useState(false);
   const [showSingleResponseModal, setShowSingleResponseModal] = useState(false);
   const [enviarCopia, setEnviarCopia] = useState(false);
 
@@ -82,11 +83,9 @@ function AnswerForm() {
   }
 
   useEffect(() => {
-    const ip = localStorage.getItem("client_ip") || "";
-
     fetch(`https://form-creator-production.up.railway.app/api/formularios/${id}/`)
       .then(res => res.json())
-      .then(data => {
+      .then(async data => {
         setFormulario(data);
 
         // 🆕 VALIDACIÓN DE ACCESO: Si requiere login y es privado
@@ -106,10 +105,13 @@ function AnswerForm() {
             return;
           }
 
-          // Si hay usuario, verificar si está en la lista de autorizados
-          const usuariosAutorizados = data.configuracion?.usuarios_autorizados || [];
+          // Si hay usuario, el backend verifica si está entre los autorizados
           const emailUsuario = user.email.toLowerCase();
-          const tieneAcceso = usuariosAutorizados.map(e => e.toLowerCase()).includes(emailUsuario);
+          const acceso = await fetch(
+            `https://form-creator-production.up.railway.app/api/formularios/${id}/verificar-acceso/?email=${encodeURIComponent(emailUsuario)}`
+          );
+          const tieneAcceso = acceso.ok;
+          setAccesoVerificado(tieneAcceso);
 
           if (!tieneAcceso) {
             setModal({
@@ -125,26 +127,25 @@ function AnswerForm() {
           console.log("✅ Acceso autorizado para:", emailUsuario);
         }
 
-        // Verificar si ya respondió
-        fetch(`https://form-creator-production.up.railway.app/api/respuestas/?formulario=${id}`)
+        // Verificar si ya respondió (búsqueda indexada de la respuesta propia).
+        // El backend identifica al respondedor por el token o, sin sesión,
+        // por el comprobante que devolvió el envío anterior.
+        const idToken = localStorage.getItem("idToken");
+        const comprobante = localStorage.getItem(`respuesta_${id}`);
+        const params = new URLSearchParams({ formulario: id });
+        if (comprobante) params.set("respuesta", comprobante);
+        const verificarRespuesta = idToken || comprobante
+          ? fetch(`https://form-creator-production.up.railway.app/api/respuestas/mi-respuesta/?${params}`, {
+              headers: idToken ? { Authorization: `Bearer ${idToken}` } : {},
+            })
+          : Promise.resolve({ ok: true, json: () => ({ respuesta: null }) });
+        verificarRespuesta
           .then(res => {
             if (!res.ok) throw new Error(`Error ${res.status}`);
             return res.json();
           })
           .then(data => {
-            console.log("📋 Respuestas obtenidas:", data);
-
-            if (!Array.isArray(data) || data.length === 0) {
-              console.log("⚠️ No hay respuestas previas en el servidor.");
-              return;
-            }
-
-            const match = data.find(r => {
-              if (!r.respondedor) return false;
-              const emailMatch = user?.email && r.respondedor.email === user.email;
-              const ipMatch = !user?.email && r.respondedor.ip_address === ip;
-              return emailMatch || ipMatch;
-            });
+            const match = data?.respuesta;
 
             console.log("🔹 Resultado de match:", match);
 
@@ -269,11 +270,7 @@ function AnswerForm() {
         return;
       }
 
-      const usuariosAutorizados = formulario.configuracion?.usuarios_autorizados || [];
-      const emailUsuario = user.email.toLowerCase();
-      const tieneAcceso = usuariosAutorizados.map(e => e.toLowerCase()).includes(emailUsuario);
-
-      if (!tieneAcceso) {
+      if (!accesoVerificado) {
         setMensaje("⚠️ No tienes autorización para responder este formulario");
         return;
       }
@@ -335,6 +332,8 @@ function AnswerForm() {
       if (res.ok) {
         setMensaje("✅ ¡Respuesta enviada correctamente!");
         localStorage.removeItem(`pending_answers_${id}`);
+        // Comprobante para encontrar esta respuesta sin sesión (mi-respuesta)
+        if (!isEditing && data.id) localStorage.setItem(`respuesta_${id}`, data.id);
         const userData = JSON.parse(localStorage.getItem("user"));
         if (userData?.id) {
           navigate(`/editSuccess?edit=${isEditing}`);
@@ -360,6 +359,9 @@ function AnswerForm() {
         } else {
           setMensaje(`⚠️ Error: ${data.error || JSON.stringify(data)}`);
         }
+      } else if (res.status === 409) {
+        // Formulario de una sola respuesta: el servidor ya tiene la de este usuario
+        setMensaje("⚠️ Ya respondiste este formulario. Solo se permite una respuesta.");
       } else if (res.status === 401) {
         localStorage.setItem(`pending_answers_${id}`, JSON.stringify(respuestas));
         setShowAuthModal(true);
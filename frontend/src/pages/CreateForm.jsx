@@ -36,6 +36,9 @@ export default function CreateForm() {
   // 🆕 Estado para el input de agregar usuario
   const [emailInput, setEmailInput] = useState("");
   const [emailError, setEmailError] = useState("");
+  // En edición, la lista de autorizados solo se envía si el usuario la cambió:
+  // si no, el backend conserva la guardada aunque la carga no haya terminado
+  const [usuariosEditados, setUsuariosEditados] = useState(false);
 
   const user = JSON.parse(localStorage.getItem("user"));
 
@@ -73,8 +76,25 @@ export default function CreateForm() {
             una_respuesta: data.configuracion.una_respuesta ?? true,
             permitir_edicion: data.configuracion.permitir_edicion || false,
             es_publico: data.configuracion.es_publico ?? true,
-            usuarios_autorizados: data.configuracion.usuarios_autorizados || [],
+            usuarios_autorizados: [],
           });
+
+          // Los autorizados se listan paginados por separado
+          const usuarios = [];
+          let siguiente = null;
+          do {
+            const params = new URLSearchParams({ limite: 1000 });
+            if (siguiente) params.set("siguiente", siguiente);
+            const resUsuarios = await fetch(
+              `https://form-creator-production.up.railway.app/api/formularios/${formId}/usuarios-autorizados/?${params}`
+            );
+            // Una lista a medias no se puede mostrar ni guardar: se aborta la carga
+            if (!resUsuarios.ok) throw new Error("No se pudieron cargar los usuarios autorizados");
+            const pagina = await resUsuarios.json();
+            usuarios.push(...pagina.usuarios_autorizados);
+            siguiente = pagina.siguiente;
+          } while (siguiente);
+          setConfig(prev => ({ ...prev, usuarios_autorizados: usuarios }));
         }
       } catch (error) {
         console.error("❌ Error al cargar formulario:", error);
@@ -123,6 +143,7 @@ export default function CreateForm() {
       ...config,
       usuarios_autorizados: [...config.usuarios_autorizados, email]
     });
+    setUsuariosEditados(true);
 
     // Limpiar input y error
     setEmailInput("");
@@ -135,6 +156,7 @@ export default function CreateForm() {
       ...config,
       usuarios_autorizados: config.usuarios_autorizados.filter(e => e !== email)
     });
+    setUsuariosEditados(true);
   };
 
   // 🆕 Manejar Enter en el input de email
@@ -220,7 +242,8 @@ export default function CreateForm() {
     }
 
     // 🆕 Validación: Si requiere login y es privado, debe tener al menos 1 usuario
-    if (config.requerir_login && !config.es_publico && config.usuarios_autorizados.length === 0) {
+    const enviarUsuarios = !formId || usuariosEditados;
+    if (enviarUsuarios && config.requerir_login && !config.es_publico && config.usuarios_autorizados.length === 0) {
       alert("⚠️ Un formulario privado debe tener al menos un usuario autorizado");
       return;
     }
@@ -262,6 +285,7 @@ export default function CreateForm() {
         validaciones: p.validaciones || null,
       })),
     };
+    if (!enviarUsuarios) delete payload.configuracion.usuarios_autorizados;
 
     try {
       let res;
@@ -559,6 +583,7 @@ export default function CreateForm() {
                 // Si se marca como público, limpiar la lista de usuarios
                 usuarios_autorizados: e.target.checked ? [] : config.usuarios_autorizados
               });
+              if (e.target.checked) setUsuariosEditados(true);
               setEmailInput("");
               setEmailError("");
             }}
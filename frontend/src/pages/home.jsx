@@ -6,11 +6,11 @@ import { useNavigate } from "react-router-dom";
 const Home = () => {
   const navigate = useNavigate();
   const [formularios, setFormularios] = useState([]);
-  // eslint-disable-next-line no-unused-vars
   const [loading, setLoading] = useState(true);
   const [menuAbierto, setMenuAbierto] = useState(null);
   const [user, setUser] = useState(null);
   const [mostrarPapelera, setMostrarPapelera] = useState(false);
+  const [siguiente, setSiguiente] = useState(null); // token de la siguiente página
 
   // 🔐 Verificar autenticación y cargar usuario
   useEffect(() => {
@@ -38,13 +38,14 @@ const Home = () => {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, [menuAbierto]);
 
-  // 📥 Cargar formularios del usuario
-  const cargarFormularios = async (userId, isPapelera = mostrarPapelera) => {
+  // 📥 Cargar formularios del usuario (el home usa el listado resumido y paginado)
+  const cargarFormularios = async (userId, isPapelera = mostrarPapelera, token = null) => {
     setLoading(true);
     try {
+      const cursor = token ? `&siguiente=${encodeURIComponent(token)}` : "";
       const url = isPapelera 
-        ? `https://form-creator-production.up.railway.app/api/formularios/papelera/?admin=${userId}`
-        : `https://form-creator-production.up.railway.app/api/formularios/?admin=${userId}`;
+        ? `https://form-creator-production.up.railway.app/api/formularios/papelera/?admin=${userId}${cursor}`
+        : `https://form-creator-production.up.railway.app/api/formularios/?admin=${userId}&resumen=1${cursor}`;
       const res = await fetch(url);
 
       if (!res.ok) {
@@ -53,7 +54,8 @@ const Home = () => {
 
       const data = await res.json();
       console.log("📋 Formularios cargados:", data);
-      setFormularios(data);
+      setFormularios((previos) => (token ? [...previos, ...data.resultados] : data.resultados));
+      setSiguiente(data.siguiente);
     } catch (error) {
       console.error("❌ Error:", error);
       alert("No se pudieron cargar los formularios");
@@ -126,6 +128,13 @@ const Home = () => {
     if (!confirmacion) return;
 
     try {
+      // El listado del home es un resumen: traer el formulario completo para copiar sus preguntas
+      const resForm = await fetch(`https://form-creator-production.up.railway.app/api/formularios/${formulario.id}/`);
+      if (!resForm.ok) {
+        throw new Error("Error al obtener el formulario");
+      }
+      formulario = await resForm.json();
+
       const formularioDuplicado = {
         titulo: `${formulario.titulo} (copia)`,
         descripcion: formulario.descripcion,
@@ -451,7 +460,7 @@ const Home = () => {
 
                 {/* Info adicional */}
                 <p className="home-card-info">
-                  {form.preguntas?.length || 0} preguntas
+                  {form.total_preguntas ?? form.preguntas?.length ?? 0} preguntas
                   {mostrarPapelera && form.fecha_eliminacion && (
                     <span style={{ display: 'block', color: '#ef4444', fontSize: '0.85rem', marginTop: '6px', fontWeight: '500' }}>
                       ⏳ Se eliminará en {calcularDiasRestantes(form.fecha_eliminacion)} días
@@ -476,6 +485,19 @@ const Home = () => {
           })}
         </section>
 
+        {/* Siguiente página del listado */}
+        {siguiente && (
+          <div style={{ textAlign: "center", margin: "24px 0" }}>
+            <button
+              className="home-btn-publicar publicar"
+              disabled={loading}
+              onClick={() => cargarFormularios(user.id, mostrarPapelera, siguiente)}
+            >
+              {loading ? "Cargando..." : "Cargar más"}
+            </button>
+          </div>
+        )}
+
         {/* Mensaje si no hay formularios */}
         {formularios.length === 0 && (
           <div className="home-empty-state">
@@ -9,5 +9,30 @@ python3 manage.py migrate
 # Collect static files
 python3 manage.py collectstatic --noinput
 
+# Report the MongoDB pool settings and connect latency (the server starts even if it fails)
+python3 manage.py verificar_mongo
+
+# Email worker: the views only enqueue emails (OTP, verification, copies,
+# invitations) in the outbox; run_email_worker is what sends them through Brevo.
+# It runs next to gunicorn and is restarted if it exits. Set EMAIL_WORKER=0
+# when the worker runs as its own service (same image, command:
+# `cd backend && python3 manage.py run_email_worker`).
+if [ "${EMAIL_WORKER:-1}" != "0" ]; then
+    (
+        while true; do
+            python3 manage.py run_email_worker
+            echo "run_email_worker exited with status $?, restarting in 5s" >&2
+            sleep 5
+        done
+    ) &
+fi
+
 # Start Gunicorn server
-gunicorn formCreatorApp.wsgi:application --bind 0.0.0.0:$PORT
\ No newline at end of file
+# SERVIDOR_ASGI on runs uvicorn workers with the async views (formCreatorApp/asgi.py).
+# The flag is parsed by python-decouple, exactly like settings.py does, so any value
+# it accepts (1/true/yes/on, any case) selects the same mode in both places.
+if python3 -c "import sys; from decouple import config; sys.exit(0 if config('SERVIDOR_ASGI', default=False, cast=bool) else 1)"; then
+    exec gunicorn formCreatorApp.asgi:application -k uvicorn_worker.UvicornWorker --bind 0.0.0.0:$PORT
+else
+    exec gunicorn formCreatorApp.wsgi:application --bind 0.0.0.0:$PORT
+fi